@@ -12,7 +12,7 @@ import sys
 
 from django.contrib.auth import get_user_model
 from django.core.validators import ValidationError, validate_email
-from django.db.models import Count
+from django.db.models import Count, Q
 
 from allauth.account.models import EmailAddress
 from allauth.account.utils import sync_user_email_addresses
@@ -24,7 +24,7 @@ from pootle.core.signals import update_data, update_revisions
 from pootle_app.models import Directory
 from pootle_statistics.models import SubmissionFields
 from pootle_store.constants import FUZZY, UNTRANSLATED
-from pootle_store.models import SuggestionState
+from pootle_store.models import Suggestion, SuggestionState, Unit
 
 
 logger = logging.getLogger(__name__)
@@ -174,6 +174,10 @@ class UserPurger(object):
         """
 
         stores = set()
+        suggested_units = set(
+            Suggestion.objects.filter(
+                Q(user=self.user) | Q(reviewer=self.user)).values_list(
+                    "unit_id", flat=True))
         with keep_data():
             stores |= self.remove_units_created()
             stores |= self.revert_units_edited()
@@ -188,6 +192,8 @@ class UserPurger(object):
             # Delete remaining suggestions.
             logger.debug("Deleting remaining suggestions for: %s", self.user)
             self.user.suggestions.all().delete()
+        Unit.objects.filter(
+            pk__in=suggested_units).update_pending_suggestions()
         for store in stores:
             update_data.send(store.__class__, instance=store)
         update_revisions.send(
@@ -220,31 +226,34 @@ class UserPurger(object):
         """
         stores = set()
         # Revert unit comments where self.user is latest commenter.
-        for unit_change in self.user.commented.select_related("unit").iterator():
-            unit = unit_change.unit
-            stores.add(unit.store)
-
-            # Find comments by other self.users
-            comments = unit.get_comments().exclude(submitter=self.user)
-            change = {}
-            if comments.exists():
-                # If there are previous comments by others update the
-                # translator_comment, commented_by, and commented_on
-                last_comment = comments.latest('pk')
-                translator_comment = last_comment.new_value
-                change["commented_by_id"] = last_comment.submitter_id
-                change["commented_on"] = last_comment.creation_time
-                logger.debug("Unit comment reverted: %s", repr(unit))
-            else:
-                translator_comment = ""
-                change["commented_by"] = None
-                change["commented_on"] = None
-                logger.debug("Unit comment removed: %s", repr(unit))
-            unit_change.__class__.objects.filter(id=unit_change.id).update(
-                **change)
-            unit.__class__.objects.filter(id=unit.id).update(
-                translator_comment=translator_comment,
-                revision=Revision.incr())
+        unit_changes = self.user.commented.select_related("unit")
+        with Revision.reserved(unit_changes.count()):
+            for unit_change in unit_changes.iterator():
+                unit = unit_change.unit
+                stores.add(unit.store)
+
+                # Find comments by other self.users
+                comments = unit.get_comments().exclude(submitter=self.user)
+                change = {}
+                if comments.exists():
+                    # If there are previous comments by others update the
+                    # translator_comment, commented_by, and commented_on
+                    last_comment = comments.latest('pk')
+                    translator_comment = last_comment.new_value
+                    change["commented_by_id"] = last_comment.submitter_id
+                    change["commented_on"] = last_comment.creation_time
+                    logger.debug("Unit comment reverted: %s", repr(unit))
+                else:
+                    translator_comment = ""
+                    change["commented_by"] = None
+                    change["commented_on"] = None
+                    logger.debug("Unit comment removed: %s", repr(unit))
+                unit_change.__class__.objects.filter(id=unit_change.id).update(
+                    **change)
+                units = unit.__class__.objects.filter(id=unit.id)
+                units.update(
+                    translator_comment=translator_comment,
+                    revision=Revision.incr())
         return stores
 
     @write_stdout(" * Reverting units edited by: %(user)s... ")
@@ -253,35 +262,38 @@ class UserPurger(object):
         """
         stores = set()
         # Revert unit target where user is the last submitter.
-        for unit_change in self.user.submitted.select_related("unit").iterator():
-            unit = unit_change.unit
-            stores.add(unit.store)
+        unit_changes = self.user.submitted.select_related("unit")
+        with Revision.reserved(unit_changes.count()):
+            for unit_change in unit_changes.iterator():
+                unit = unit_change.unit
+                stores.add(unit.store)
+
+                # Find the last submission by different user that updated the
+                # unit.target.
+                edits = unit.get_edits().exclude(submitter=self.user)
+                updates = {}
+                unit_updates = {}
+                if edits.exists():
+                    last_edit = edits.latest("pk")
+                    unit_updates["target_f"] = last_edit.new_value
+                    updates["submitted_by_id"] = last_edit.submitter_id
+                    updates["submitted_on"] = last_edit.creation_time
+                    logger.debug("Unit edit reverted: %s", repr(unit))
+                else:
+                    # if there is no previous submissions set the target to ""
+                    # and set the unit.change.submitted_by to None
+                    unit_updates["target_f"] = ""
+                    updates["submitted_by"] = None
+                    updates["submitted_on"] = unit.creation_time
+                    logger.debug("Unit edit removed: %s", repr(unit))
 
-            # Find the last submission by different user that updated the
-            # unit.target.
-            edits = unit.get_edits().exclude(submitter=self.user)
-            updates = {}
-            unit_updates = {}
-            if edits.exists():
-                last_edit = edits.latest("pk")
-                unit_updates["target_f"] = last_edit.new_value
-                updates["submitted_by_id"] = last_edit.submitter_id
-                updates["submitted_on"] = last_edit.creation_time
-                logger.debug("Unit edit reverted: %s", repr(unit))
-            else:
-                # if there is no previous submissions set the target to "" and
-                # set the unit.change.submitted_by to None
-                unit_updates["target_f"] = ""
-                updates["submitted_by"] = None
-                updates["submitted_on"] = unit.creation_time
-                logger.debug("Unit edit removed: %s", repr(unit))
-
-            # Increment revision
-            unit_change.__class__.objects.filter(id=unit_change.id).update(
-                **updates)
-            unit.__class__.objects.filter(id=unit.id).update(
-                revision=Revision.incr(),
-                **unit_updates)
+                # Increment revision
+                unit_change.__class__.objects.filter(id=unit_change.id).update(
+                    **updates)
+                units = unit.__class__.objects.filter(id=unit.id)
+                units.update(
+                    revision=Revision.incr(),
+                    **unit_updates)
         return stores
 
     @write_stdout(" * Reverting units reviewed by: %(user)s... ")
@@ -314,34 +326,37 @@ class UserPurger(object):
             # Remove the review.
             review.delete()
 
-        for unit_change in self.user.reviewed.select_related("unit").iterator():
-            unit = unit_change.unit
-            stores.add(unit.store)
-            unit.suggestion_set.filter(reviewer=self.user).update(
-                state=SuggestionState.objects.get(name="pending"),
-                reviewer=None)
-            unit_updates = {}
-            updates = {}
-            if not unit.target:
-                unit_updates["state"] = UNTRANSLATED
-                updates["reviewed_by"] = None
-                updates["reviewed_on"] = None
-            else:
-                old_state_sub = unit.submission_set.exclude(
-                    submitter=self.user).filter(
-                        field=SubmissionFields.STATE).order_by(
-                            "-creation_time", "-pk").first()
-                if old_state_sub:
-                    unit_updates["state"] = old_state_sub.new_value
-                    updates["reviewed_by"] = old_state_sub.submitter
-                    updates["reviewed_on"] = old_state_sub.creation_time
-            logger.debug("Unit reviewed_by removed: %s", repr(unit))
-            unit_change.__class__.objects.filter(id=unit_change.id).update(
-                **updates)
-            # Increment revision
-            unit.__class__.objects.filter(id=unit.id).update(
-                revision=Revision.incr(),
-                **unit_updates)
+        unit_changes = self.user.reviewed.select_related("unit")
+        with Revision.reserved(unit_changes.count()):
+            for unit_change in unit_changes.iterator():
+                unit = unit_change.unit
+                stores.add(unit.store)
+                unit.suggestion_set.filter(reviewer=self.user).update(
+                    state=SuggestionState.objects.get(name="pending"),
+                    reviewer=None)
+                unit_updates = {}
+                updates = {}
+                if not unit.target:
+                    unit_updates["state"] = UNTRANSLATED
+                    updates["reviewed_by"] = None
+                    updates["reviewed_on"] = None
+                else:
+                    old_state_sub = unit.submission_set.exclude(
+                        submitter=self.user).filter(
+                            field=SubmissionFields.STATE).order_by(
+                                "-creation_time", "-pk").first()
+                    if old_state_sub:
+                        unit_updates["state"] = old_state_sub.new_value
+                        updates["reviewed_by"] = old_state_sub.submitter
+                        updates["reviewed_on"] = old_state_sub.creation_time
+                logger.debug("Unit reviewed_by removed: %s", repr(unit))
+                unit_change.__class__.objects.filter(id=unit_change.id).update(
+                    **updates)
+                # Increment revision
+                units = unit.__class__.objects.filter(id=unit.id)
+                units.update(
+                    revision=Revision.incr(),
+                    **unit_updates)
         return stores
 
     @write_stdout(" * Reverting unit state changes by: %(user)s... ")
@@ -119,7 +119,8 @@ class Command(PootleCommand):
         if stores.count() == 1:
             store = stores.get()
             with open(os.path.basename(store.pootle_path), "wb") as f:
-                f.write(store.serialize())
+                for chunk in store.stream():
+                    f.write(chunk)
 
             self.stdout.write("Created '%s'" % (f.name))
             return
@@ -24,6 +24,7 @@ from pootle_app.models.permissions import check_user_permission
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import TRANSLATED
 from pootle_store.models import Store
+from pootle_store.store.deserialize import get_parsed_store_cache
 
 from .exceptions import (FileImportError, MissingPootlePathError,
                          MissingPootleRevError, UnsupportedFiletypeError)
@@ -33,7 +34,10 @@ logger = logging.getLogger(__name__)
 
 
 def import_file(f, user=None):
-    ttk = getclass(f)(f.read())
+    ttk = get_parsed_store_cache().parse(
+        f.read(),
+        lambda data: getclass(f)(data),
+        f.name)
     if not hasattr(ttk, "parseheader"):
         raise UnsupportedFiletypeError(_("Unsupported filetype '%s', only PO "
                                          "files are supported at this time\n",
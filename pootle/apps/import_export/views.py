@@ -12,7 +12,7 @@ from io import BytesIO
 from zipfile import ZipFile, is_zipfile
 
 from django.contrib.auth import get_user_model
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 
 from pootle.core.delegate import language_team
@@ -25,8 +25,12 @@ from .forms import UploadForm
 from .utils import TPTMXExporter, import_file
 
 
-def download(contents, name, content_type):
-    response = HttpResponse(contents, content_type=content_type)
+def download(contents, name, content_type, streaming=False):
+    response_class = (
+        StreamingHttpResponse
+        if streaming
+        else HttpResponse)
+    response = response_class(contents, content_type=content_type)
     response["Content-Disposition"] = "attachment; filename=%s" % (name)
     return response
 
@@ -48,10 +52,9 @@ def export(request):
 
     if num_items == 1:
         store = stores.get()
-        contents = BytesIO(store.serialize())
         name = os.path.basename(store.pootle_path)
-        contents.seek(0)
-        return download(contents.read(), name, "application/octet-stream")
+        return download(
+            store.stream(), name, "application/octet-stream", streaming=True)
 
     # zip all the stores together
     f = BytesIO()
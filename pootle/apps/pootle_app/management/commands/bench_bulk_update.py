@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import os
+import time
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from bulk_update.helper import bulk_update as helper_bulk_update
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pootle.core.bulk import get_update_engine
+from pootle_store.models import Unit
+
+
+DEFAULT_ROWS = (10000, 100000, 1000000)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the native bulk update engine with the django-bulk-update "
+        "helper. All changes are rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            action='append',
+            type=int,
+            dest='rows',
+            help='Number of units to update (can be repeated)',
+        )
+        parser.add_argument(
+            '--field',
+            action='store',
+            dest='field',
+            default='revision',
+            help='Integer Unit field to update',
+        )
+
+    def get_units(self, rows, field):
+        units = list(
+            Unit.objects.only("id", field).order_by("pk")[:rows])
+        for unit in units:
+            setattr(unit, field, getattr(unit, field) + 1)
+        return units
+
+    def time_update(self, update_method, units, field):
+        start = time.time()
+        with transaction.atomic():
+            update_method(units, field)
+            transaction.set_rollback(True)
+        return time.time() - start
+
+    def helper_update(self, units, field):
+        helper_bulk_update(units, update_fields=[field])
+
+    def engine_update(self, units, field):
+        get_update_engine(Unit).update(units, fields=[field])
+
+    def handle(self, **options):
+        field = options["field"]
+        if Unit._meta.get_field(field).get_internal_type() not in (
+                "IntegerField", "PositiveIntegerField",
+                "BigIntegerField", "SmallIntegerField"):
+            raise CommandError("'%s' is not an integer field" % field)
+        engine = get_update_engine(Unit).__class__.__name__
+        for rows in options["rows"] or DEFAULT_ROWS:
+            units = self.get_units(rows, field)
+            helper_time = self.time_update(self.helper_update, units, field)
+            engine_time = self.time_update(self.engine_update, units, field)
+            self.stdout.write(
+                "%s rows: helper %.3fs, %s %.3fs"
+                % (len(units), helper_time, engine, engine_time))
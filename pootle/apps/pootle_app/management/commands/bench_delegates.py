@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import os
+import time
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from django.core.management.base import BaseCommand
+
+from pootle.core import delegate
+from pootle.core.plugin.delegate import Getter, Provider
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure receiver dispatch throughput for Pootle's providers and "
+        "getters, with and without the resolved receiver cache.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            action='store',
+            type=int,
+            dest='iterations',
+            default=10000,
+            help='Number of lookups to time for each delegate and sender',
+        )
+        parser.add_argument(
+            '--delegate',
+            action='append',
+            dest='delegates',
+            help='Delegate to benchmark (can be repeated)',
+        )
+
+    def get_delegates(self, names=None):
+        for name in sorted(names or dir(delegate)):
+            signal = getattr(delegate, name, None)
+            if isinstance(signal, (Getter, Provider)) and signal.receivers:
+                yield name, signal
+
+    def get_senders(self, signal):
+        senders = set([None])
+        for (receiverkey_, senderkey), receiver_ in signal.receivers:
+            sender = signal._sender_map.get(senderkey)
+            if isinstance(sender, type):
+                senders.add(sender)
+        return senders
+
+    def time_lookups(self, lookup, sender, iterations):
+        start = time.time()
+        for i in xrange(iterations):
+            lookup(sender)
+        return time.time() - start
+
+    def handle(self, **options):
+        iterations = options["iterations"]
+        for name, signal in self.get_delegates(options["delegates"]):
+            for sender in self.get_senders(signal):
+                resolved = self.time_lookups(
+                    signal._resolve_receivers, sender, iterations)
+                signal._live_receivers(sender)
+                cached = self.time_lookups(
+                    signal._live_receivers, sender, iterations)
+                self.stdout.write(
+                    "%s [%s]: %d/s uncached, %d/s cached"
+                    % (name,
+                       getattr(sender, "__name__", sender),
+                       iterations / max(resolved, 1e-9),
+                       iterations / max(cached, 1e-9)))
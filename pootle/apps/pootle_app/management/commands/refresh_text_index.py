@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from django.core.management.base import CommandError
+
+from pootle_store.unit.textindex import get_text_index
+
+from . import PootleCommand
+
+
+class Command(PootleCommand):
+    help = "Rebuild the unit text index used to narrow down text searches."
+    process_disabled_projects = True
+
+    def handle_all_stores(self, translation_project, **options):
+        self.stdout.write(
+            u"Building text index for %s" % translation_project)
+        get_text_index().build(translation_project.pk)
+
+    def handle_all(self, **options):
+        if not get_text_index():
+            raise CommandError("POOTLE_TEXT_INDEX_DIRECTORY is not set")
+        super(Command, self).handle_all(**options)
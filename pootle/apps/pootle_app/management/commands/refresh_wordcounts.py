@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+
+from pootle.core.delegate import wordcount
+from pootle.core.signals import update_data
+from pootle_store.models import Store, Unit, UnitSource
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the source wordcounts of units, counting each distinct "
+        "source string once.")
+    chunk_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project',
+            action='append',
+            dest='projects',
+            help='Project to refresh',
+        )
+        parser.add_argument(
+            '--language',
+            action='append',
+            dest='languages',
+            help='Language to refresh',
+        )
+
+    def get_unit_sources(self, **options):
+        unit_sources = UnitSource.objects.exclude(source_hash__isnull=True)
+        if options["projects"]:
+            unit_sources = unit_sources.filter(
+                unit__store__translation_project__project__code__in=(
+                    options["projects"]))
+        if options["languages"]:
+            unit_sources = unit_sources.filter(
+                unit__store__translation_project__language__code__in=(
+                    options["languages"]))
+        return unit_sources
+
+    def get_source_hashes(self, unit_sources):
+        """Maps the id of one unit for each distinct source hash to the
+        hash.
+        """
+        unit_ids = unit_sources.order_by().values("source_hash").annotate(
+            unit_id=Min("unit_id"))
+        return dict(unit_ids.values_list("unit_id", "source_hash"))
+
+    def count(self, unit_sources):
+        """Groups the distinct source hashes by their wordcount."""
+        counter = wordcount.get(Unit)
+        counter.clear()
+        source_hashes = self.get_source_hashes(unit_sources)
+        unit_ids = list(source_hashes)
+        counts = {}
+        for i in xrange(0, len(unit_ids), self.chunk_size):
+            units = Unit.objects.filter(
+                id__in=unit_ids[i:i + self.chunk_size]).values_list(
+                    "id", "source_f")
+            for unit_id, source in units:
+                source_hash = source_hashes[unit_id]
+                counts.setdefault(
+                    counter.count_source(source, source_hash),
+                    []).append(source_hash)
+        return len(unit_ids), counts
+
+    def update(self, unit_sources, counts):
+        stores = set()
+        updated = 0
+        for source_wordcount, source_hashes in counts.items():
+            for i in xrange(0, len(source_hashes), self.chunk_size):
+                stale = unit_sources.filter(
+                    source_hash__in=source_hashes[i:i + self.chunk_size])
+                stale = stale.exclude(source_wordcount=source_wordcount)
+                stores.update(
+                    stale.values_list("unit__store_id", flat=True))
+                updated += stale.update(source_wordcount=source_wordcount)
+        return updated, stores
+
+    def update_data(self, stores):
+        tps = set()
+        stores = Store.objects.filter(pk__in=stores).select_related(
+            "translation_project")
+        for store in stores.iterator():
+            update_data.send(store.__class__, instance=store)
+            tps.add(store.translation_project)
+        for tp in tps:
+            update_data.send(tp.__class__, instance=tp)
+
+    def handle(self, **options):
+        unit_sources = self.get_unit_sources(**options)
+        sources, counts = self.count(unit_sources)
+        updated, stores = self.update(unit_sources, counts)
+        self.update_data(stores)
+        self.stdout.write(
+            "Counted %s distinct sources, updated %s units in %s stores"
+            % (sources, updated, len(stores)))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import argparse
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from pootle.core.instrumentation import instrumentation
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a command, and print call counts and timings for the signal, "
+        "provider and getter receivers it called.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sort',
+            action='store',
+            dest='sort',
+            default='total',
+            choices=['calls', 'total', 'max'],
+            help='Sort receivers by',
+        )
+        parser.add_argument(
+            '--limit',
+            action='store',
+            type=int,
+            dest='limit',
+            default=50,
+            help='Number of receivers to show (0 for all)',
+        )
+        parser.add_argument(
+            'subcommand',
+            help='Command to run',
+        )
+        parser.add_argument(
+            'subcommand_args',
+            nargs=argparse.REMAINDER,
+            help='Arguments for the command',
+        )
+
+    def handle(self, **options):
+        with instrumentation.collect() as stats:
+            call_command(
+                options["subcommand"],
+                *options["subcommand_args"])
+        self.stdout.write(
+            "%8s %11s %11s  %s"
+            % ("calls", "total", "max", "signal [sender] -> receiver"))
+        for line in stats.format_summary(sort=options["sort"],
+                                         limit=options["limit"]):
+            self.stdout.write(line)
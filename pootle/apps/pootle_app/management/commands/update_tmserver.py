@@ -12,22 +12,105 @@ from hashlib import md5
 # This must be run before importing Django.
 os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
 
-from elasticsearch import Elasticsearch, helpers
 from translate.storage import factory
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import dateparse
 from django.utils.encoding import force_bytes
+from django.utils.module_loading import import_string
 
+from pootle.core.search.backends import NgramSearchBackend
 from pootle.core.utils import dateformat
 from pootle_store.models import Unit
 from pootle_translationproject.models import TranslationProject
 
 
+try:
+    from elasticsearch import Elasticsearch, helpers
+except ImportError:
+    Elasticsearch = None
+
+
 BULK_CHUNK_SIZE = 5000
 
 
+class ElasticSearchTM(object):
+
+    def __init__(self, tm_name, tm_settings):
+        self.INDEX_NAME = tm_settings['INDEX_NAME']
+        self.es = Elasticsearch([
+            {
+                'host': tm_settings['HOST'],
+                'port': tm_settings['PORT'],
+            }], retry_on_timeout=True
+        )
+
+    @property
+    def exists(self):
+        return self.es.indices.exists(self.INDEX_NAME)
+
+    def create(self):
+        self.es.indices.create(index=self.INDEX_NAME)
+
+    def delete(self):
+        self.es.indices.delete(index=self.INDEX_NAME)
+
+    def get_max_revision(self):
+        result = self.es.search(
+            index=self.INDEX_NAME,
+            body={
+                'aggs': {
+                    'max_revision': {
+                        'max': {
+                            'field': 'revision'
+                        }
+                    }
+                }
+            }
+        )
+        return result['aggregations']['max_revision']['value']
+
+    def bulk(self, actions):
+        helpers.bulk(self.es, actions)
+
+
+class NgramTM(object):
+
+    def __init__(self, tm_name, tm_settings):
+        self.backend = NgramSearchBackend(tm_name)
+
+    @property
+    def exists(self):
+        return self.backend.exists
+
+    def create(self):
+        # the index files are created when translations are added
+        pass
+
+    def delete(self):
+        self.backend.delete()
+
+    def get_max_revision(self):
+        return self.backend.get_max_revision()
+
+    def bulk(self, actions):
+        languages = {}
+        for action in actions:
+            obj = {
+                k: v
+                for k, v
+                in action.items()
+                if not k.startswith('_')}
+            obj['id'] = action['_id']
+            languages.setdefault(action['_type'], []).append(obj)
+            if len(languages[action['_type']]) == BULK_CHUNK_SIZE:
+                self.backend.bulk_update(
+                    action['_type'], languages.pop(action['_type']))
+        for language, objs in languages.items():
+            self.backend.bulk_update(language, objs)
+
+
 class BaseParser(object):
 
     def __init__(self, *args, **kwargs):
@@ -302,12 +385,13 @@ class Command(BaseCommand):
         self.INDEX_NAME = self.tm_settings['INDEX_NAME']
         self.is_local_tm = options['tm'] == 'local'
 
-        self.es = Elasticsearch([
-            {
-                'host': self.tm_settings['HOST'],
-                'port': self.tm_settings['PORT'],
-            }], retry_on_timeout=True
-        )
+        engine = import_string(self.tm_settings['ENGINE'])
+        if issubclass(engine, NgramSearchBackend):
+            self.tm = NgramTM(options['tm'], self.tm_settings)
+        elif Elasticsearch is None:
+            raise CommandError('The elasticsearch package is not installed.')
+        else:
+            self.tm = ElasticSearchTM(options['tm'], self.tm_settings)
 
         # If files to import have been provided.
         if options['files']:
@@ -335,22 +419,9 @@ class Command(BaseCommand):
 
         if (not options['rebuild'] and
             not options['refresh'] and
-            self.es.indices.exists(self.INDEX_NAME)):
-
-            result = self.es.search(
-                index=self.INDEX_NAME,
-                body={
-                    'aggs': {
-                        'max_revision': {
-                            'max': {
-                                'field': 'revision'
-                            }
-                        }
-                    }
-                }
-            )
-            self.last_indexed_revision = \
-                result['aggregations']['max_revision']['value'] or -1
+            self.tm.exists):
+
+            self.last_indexed_revision = self.tm.get_max_revision() or -1
 
         self.parser.last_indexed_revision = self.last_indexed_revision
 
@@ -362,20 +433,20 @@ class Command(BaseCommand):
 
         if (options['rebuild'] and
             not options['dry_run'] and
-            self.es.indices.exists(self.INDEX_NAME)):
+            self.tm.exists):
 
-            self.es.indices.delete(index=self.INDEX_NAME)
+            self.tm.delete()
 
         if (not options['dry_run'] and
-            not self.es.indices.exists(self.INDEX_NAME)):
+            not self.tm.exists):
 
-            self.es.indices.create(index=self.INDEX_NAME)
+            self.tm.create()
 
         if self.is_local_tm:
             self._set_latest_indexed_revision(**options)
 
         if isinstance(self.parser, FileParser):
-            helpers.bulk(self.es, self._parse_translations(**options))
+            self.tm.bulk(self._parse_translations(**options))
             return
 
         # If we are parsing from DB.
@@ -386,4 +457,4 @@ class Command(BaseCommand):
 
         for tp in tp_qs:
             self.parser.tp_pk = tp.pk
-            helpers.bulk(self.es, self._parse_translations(**options))
+            self.tm.bulk(self._parse_translations(**options))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from translate.filters.decorators import Category
+
+from .constants import CATEGORY_BITS, CHECK_BITS, UNKNOWN_CHECK_BIT
+
+
+def get_check_bits(name, category):
+    """Returns the ``Unit.checks_bitmap`` bits for an active check"""
+    return (
+        (1 << CHECK_BITS.get(name, UNKNOWN_CHECK_BIT))
+        | (1 << CATEGORY_BITS.get(
+            category,
+            CATEGORY_BITS[Category.NO_CATEGORY])))
+
+
+def get_checks_bitmap(checks):
+    """Returns the ``Unit.checks_bitmap`` for active ``checks``, an iterable
+    of ``(name, category)`` pairs.
+    """
+    bitmap = 0
+    for name, category in checks:
+        bitmap |= get_check_bits(name, category)
+    return bitmap
+
+
+def get_checks_mask(names):
+    """Returns a mask matching bitmaps with any of the checks ``names``, or
+    ``None`` if any of the checks have no bit.
+    """
+    mask = 0
+    for name in names:
+        if name not in CHECK_BITS:
+            return None
+        mask |= 1 << CHECK_BITS[name]
+    return mask
+
+
+def get_category_mask(category):
+    """Returns a mask matching bitmaps with checks of ``category``"""
+    return 1 << CATEGORY_BITS.get(
+        category,
+        CATEGORY_BITS[Category.NO_CATEGORY])
+
+
+def get_bitmap_checks(bitmap):
+    return [
+        name
+        for name, bit
+        in CHECK_BITS.items()
+        if bitmap & (1 << bit)]
+
+
+def get_bitmap_categories(bitmap):
+    return [
+        category
+        for category, bit
+        in CATEGORY_BITS.items()
+        if bitmap & (1 << bit)]
+
+
+def get_bitmap_check_counts(bitmaps):
+    """Counts the active checks by category and name, from a dict of unit
+    bitmaps and the number of units with each bitmap.
+
+    The category of a check is told from the bitmaps of units with checks of
+    only one category. Returns ``None`` if the categories of all the checks
+    cant be told, or if any of the checks have no bit.
+    """
+    categories = {}
+    for bitmap in bitmaps:
+        if bitmap & (1 << UNKNOWN_CHECK_BIT):
+            return None
+        bitmap_categories = get_bitmap_categories(bitmap)
+        if len(bitmap_categories) == 1:
+            for name in get_bitmap_checks(bitmap):
+                categories[name] = bitmap_categories[0]
+    counts = {}
+    for bitmap, count in bitmaps.items():
+        for name in get_bitmap_checks(bitmap):
+            if name not in categories:
+                return None
+            counts[name] = counts.get(name, 0) + count
+    return [
+        dict(category=categories[name], name=name, count=count)
+        for name, count
+        in counts.items()]
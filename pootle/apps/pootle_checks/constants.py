@@ -84,6 +84,32 @@ CHECK_NAMES = {
     'niciun_nicio': _(u'Romanian: Use "niciun"/"nicio"')}
 
 
+#: Bit positions of the checks in ``Unit.checks_bitmap``. As the bitmaps are
+#: stored in the db, new checks must only be added to the end.
+CHECK_BITS = OrderedDict(
+    (name, bit)
+    for bit, name
+    in enumerate((
+        'accelerators', 'acronyms', 'blank', 'brackets', 'compendiumconflicts',
+        'credits', 'dialogsizes', 'doublequoting', 'doublespacing',
+        'doublewords', 'emails', 'endpunc', 'endwhitespace', 'escapes',
+        'filepaths', 'functions', 'gconf', 'isfuzzy', 'kdecomments', 'long',
+        'musttranslatewords', 'newlines', 'nplurals', 'notranslatewords',
+        'numbers', 'options', 'printf', 'puncspacing', 'purepunc',
+        'pythonbraceformat', 'sentencecount', 'short', 'simplecaps',
+        'simpleplurals', 'singlequoting', 'startcaps', 'startpunc',
+        'startwhitespace', 'tabs', 'unchanged', 'untranslated', 'urls',
+        'validchars', 'variables', 'validxml', 'xmltags', 'ftl_format',
+        'cedillas', 'niciun_nicio')))
+#: Bit set for active checks that have no bit of their own
+UNKNOWN_CHECK_BIT = 57
+#: Bit positions of the categories of the active checks
+CATEGORY_BITS = OrderedDict(
+    (category, bit)
+    for bit, category
+    in enumerate(CATEGORY_IDS.values(), start=58))
+
+
 EXCLUDED_FILTERS = [
     'hassuggestion',
     'spellcheck',
@@ -30,6 +30,8 @@ def handle_unit_checks(**kwargs):
     unit = kwargs["instance"]
     keep_false_positives = kwargs.get("keep_false_positives", False)
     unit.update_qualitychecks(keep_false_positives=keep_false_positives)
+    Unit.objects.filter(pk=unit.pk).update_checks_bitmap()
+    unit.refresh_from_db(fields=["checks_bitmap"])
 
 
 @receiver(toggle, sender=QualityCheck)
@@ -42,6 +44,8 @@ def handle_toggle_quality_check(**kwargs):
     subs = []
     check.false_positive = false_positive
     check.save()
+    Unit.objects.filter(pk=unit.pk).update_checks_bitmap()
+    unit.refresh_from_db(fields=["checks_bitmap"])
     if check.false_positive:
         subs.append(
             unit_lifecycle.sub_mute_qc(quality_check=check,
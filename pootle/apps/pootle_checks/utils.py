@@ -151,6 +151,7 @@ class QualityCheckUpdater(object):
         self.stores = stores
         self._units = units
         self._updated_stores = {}
+        self._updated_units = set()
 
     @cached_property
     def checks(self):
@@ -236,14 +237,24 @@ class QualityCheckUpdater(object):
         with bulk_operations(QualityCheck):
             self.update_untranslated()
             self.update_translated()
+        self.update_checks_bitmap()
         updated = self.updated_stores
         if update_data_after:
             self.update_data(updated)
         if "checks" in self.__dict__:
             del self.__dict__["checks"]
         self._updated_stores = {}
+        self._updated_units = set()
         return updated
 
+    def update_checks_bitmap(self, chunk_size=1000):
+        """Syncs ``Unit.checks_bitmap`` for units with updated checks
+        """
+        unit_ids = list(self._updated_units)
+        for i in xrange(0, len(unit_ids), chunk_size):
+            Unit.objects.filter(
+                pk__in=unit_ids[i:i + chunk_size]).update_checks_bitmap()
+
     def update_data(self, updated):
         if not updated:
             return
@@ -271,6 +282,7 @@ class QualityCheckUpdater(object):
             self.check_names)
         if checker.update():
             self.update_store(unit.tp, unit.store)
+            self._updated_units.add(unit.id)
             return True
         return False
 
@@ -294,7 +306,7 @@ class QualityCheckUpdater(object):
             self.units.filter(state__gt=UNTRANSLATED)
                       .order_by("store", "index"))
         updated_count = 0
-        for unit in translated.values(*unit_fields).iterator():
+        for unit in translated.raw_values(*unit_fields):
             if self.translation_project is not None:
                 # if TP is set then manually add TP.id to the Unit value dict
                 unit[tp_key] = self.translation_project.id
@@ -318,6 +330,8 @@ class QualityCheckUpdater(object):
             "unit__store__translation_project", "unit__store").distinct()
         for tp, store in untranslated_stores.iterator():
             self.update_store(tp, store)
+        self._updated_units.update(
+            untranslated.values_list("unit_id", flat=True))
         return untranslated.delete()
 
 
@@ -347,6 +361,7 @@ class StoreQCUpdater(QualityCheckUpdater):
         self.check_names = check_names
         self.store = store
         self._updated_stores = {}
+        self._updated_units = set()
         self._units = units
 
     def log_debug(self):
@@ -396,7 +411,7 @@ class StoreQCUpdater(QualityCheckUpdater):
             self.units.filter(state__gt=UNTRANSLATED)
                       .order_by("store", "index"))
         updated_count = 0
-        for unit in translated.values(*unit_fields).iterator():
+        for unit in translated.raw_values(*unit_fields):
             unit["store__translation_project__id"] = self.translation_project.id
             unit["store__id"] = self.store.id
             unit["store__translation_project__language__code"] = lang_code
@@ -9,10 +9,12 @@
 from translate.filters.decorators import Category
 
 from django.db import models
-from django.db.models import Case, Count, Max, Q, When
+from django.db.models import Case, Count, Max, Q, Sum, When
+from django.db.models.functions import Coalesce
 
 from pootle.core.bulk import BulkCRUD
 from pootle.core.signals import update_data, update_revisions
+from pootle_checks.bitmap import get_bitmap_check_counts
 from pootle_statistics.models import Submission
 from pootle_store.constants import FUZZY, OBSOLETE, TRANSLATED
 from pootle_store.models import QualityCheck
@@ -141,6 +143,15 @@ class StoreDataUpdater(DataUpdater):
     def get_checks(self, **kwargs):
         if self.store.obsolete:
             return []
+        bitmaps = (
+            self.units.exclude(checks_bitmap=0)
+                      .order_by()
+                      .values_list("checks_bitmap")
+                      .annotate(count=Count("id")))
+        checks = get_bitmap_check_counts(dict(bitmaps))
+        if checks is not None:
+            return checks
+        # some checks have no bit, or their category cant be told
         return (
             QualityCheck.objects.exclude(false_positive=True)
                         .filter(unit__store_id=self.store.id)
@@ -160,9 +171,9 @@ class StoreDataUpdater(DataUpdater):
 
     def get_pending_suggestions(self, **kwargs):
         """Return the count of pending suggetions for the store"""
-        return (
-            self.units.filter(suggestion__state__name="pending")
-                      .values_list("suggestion").count())
+        return self.units.aggregate(
+            pending=Coalesce(
+                Sum("pending_suggestion_count"), 0))["pending"]
 
     def get_store_data(self, **kwargs):
         if self.store.obsolete:
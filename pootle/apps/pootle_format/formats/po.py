@@ -20,6 +20,22 @@ from pootle_store.syncer import StoreSyncer
 
 
 class PoStoreSyncer(StoreSyncer):
+    streamable = True
+
+    def stream(self, include_obsolete=False, raw=False, headers=None):
+        """Yields the header and then each unit of the converted store."""
+        output = self.file_class()
+        output.settargetlanguage(self.language.code)
+        self.set_headers(output, headers)
+        header = str(output)
+        if header:
+            yield header
+        for unit in self.get_units(include_obsolete).iterator():
+            newunit = self.unit_sync_class(unit, raw=raw).convert(
+                output.UnitClass)
+            # units are separated by a blank line
+            yield "%s%s" % (header and "\n" or "", str(newunit))
+            header = True
 
     def get_latest_submission(self, mtime):
         user_displayname = None
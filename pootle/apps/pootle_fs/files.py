@@ -6,6 +6,7 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import io
 import logging
 import os
 
@@ -19,6 +20,7 @@ from pootle.core.proxy import AttributeProxy
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
 from pootle_store.models import Store
+from pootle_store.store.deserialize import get_parsed_store_cache
 
 
 logger = logging.getLogger(__name__)
@@ -199,17 +201,31 @@ class FSFile(object):
             return
         if self.file_exists:
             with open(self.file_path) as f:
-                f = AttributeProxy(f)
-                f.location_root = self.store_fs.project.local_fs_path
-                store_file = (
-                    self.store.syncer.file_class(f)
-                    if self.store and self.store.syncer.file_class
-                    else getclass(f)(f.read()))
+                data = f.read()
+            file_class = (
+                self.store
+                and self.store.syncer.file_class
+                or None)
+            store_file = get_parsed_store_cache().parse(
+                data,
+                self._parse_file,
+                self.file_path,
+                file_class)
             if store_file.units:
                 return store_file
         if self.store_exists:
             return self.store.deserialize(self.store.serialize())
 
+    def _parse_file(self, data):
+        f = io.BytesIO(data)
+        f.name = self.file_path
+        f = AttributeProxy(f)
+        f.location_root = self.store_fs.project.local_fs_path
+        return (
+            self.store.syncer.file_class(f)
+            if self.store and self.store.syncer.file_class
+            else getclass(f)(f.read()))
+
     def serialize(self):
         if not self.store_exists:
             return
@@ -253,6 +269,7 @@ class FSFile(object):
             submission_type=SubmissionTypes.SYSTEM,
             user=self.latest_user,
             store_revision=revision,
-            resolve_conflict=resolve_conflict)
+            resolve_conflict=resolve_conflict,
+            batched=True)
         logger.debug("Pulled file: %s", self.path)
         return update_revision
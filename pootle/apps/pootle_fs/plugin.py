@@ -11,14 +11,13 @@ import os
 import shutil
 import uuid
 
-from bulk_update.helper import bulk_update
-
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils.functional import cached_property
 from django.utils.lru_cache import lru_cache
 
+from pootle.core.bulk import bulk_update
 from pootle.core.delegate import (
     config, response as pootle_response, revision, state as pootle_state)
 from pootle_app.models import Directory
@@ -225,7 +225,7 @@ class LanguageSuggestionAdminForm(LanguageTeamFormtableForm):
         tps = self.language.translationproject_set.exclude(
             project__disabled=True)
         tps = tps.filter(
-            stores__unit__suggestion__state__name="pending")
+            stores__unit__pending_suggestion_count__gt=0)
         return tps.order_by("project__code").distinct()
 
     @property
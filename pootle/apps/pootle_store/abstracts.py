@@ -165,6 +165,22 @@ class AbstractUnit(models.Model, base.TranslationUnit):
                                          editable=False, null=True)
     mtime = models.DateTimeField(auto_now=True, db_index=True, editable=False)
 
+    # active quality checks and their categories, see
+    # ``pootle_checks.constants.CHECK_BITS``
+    checks_bitmap = models.BigIntegerField(default=0, editable=False)
+
+    # creation time of the latest pending suggestion, kept for sorting
+    suggested_on = models.DateTimeField(db_index=True, editable=False,
+                                        null=True)
+    # number of pending suggestions, kept for filtering and stats
+    pending_suggestion_count = models.PositiveIntegerField(
+        db_index=True, default=0, editable=False)
+
+    # hash of the content compared when diffing stores, see
+    # ``pootle_store.diff.get_content_hash``
+    content_hash = models.CharField(blank=True, default="", editable=False,
+                                    max_length=32)
+
     class Meta(object):
         abstract = True
 
@@ -276,6 +292,8 @@ class AbstractSuggestion(models.Model, base.TranslationUnit):
 
     class Meta(object):
         abstract = True
+        index_together = [
+            ["user", "state"]]
 
     target_f = MultiStringField()
     target_hash = models.CharField(max_length=32, db_index=True)
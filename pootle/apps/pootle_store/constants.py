@@ -18,9 +18,13 @@ ALLOWED_SORTS = {
         'oldest': 'change__submitted_on',
         'newest': '-change__submitted_on',
     },
-    'suggestions': {
-        'oldest': 'suggestion__creation_time',
-        'newest': '-suggestion__creation_time',
+    'pending_suggestions': {
+        'oldest': 'suggested_on',
+        'newest': '-suggested_on',
+    },
+    'user_suggestions': {
+        'oldest': 'user_suggested_on',
+        'newest': '-user_suggested_on',
     },
     'submissions': {
         'oldest': 'submission__creation_time',
@@ -30,7 +34,7 @@ ALLOWED_SORTS = {
 
 #: List of fields from `ALLOWED_SORTS` that can be sorted by simply using
 #: `order_by(field)`
-SIMPLY_SORTED = ['units']
+SIMPLY_SORTED = ['units', 'pending_suggestions', 'user_suggestions']
 
 #
 # Store States
@@ -47,6 +51,10 @@ CHECKED = 2
 POOTLE_WINS = 1
 SOURCE_WINS = 2
 
+#: Space left between the indexes of consecutive units, so that units can
+#: be inserted without changing the indexes of the units that follow
+UNIT_INDEX_GAP = 1024
+
 LANGUAGE_REGEX = r"[^/]{2,255}"
 PROJECT_REGEX = r"[^/]{1,255}"
 
@@ -17,6 +17,7 @@ from pootle_data.models import StoreChecksData, StoreData, TPChecksData, TPData
 from pootle_score.models import UserStoreScore
 
 from .models import Unit
+from .utils import collected_submissions
 
 
 class Updated(object):
@@ -104,3 +105,26 @@ def update_store_after(sender, **kwargs):
         kwargs.update(kwargs.pop("kwargs"))
     kwargs.get("callback", _callback_handler)(
         sender, updated, **kwargs)
+
+
+@contextmanager
+def bulk_submissions(sender, batch_size=1000):
+    """Collects the submissions created for units of store `sender` and
+    saves them together when the context exits.
+
+    Until then they are not in the unit's ``submission_set``, see
+    ``CollectedSubmissions``.
+    """
+    if collected_submissions.subs is not None:
+        # an outer context will save them
+        yield
+        return
+    collected_submissions.subs = []
+    collected_submissions.sender = sender
+    collected_submissions.batch_size = batch_size
+    try:
+        yield
+        collected_submissions.flush()
+    finally:
+        collected_submissions.subs = None
+        collected_submissions.sender = None
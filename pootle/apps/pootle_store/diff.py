@@ -9,19 +9,27 @@
 import difflib
 import logging
 from collections import OrderedDict
+from hashlib import md5
 
 from django.db import models
+from django.utils.encoding import force_bytes, force_text
 from django.utils.functional import cached_property
 
 from pootle.core.delegate import format_diffs
 
-from .constants import FUZZY, OBSOLETE, TRANSLATED, UNTRANSLATED
+from .constants import (FUZZY, OBSOLETE, TRANSLATED, UNIT_INDEX_GAP,
+                        UNTRANSLATED)
 from .fields import to_python as multistring_to_python
 from .unit import UnitProxy
 
 
 logger = logging.getLogger(__name__)
 
+# the ``Unit`` fields hashed in ``Unit.content_hash``
+CONTENT_HASH_FIELDS = (
+    "context", "developer_comment", "locations", "source_f", "state",
+    "target_f", "translator_comment")
+
 
 class UnitDiffProxy(UnitProxy):
     """Wraps File/DB Unit dicts used by StoreDiff for equality comparison"""
@@ -36,6 +44,22 @@ class UnitDiffProxy(UnitProxy):
     def __ne__(self, other):
         return not self == other
 
+    @property
+    def content_hash(self):
+        """Hash of the values compared for equality.
+
+        Units with the same hash are equal.
+        """
+        content = []
+        for k in self.match_attrs:
+            v = getattr(self, k)
+            if hasattr(v, "strings"):
+                v = tuple(force_text(string) for string in v.strings)
+            elif isinstance(v, basestring):
+                v = force_text(v)
+            content.append(v)
+        return md5(force_bytes(repr(content))).hexdigest()
+
     def hasplural(self):
         return (
             self.source is not None
@@ -62,6 +86,12 @@ class DBUnit(UnitDiffProxy):
     pass
 
 
+def get_content_hash(unit):
+    """Returns the ``content_hash`` of a ``Unit``"""
+    return DBUnit(
+        {k: getattr(unit, k) for k in CONTENT_HASH_FIELDS}).content_hash
+
+
 class FileUnit(UnitDiffProxy):
 
     @property
@@ -92,7 +122,7 @@ class DiffableStore(object):
     unit_fields = (
         "unitid", "state", "id", "index", "revision",
         "source_f", "target_f", "developer_comment",
-        "translator_comment", "locations", "context")
+        "translator_comment", "locations", "context", "content_hash")
 
     def __init__(self, target_store, source_store):
         self.target_store = target_store
@@ -100,7 +130,7 @@ class DiffableStore(object):
 
     def get_db_units(self, unit_qs):
         diff_units = OrderedDict()
-        units = unit_qs.values(*self.unit_fields).order_by("index")
+        units = unit_qs.order_by("index").raw_values(*self.unit_fields)
         for unit in units:
             diff_units[unit["unitid"]] = unit
         return diff_units
@@ -150,6 +180,46 @@ class DiffableStore(object):
             return self.get_db_units(self.source_store.unit_set.live())
         return self.get_file_units(self.source_store.units)
 
+    def get_unit_hashes(self, units, unit_class):
+        """Returns the content hashes of ``units``, using those stored for db
+        units where they have one.
+        """
+        return OrderedDict(
+            (unitid,
+             unit.get("content_hash") or unit_class(unit).content_hash)
+            for unitid, unit
+            in units.items())
+
+    def get_store_hash(self, unit_hashes):
+        return md5(
+            force_bytes(
+                repr(unit_hashes.items()))).hexdigest()
+
+    @cached_property
+    def target_hashes(self):
+        return self.get_unit_hashes(
+            self.target_units, self.target_unit_class)
+
+    @cached_property
+    def source_hashes(self):
+        return self.get_unit_hashes(
+            self.source_units, self.source_unit_class)
+
+    @cached_property
+    def target_store_hash(self):
+        """Hash of the active target units, in order"""
+        return self.get_store_hash(
+            OrderedDict(
+                (unitid, unit_hash)
+                for unitid, unit_hash
+                in self.target_hashes.items()
+                if self.target_units[unitid]["state"] != OBSOLETE))
+
+    @cached_property
+    def source_store_hash(self):
+        """Hash of the source units, in order"""
+        return self.get_store_hash(self.source_hashes)
+
     @property
     def target_unit_class(self):
         return self.db_unit_class
@@ -201,48 +271,71 @@ class StoreDiff(object):
         """All of the db units regardless of state or revision"""
         return self.diffable.source_units
 
+    def get_target_index(self, i):
+        """Index of the active target unit at position ``i``, or ``None``
+        if there is no unit at that position.
+        """
+        if i < len(self.active_target_units):
+            return self.target_units[self.active_target_units[i]]["index"]
+
+    def get_insert_indexes(self, insert_at, next_index, count):
+        """Returns the indexes for ``count`` units inserted after
+        ``insert_at`` and before ``next_index``, and the delta that units
+        from ``next_index`` on have to be moved by to make room for them.
+
+        Units are spaced evenly in the gap between their neighbours, so most
+        inserts don't move any other units. If the gap is too small the
+        following units are moved, leaving a gap of ``UNIT_INDEX_GAP``
+        around each inserted unit.
+        """
+        gap = UNIT_INDEX_GAP
+        delta = 0
+        if next_index is not None:
+            space = next_index - insert_at
+            if space > count:
+                gap = space // (count + 1)
+            else:
+                delta = insert_at + gap * (count + 1) - next_index
+        return [insert_at + gap * (i + 1) for i in xrange(count)], delta
+
     @cached_property
     def insert_points(self):
         """Returns a list of insert points with update index info.
         :return: a list of tuples
-            ``(insert_at, uids_to_add, next_index, update_index_delta)`` where
-            ``insert_at`` is the point for inserting
+            ``(uids_to_add, indexes, next_index, update_index_delta)`` where
             ``uids_to_add`` are the units to be inserted
+            ``indexes`` are the indexes of the inserted units
             ``update_index_delta`` is the offset for index updating
             ``next_index`` is the starting point after which
             ``update_index_delta`` should be applied.
+
+        Indexes are given after the updates of any previous insert points
+        have been applied.
         """
         inserts = []
+        offset = 0
         new_unitid_list = self.new_unit_list
         for (tag, i1, i2, j1, j2) in self.opcodes:
             if tag == 'insert':
-                update_index_delta = 0
                 insert_at = 0
                 if i1 > 0:
-                    insert_at = (
-                        self.target_units[
-                            self.active_target_units[i1 - 1]]['index'])
-                next_index = insert_at + 1
-                if i1 < len(self.active_target_units):
-                    next_index = self.target_units[
-                        self.active_target_units[i1]]["index"]
-                    update_index_delta = (
-                        j2 - j1 - next_index + insert_at + 1)
-
-                inserts.append((insert_at,
-                                new_unitid_list[j1:j2],
-                                next_index,
-                                update_index_delta))
-
+                    insert_at = self.get_target_index(i1 - 1)
+                next_index = self.get_target_index(i1)
             elif tag == 'replace':
-                insert_at = self.target_units[
-                    self.active_target_units[max(i1 - 1, 0)]]['index']
-                next_index = self.target_units[
-                    self.active_target_units[i2 - 1]]['index']
-                inserts.append((insert_at,
-                                new_unitid_list[j1:j2],
-                                next_index,
-                                j2 - j1 - insert_at + next_index))
+                insert_at = self.get_target_index(max(i1 - 1, 0))
+                next_index = self.get_target_index(i2)
+            else:
+                continue
+            insert_at += offset
+            if next_index is not None:
+                next_index += offset
+            indexes, update_index_delta = self.get_insert_indexes(
+                insert_at, next_index, j2 - j1)
+            inserts.append((new_unitid_list[j1:j2],
+                            indexes,
+                            next_index,
+                            update_index_delta))
+            offset += update_index_delta
         return inserts
 
     @cached_property
@@ -287,6 +380,8 @@ class StoreDiff(object):
         """Return a dictionary of change actions or None if there are no
         changes to be made.
         """
+        if self.is_unchanged():
+            return None
         diff = {"index": self.get_indexes_to_update(),
                 "obsolete": self.get_units_to_obsolete(),
                 "add": self.get_units_to_add(),
@@ -295,30 +390,32 @@ class StoreDiff(object):
             return diff
         return None
 
+    def is_unchanged(self):
+        """Whether the active target units are the same as the source units,
+        in which case there is nothing to update
+        """
+        return (
+            self.diffable.target_store_hash
+            == self.diffable.source_store_hash)
+
     def get_indexes_to_update(self):
-        offset = 0
-        index_updates = []
-        for (insert_at_, uids_add_, next_index, delta) in self.insert_points:
-            if delta > 0:
-                index_updates += [(next_index + offset, delta)]
-                offset += delta
-        return index_updates
+        return [
+            (next_index, delta)
+            for (uids_add_, indexes_, next_index, delta)
+            in self.insert_points
+            if delta > 0]
 
     def get_units_to_add(self):
-        offset = 0
         to_add = []
         proxy = (
             isinstance(self.source_store, models.Model)
             and DBUnit or FileUnit)
 
-        for (insert_at, uids_add, next_index_, delta) in self.insert_points:
-            for index, uid in enumerate(uids_add):
+        for (uids_add, indexes, next_index_, delta_) in self.insert_points:
+            for uid, new_unit_index in zip(uids_add, indexes):
                 source_unit = self.source_units.get(uid)
                 if source_unit and uid not in self.target_units:
-                    new_unit_index = insert_at + index + 1 + offset
                     to_add += [(proxy(source_unit), new_unit_index)]
-            if delta > 0:
-                offset += delta
         return to_add
 
     def get_units_to_obsolete(self):
@@ -329,17 +426,13 @@ class StoreDiff(object):
 
     def get_units_to_update(self):
         uid_index_map = {}
-        offset = 0
 
-        for (insert_at, uids_add, next_index_, delta) in self.insert_points:
-            for index, uid in enumerate(uids_add):
-                new_unit_index = insert_at + index + 1 + offset
+        for (uids_add, indexes, next_index_, delta_) in self.insert_points:
+            for uid, new_unit_index in zip(uids_add, indexes):
                 if uid in self.target_units:
                     uid_index_map[uid] = {
                         'dbid': self.target_units[uid]['id'],
                         'index': new_unit_index}
-            if delta > 0:
-                offset += delta
         update_ids = self.get_updated_sourceids()
         update_ids.update({x['dbid'] for x in uid_index_map.values()})
         return (update_ids, uid_index_map)
@@ -356,13 +449,22 @@ class StoreDiff(object):
                 set(self.target_units[uid]['id']
                     for uid in self.active_target_units[i1:i2]
                     if (uid in self.source_units
-                        and (
-                            self.diffable.target_unit_class(
-                                self.target_units[uid])
-                            != self.diffable.source_unit_class(
-                                self.source_units[uid])))))
+                        and self.unit_changed(uid))))
         return update_ids
 
+    def unit_changed(self, uid):
+        """Compares the hashes of the target and source units with `uid`,
+        and only compares the units themselves if they differ.
+        """
+        hashes_match = (
+            self.diffable.target_hashes[uid]
+            == self.diffable.source_hashes[uid])
+        if hashes_match:
+            return False
+        return (
+            self.diffable.target_unit_class(self.target_units[uid])
+            != self.diffable.source_unit_class(self.source_units[uid]))
+
     def has_changes(self, diff):
         for k, v in diff.items():
             if k == "update":
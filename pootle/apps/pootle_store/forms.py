@@ -329,6 +329,9 @@ def unit_comment_form_factory(language):
 class UnitSearchForm(forms.Form):
 
     offset = forms.IntegerField(required=False)
+    cursor = forms.CharField(
+        max_length=255,
+        required=False)
     path = forms.CharField(
         max_length=2048,
         required=True)
@@ -409,8 +412,12 @@ class UnitSearchForm(forms.Form):
         sort_on = "units"
         if "filter" in self.cleaned_data:
             unit_filter = self.cleaned_data["filter"]
-            if unit_filter in ('suggestions', 'user-suggestions'):
-                sort_on = 'suggestions'
+            if unit_filter == 'suggestions':
+                # sorted by the unit's latest pending suggestion
+                sort_on = 'pending_suggestions'
+            elif unit_filter in ('user-suggestions', ):
+                # sorted by the user's latest pending suggestion
+                sort_on = 'user_suggestions'
             elif unit_filter in ('user-submissions', ):
                 sort_on = 'submissions'
         sort_by_param = self.cleaned_data["sort"]
@@ -18,7 +18,7 @@ from pootle_config.delegate import (
 from pootle_misc.util import import_func
 
 from .models import Store, Suggestion, SuggestionState, Unit
-from .unit.search import DBSearchBackend
+from .unit.search import DBSearchBackend, FullTextSearchBackend
 from .unit.timeline import (
     ComparableUnitTimelineLogEvent, UnitTimelineGroupedEvents, UnitTimelineLog)
 from .utils import (
@@ -57,6 +57,8 @@ def get_frozen_unit(**kwargs_):
 
 @getter(search_backend, sender=Unit)
 def get_search_backend(**kwargs_):
+    if settings.POOTLE_FULLTEXT_SEARCH:
+        return FullTextSearchBackend
     return DBSearchBackend
 
 
@@ -10,8 +10,11 @@ from django.db import models
 
 from pootle.core.url_helpers import split_pootle_path
 from pootle_app.models import Directory
+from pootle_checks.bitmap import get_check_bits
 
 from .constants import OBSOLETE
+from .diff import CONTENT_HASH_FIELDS, DBUnit
+from .fields import MultiStringField
 
 
 class SuggestionManager(models.Manager):
@@ -20,8 +23,136 @@ class SuggestionManager(models.Manager):
         return self.get_queryset().filter(state__name="pending")
 
 
+class UnitQuerySet(models.QuerySet):
+
+    # prefix for the expressions used to select raw multistring fields
+    raw_prefix = "raw_"
+
+    def get_multistring_fields(self, fields):
+        return set(
+            name
+            for name
+            in fields
+            if ("__" not in name
+                and isinstance(
+                    self.model._meta.get_field(name),
+                    MultiStringField)))
+
+    def raw_values(self, *fields):
+        """Iterates dicts of unit values like ``values``, but multistring
+        fields are returned as stored in the db rather than parsed.
+
+        ``UnitProxy`` parses them on first access, so units that are only
+        used for eg their ids or states are never parsed.
+        """
+        raw_fields = self.get_multistring_fields(fields)
+        expressions = {
+            "%s%s" % (self.raw_prefix, name): models.ExpressionWrapper(
+                models.F(name),
+                output_field=models.TextField())
+            for name
+            in raw_fields}
+        values = self.values(
+            *[name for name in fields if name not in raw_fields],
+            **expressions)
+        for unit in values.iterator():
+            for name in raw_fields:
+                unit[name] = unit.pop("%s%s" % (self.raw_prefix, name))
+            yield unit
+
+    def update_pending_suggestions(self):
+        """Sets the ``pending_suggestion_count`` of the units, and their
+        ``suggested_on`` sort key to the creation time of their latest
+        pending suggestion.
+        """
+        pending = {
+            pk: (count, suggested_on)
+            for pk, count, suggested_on
+            in (self.filter(suggestion__state__name="pending")
+                    .order_by()
+                    .values_list("pk")
+                    .annotate(models.Count("suggestion"),
+                              models.Max("suggestion__creation_time")))}
+        units = self.order_by().values_list(
+            "pk", "pending_suggestion_count", "suggested_on")
+        for pk, count, suggested_on in units.iterator():
+            unit_pending = pending.get(pk, (0, None))
+            if unit_pending != (count, suggested_on):
+                self.model.objects.filter(pk=pk).update(
+                    pending_suggestion_count=unit_pending[0],
+                    suggested_on=unit_pending[1])
+
+    def update_checks_bitmap(self):
+        """Sets the ``checks_bitmap`` of the units from their active quality
+        checks.
+        """
+        bitmaps = {}
+        active = (
+            self.filter(qualitycheck__false_positive=False)
+                .order_by()
+                .values_list(
+                    "pk", "qualitycheck__name", "qualitycheck__category"))
+        for pk, name, category in active.iterator():
+            bitmaps[pk] = bitmaps.get(pk, 0) | get_check_bits(name, category)
+        updates = {}
+        units = self.order_by().values_list("pk", "checks_bitmap")
+        for pk, checks_bitmap in units.iterator():
+            if bitmaps.get(pk, 0) != checks_bitmap:
+                updates.setdefault(bitmaps.get(pk, 0), []).append(pk)
+        self.model.objects.set_checks_bitmaps(updates)
+
+    def update(self, **kwargs):
+        """Updates the units, and the ``content_hash`` and text index of the
+        units if any of the fields they are computed from are updated.
+        """
+        if not set(kwargs) & set(CONTENT_HASH_FIELDS):
+            return super(UnitQuerySet, self).update(**kwargs)
+        pks = list(self.order_by().values_list("pk", flat=True))
+        updated = super(UnitQuerySet, self).update(**kwargs)
+        chunk_size = 1000
+        for i in xrange(0, len(pks), chunk_size):
+            units = self.model.objects.filter(pk__in=pks[i:i + chunk_size])
+            units.update_content_hashes()
+            units.update_text_index()
+        return updated
+
+    def update_content_hashes(self):
+        """Sets the ``content_hash`` of the units from their content."""
+        units = self.order_by().raw_values(
+            "pk", "content_hash", *CONTENT_HASH_FIELDS)
+        for unit in units:
+            content_hash = DBUnit(unit).content_hash
+            if content_hash != unit["content_hash"]:
+                self.model.objects.filter(pk=unit["pk"]).update(
+                    content_hash=content_hash)
+
+    def update_text_index(self):
+        """Adds the units to the text index, if it is enabled."""
+        from .unit.textindex import get_text_index
+
+        text_index = get_text_index()
+        if text_index is not None:
+            text_index.add_units(self)
+
+
 class UnitManager(models.Manager):
 
+    def get_queryset(self):
+        return UnitQuerySet(self.model, using=self._db)
+
+    def raw_values(self, *fields):
+        return self.get_queryset().raw_values(*fields)
+
+    def set_checks_bitmaps(self, bitmaps, chunk_size=1000):
+        """Updates the ``checks_bitmap`` of units from a dict of bitmaps to
+        unit ids.
+        """
+        for bitmap, unit_ids in bitmaps.items():
+            unit_ids = list(unit_ids)
+            for i in xrange(0, len(unit_ids), chunk_size):
+                self.filter(pk__in=unit_ids[i:i + chunk_size]).update(
+                    checks_bitmap=bitmap)
+
     def live(self):
         """Filters non-obsolete units."""
         return self.filter(state__gt=OBSOLETE, store__obsolete=False)
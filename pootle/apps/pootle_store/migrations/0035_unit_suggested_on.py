@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2017-10-02 10:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_store', '0034_limit_text_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='suggested_on',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+    ]
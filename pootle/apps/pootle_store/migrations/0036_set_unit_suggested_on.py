@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2017-10-02 10:15
+from __future__ import unicode_literals
+
+import logging
+
+from django.db import migrations
+from django.db.models import Max
+
+
+logger = logging.getLogger(__name__)
+
+
+def set_unit_suggested_on(apps, schema_editor):
+    units = apps.get_model("pootle_store.Unit").objects.all()
+    suggestions = apps.get_model("pootle_store.Suggestion").objects.filter(
+        state__name="pending")
+    suggested = suggestions.order_by().values("unit_id").annotate(
+        suggested_on=Max("creation_time"))
+    for unit_suggested in suggested.iterator():
+        units.filter(pk=unit_suggested["unit_id"]).update(
+            suggested_on=unit_suggested["suggested_on"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_store', '0035_unit_suggested_on'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_unit_suggested_on),
+    ]
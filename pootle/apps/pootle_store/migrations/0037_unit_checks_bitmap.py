@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2017-10-03 09:41
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_store', '0036_set_unit_suggested_on'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='checks_bitmap',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2017-10-03 09:44
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from pootle_checks.bitmap import get_check_bits
+
+
+def set_unit_checks_bitmap(apps, schema_editor):
+    units = apps.get_model("pootle_store.Unit").objects.all()
+    checks = apps.get_model("pootle_store.QualityCheck").objects.filter(
+        false_positive=False)
+    bitmaps = {}
+    checks = checks.order_by().values_list("unit_id", "name", "category")
+    for unit_id, name, category in checks.iterator():
+        bitmaps[unit_id] = (
+            bitmaps.get(unit_id, 0)
+            | get_check_bits(name, category))
+    updates = {}
+    for unit_id, bitmap in bitmaps.items():
+        updates.setdefault(bitmap, []).append(unit_id)
+    for bitmap, unit_ids in updates.items():
+        for i in xrange(0, len(unit_ids), 1000):
+            units.filter(pk__in=unit_ids[i:i + 1000]).update(
+                checks_bitmap=bitmap)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_store', '0037_unit_checks_bitmap'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_unit_checks_bitmap),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2017-10-04 11:02
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_store', '0038_set_unit_checks_bitmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='pending_suggestion_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AlterIndexTogether(
+            name='suggestion',
+            index_together=set([('user', 'state')]),
+        ),
+    ]
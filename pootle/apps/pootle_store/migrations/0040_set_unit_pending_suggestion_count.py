@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2017-10-04 11:06
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def set_unit_pending_suggestion_count(apps, schema_editor):
+    units = apps.get_model("pootle_store.Unit").objects.all()
+    suggestions = apps.get_model("pootle_store.Suggestion").objects.filter(
+        state__name="pending")
+    pending = suggestions.order_by().values("unit_id").annotate(
+        count=Count("id"))
+    for unit_pending in pending.iterator():
+        units.filter(pk=unit_pending["unit_id"]).update(
+            pending_suggestion_count=unit_pending["count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_store', '0039_unit_pending_suggestion_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_unit_pending_suggestion_count),
+    ]
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2017-10-05 11:32
+from __future__ import unicode_literals
+
+from hashlib import md5
+
+from django.db import migrations
+from django.utils.encoding import force_bytes
+
+from pootle.core.utils.multistring import SEPARATOR, parse_multistring
+
+
+def set_plural_source_hashes(apps, schema_editor):
+    """Source hashes were of the first string only, so recompute them for
+    sources with plurals
+    """
+    unit_sources = apps.get_model("pootle_store.UnitSource").objects.filter(
+        unit__source_f__contains=SEPARATOR)
+    hashes = unit_sources.values_list("pk", "unit__source_f", "source_hash")
+    for pk, source, source_hash in hashes.iterator():
+        strings = (
+            getattr(source, "strings", None)
+            or parse_multistring(source).strings)
+        plural_hash = md5(force_bytes(u"\x00".join(strings))).hexdigest()
+        if plural_hash != source_hash:
+            unit_sources.filter(pk=pk).update(source_hash=plural_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_store', '0041_unit_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_plural_source_hashes),
+    ]
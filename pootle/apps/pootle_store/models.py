@@ -42,7 +42,9 @@ from .abstracts import (
     AbstractSuggestionState, AbstractUnit, AbstractUnitChange,
     AbstractUnitSource)
 from .constants import (
-    DEFAULT_PRIORITY, FUZZY, OBSOLETE, POOTLE_WINS, TRANSLATED, UNTRANSLATED)
+    DEFAULT_PRIORITY, FUZZY, OBSOLETE, POOTLE_WINS, TRANSLATED, UNIT_INDEX_GAP,
+    UNTRANSLATED)
+from .diff import CONTENT_HASH_FIELDS
 from .managers import SuggestionManager, UnitManager
 from .store.deserialize import StoreDeserialization
 from .store.serialize import StoreSerialization
@@ -84,7 +86,10 @@ class QualityCheck(AbstractQualityCheck):
         unknown_checks = (
             QualityCheck.objects.exclude(
                 name__in=CHECK_NAMES.keys()))
+        unit_ids = set(unknown_checks.values_list("unit_id", flat=True))
         unknown_checks.delete()
+        if unit_ids:
+            Unit.objects.filter(pk__in=unit_ids).update_checks_bitmap()
 
 
 # # # # # # # # # Suggestion # # # # # # # #
@@ -173,6 +178,11 @@ class Unit(AbstractUnit):
 
     objects = UnitManager()
 
+    # fields kept up to date with queries, that saving a unit must not
+    # overwrite with the values it was loaded with
+    denormalized_fields = (
+        "checks_bitmap", "pending_suggestion_count", "suggested_on")
+
     class Meta(AbstractUnit.Meta):
         abstract = False
         db_table = "pootle_store_unit"
@@ -287,6 +297,25 @@ class Unit(AbstractUnit):
             del self.__dict__[field.get_cache_name()]
         self._frozen = frozen.get(Unit)(self)
 
+    def get_update_fields(self, update_fields=None):
+        """Returns the fields to save, leaving out the denormalized fields
+        when updating the whole unit. The ``content_hash`` is saved along with
+        any of the fields it is computed from.
+        """
+        if self._state.adding or self.pk is None:
+            return update_fields
+        if update_fields is None:
+            return [
+                field.name
+                for field
+                in self._meta.concrete_fields
+                if not (field.primary_key
+                        or field.name in self.denormalized_fields)]
+        update_fields = set(update_fields)
+        if update_fields & set(CONTENT_HASH_FIELDS):
+            update_fields.add("content_hash")
+        return update_fields
+
     def save(self, *args, **kwargs):
         created = self.id is None
         user = (
@@ -294,6 +323,9 @@ class Unit(AbstractUnit):
             or get_user_model().objects.get_system_user())
         reviewed_by = kwargs.pop("reviewed_by", None) or user
         changed_with = kwargs.pop("changed_with", None) or SubmissionTypes.SYSTEM
+        if not args:
+            kwargs["update_fields"] = self.get_update_fields(
+                kwargs.get("update_fields"))
         super(Unit, self).save(*args, **kwargs)
         timestamp = self.mtime
         if created:
@@ -305,33 +337,45 @@ class Unit(AbstractUnit):
             unit_source = self.unit_source
         if created or self.source_updated:
             unit_source.save()
+        change = self.update_change(
+            user, reviewed_by, changed_with, timestamp, created=created)
+        if change is not None:
+            change.save()
+        update_data.send(
+            self.store.__class__, instance=self.store)
+
+    def update_change(self, user, reviewed_by, changed_with, timestamp,
+                      created=False):
+        """Updates the ``UnitChange`` of a unit that is being saved.
+
+        Returns the change if it needs to be saved, or ``None``.
+        """
         if self.updated and (created or not self.changed):
             self.change = UnitChange(
                 unit=self,
                 changed_with=changed_with)
-        if self.updated or reviewed_by != user:
-            if changed_with is not None:
-                self.change.changed_with = changed_with
-            if self.comment_updated:
-                self.change.commented_by = user
-                self.change.commented_on = timestamp
-            update_submit = (
-                (self.target_updated or self.source_updated)
-                or not self.change.submitted_on)
-            if update_submit:
-                self.change.submitted_by = user
-                self.change.submitted_on = timestamp
-            is_review = (
-                reviewed_by != user
-                or (self.state_updated and not self.target_updated)
-                or (self.state_updated
-                    and self.state == UNTRANSLATED))
-            if is_review:
-                self.change.reviewed_by = reviewed_by
-                self.change.reviewed_on = timestamp
-            self.change.save()
-        update_data.send(
-            self.store.__class__, instance=self.store)
+        if not (self.updated or reviewed_by != user):
+            return None
+        if changed_with is not None:
+            self.change.changed_with = changed_with
+        if self.comment_updated:
+            self.change.commented_by = user
+            self.change.commented_on = timestamp
+        update_submit = (
+            (self.target_updated or self.source_updated)
+            or not self.change.submitted_on)
+        if update_submit:
+            self.change.submitted_by = user
+            self.change.submitted_on = timestamp
+        is_review = (
+            reviewed_by != user
+            or (self.state_updated and not self.target_updated)
+            or (self.state_updated
+                and self.state == UNTRANSLATED))
+        if is_review:
+            self.change.reviewed_by = reviewed_by
+            self.change.reviewed_on = timestamp
+        return self.change
 
     def get_absolute_url(self):
         return self.store.get_absolute_url()
@@ -726,7 +770,7 @@ class Unit(AbstractUnit):
 
         update_checks.send(self.__class__, instance=self,
                            keep_false_positives=True)
-        self.index = self.store.max_index() + 1
+        self.index = self.store.next_index()
 
     def istranslated(self):
         return self.state >= TRANSLATED
@@ -944,7 +988,7 @@ class Store(AbstractStore):
 
     def update(self, store, user=None, store_revision=None,
                submission_type=None, resolve_conflict=POOTLE_WINS,
-               allow_add_and_obsolete=True):
+               allow_add_and_obsolete=True, batched=False):
         """Update DB with units from a ttk Store.
 
         :param store: a source `Store` instance from TTK.
@@ -954,11 +998,13 @@ class Store(AbstractStore):
         :param submission_type: Submission type of saved updates.
         :param allow_add_and_obsolete: allow to add new units
             and make obsolete existing units
+        :param batched: save updated and obsoleted units, and their
+            changes and submissions, with bulk writes
         """
         return self.updater.update(
             store, user=user, store_revision=store_revision,
             submission_type=submission_type, resolve_conflict=resolve_conflict,
-            allow_add_and_obsolete=allow_add_and_obsolete)
+            allow_add_and_obsolete=allow_add_and_obsolete, batched=batched)
 
     def deserialize(self, data):
         return StoreDeserialization(self).deserialize(data)
@@ -967,6 +1013,10 @@ class Store(AbstractStore):
         return StoreSerialization(self).serialize(
             include_obsolete=include_obsolete, raw=raw)
 
+    def stream(self, include_obsolete=False, raw=False):
+        return StoreSerialization(self).stream(
+            include_obsolete=include_obsolete, raw=raw)
+
 # # # # # # # # # # # #  TranslationStore # # # # # # # # # # # # #
 
     suggestions_in_format = True
@@ -976,10 +1026,15 @@ class Store(AbstractStore):
 
         return max_column(self.unit_set.all(), 'index', -1)
 
+    def next_index(self):
+        """Index for a unit added after the last unit"""
+
+        return max(self.max_index(), 0) + UNIT_INDEX_GAP
+
     def addunit(self, unit, index=None, user=None, update_revision=None,
                 changed_with=None):
         if index is None:
-            index = self.max_index() + 1
+            index = self.next_index()
 
         newunit = self.UnitClass(
             store=self,
@@ -6,18 +6,20 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from hashlib import md5
-
-from django.db.models.signals import post_save, pre_save
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.signals import post_migrate, post_save, pre_save
 from django.dispatch import receiver
-from django.utils.encoding import force_bytes
 
 from pootle.core.delegate import lifecycle, uniqueid
 from pootle.core.models import Revision
 from pootle.core.signals import update_checks, update_data
 
 from .constants import FUZZY, TRANSLATED, UNTRANSLATED
+from .diff import get_content_hash
 from .models import Suggestion, Unit, UnitChange, UnitSource
+from .unit.fulltext import get_fulltext_index
+from .unit.textindex import get_text_index
 
 
 @receiver(post_save, sender=Suggestion)
@@ -40,6 +42,46 @@ def handle_suggestion_accepted(**kwargs):
         instance=suggestion.unit.store)
 
 
+@receiver(post_save, sender=Suggestion)
+def handle_suggestion_pending(**kwargs):
+    suggestion = kwargs["instance"]
+    units = Unit.objects.filter(pk=suggestion.unit_id)
+    if not kwargs.get("created"):
+        # the suggestion may have been reviewed
+        units.update_pending_suggestions()
+    elif suggestion.is_pending:
+        units.update(
+            pending_suggestion_count=F("pending_suggestion_count") + 1)
+        if suggestion.creation_time:
+            units.filter(
+                Q(suggested_on__isnull=True)
+                | Q(suggested_on__lt=suggestion.creation_time)).update(
+                    suggested_on=suggestion.creation_time)
+    else:
+        return
+    # dont let a later save of the unit revert the counters
+    suggestion.unit.refresh_from_db(
+        fields=["pending_suggestion_count", "suggested_on"])
+
+
+@receiver(post_migrate)
+def handle_post_migrate_fulltext_index(**kwargs):
+    if kwargs["sender"].name != "pootle_store":
+        return
+    if not settings.POOTLE_FULLTEXT_SEARCH:
+        return
+    index = get_fulltext_index(kwargs["using"])
+    if index:
+        index.create()
+
+
+@receiver(post_save, sender=Unit)
+def handle_unit_text_index(**kwargs):
+    text_index = get_text_index()
+    if text_index:
+        text_index.add_saved_unit(kwargs["instance"])
+
+
 @receiver(pre_save, sender=UnitSource)
 def handle_unit_source_pre_save(**kwargs):
     unit_source = kwargs["instance"]
@@ -48,11 +90,11 @@ def handle_unit_source_pre_save(**kwargs):
     if created:
         unit_source.creation_revision = unit.revision
     if created or unit.source_updated:
-        unit_source.source_hash = md5(force_bytes(unit.source_f)).hexdigest()
+        unit_source.source_hash = unit.counter.get_source_hash(unit.source_f)
         unit_source.source_length = len(unit.source_f)
-        unit_source.source_wordcount = (
-            unit.counter.count_words(unit.source_f.strings)
-            or 0)
+        unit_source.source_wordcount = unit.counter.count_source(
+            unit.source_f,
+            unit_source.source_hash)
 
 
 @receiver(pre_save, sender=Unit)
@@ -62,7 +104,7 @@ def handle_unit_pre_save(**kwargs):
 
     if unit.source_updated:
         # update source related fields
-        wc = unit.counter.count_words(unit.source_f.strings)
+        wc = unit.counter.count_source(unit.source_f)
         if not wc and not bool(filter(None, unit.target_f.strings)):
             # auto-translate untranslated strings
             unit.target = unit.source
@@ -93,10 +135,11 @@ def handle_unit_pre_save(**kwargs):
         unit.revision = Revision.incr()
 
     if unit.index is None:
-        unit.index = unit.store.max_index() + 1
+        unit.index = unit.store.next_index()
     unitid = uniqueid.get(unit.__class__)(unit)
     if unitid.changed:
         unit.setid(unitid.getid())
+    unit.content_hash = get_content_hash(unit)
 
 
 @receiver(post_save, sender=UnitChange)
@@ -6,15 +6,100 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import cPickle as pickle
 import io
+import logging
+from hashlib import md5
 
 from translate.storage.factory import getclass
 
+from django.conf import settings
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 
+from pootle.core.cache import get_cache
 from pootle.core.delegate import config, deserializers
 
 
+logger = logging.getLogger(__name__)
+
+
+PARSED_STORE_CACHE_DEFAULTS = dict(
+    CACHE="exports",
+    MAX_SIZE=5 * 1024 * 1024)
+
+
+def get_parsed_store_cache_setting(k):
+    return getattr(
+        settings,
+        "POOTLE_PARSED_STORE_CACHE",
+        {}).get(k, PARSED_STORE_CACHE_DEFAULTS[k])
+
+
+class ParsedStoreCache(object):
+    """Cache of parsed stores, keyed by a digest of the data they were parsed
+    from.
+
+    Stores are cached pickled, so that they are shared between processes,
+    and each call returns a new copy that the caller can change. Stores
+    parsed from more than `max_size` bytes, and stores that cant be
+    pickled, are not cached.
+    """
+
+    key_prefix = "pootle.store.parsed"
+
+    def __init__(self, cache, max_size):
+        self.cache = cache
+        self.max_size = max_size
+
+    def get_key(self, data, *args):
+        key = (md5(force_bytes(data)).hexdigest(), ) + args
+        return (
+            "%s.%s"
+            % (self.key_prefix,
+               md5(force_bytes(repr(key))).hexdigest()))
+
+    def get(self, key):
+        pickled = self.cache.get(key)
+        if pickled is None:
+            return
+        try:
+            return pickle.loads(pickled)
+        except Exception as e:
+            logger.debug("[parse] Not using unpicklable store: %s", e)
+
+    def set(self, key, store, size):
+        if size > self.max_size:
+            return False
+        try:
+            pickled = pickle.dumps(store, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug("[parse] Not caching unpicklable store: %s", e)
+            return False
+        self.cache.set(key, pickled)
+        return True
+
+    def parse(self, data, parser, *args):
+        """Returns a parsed copy of `data`, only calling `parser` if it has
+        not been parsed with the same `args` before.
+        """
+        if self.cache is None or not self.max_size:
+            return parser(data)
+        key = self.get_key(data, *args)
+        store = self.get(key)
+        if store is None:
+            store = parser(data)
+            self.set(key, store, len(data))
+        return store
+
+
+def get_parsed_store_cache():
+    cache_name = get_parsed_store_cache_setting("CACHE")
+    return ParsedStoreCache(
+        cache_name and get_cache(cache_name) or None,
+        max_size=get_parsed_store_cache_setting("MAX_SIZE"))
+
+
 class StoreDeserialization(object):
     """Calls configured deserializers for Store"""
 
@@ -52,9 +137,15 @@ class StoreDeserialization(object):
         data.name = self.store.name
         return data
 
-    def fromstring(self, data):
+    def parse(self, data):
         data = self.dataio(data)
         return getclass(data)(data)
 
+    def fromstring(self, data):
+        return get_parsed_store_cache().parse(
+            data,
+            self.parse,
+            self.store.name)
+
     def deserialize(self, data):
         return self.fromstring(self.pipeline(data))
@@ -6,11 +6,113 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from hashlib import md5
+
+from django.conf import settings
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 
+from pootle.core.cache import get_cache
 from pootle.core.delegate import config, serializers
 
 
+SERIALIZED_CACHE_DEFAULTS = dict(
+    CACHE="exports",
+    MAX_SIZE=20 * 1024 * 1024,
+    MAX_TOTAL_SIZE=500 * 1024 * 1024)
+
+SERIALIZED_CACHE_POLL_INTERVAL = .05
+
+
+def get_serialized_cache_setting(k):
+    return getattr(
+        settings,
+        "POOTLE_SERIALIZED_CACHE",
+        {}).get(k, SERIALIZED_CACHE_DEFAULTS[k])
+
+
+class SerializedCache(object):
+    """Cache of serialized stores.
+
+    An index of the cached keys and their sizes is kept, and the oldest
+    entries are evicted when the total size exceeds `max_total_size`.
+
+    The index is locked while it is updated, and entries are not cached if
+    the lock cant be taken within `lock_timeout` seconds.
+    """
+
+    index_key = "pootle.store.serialized.index"
+    lock_timeout = 10
+
+    def __init__(self, cache, max_size, max_total_size):
+        self.cache = cache
+        self.max_size = max_size
+        self.max_total_size = max_total_size
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def get_index(self):
+        return self.cache.get(self.index_key) or OrderedDict()
+
+    @property
+    def lock_key(self):
+        return "%s.lock" % self.index_key
+
+    @contextmanager
+    def locked_index(self):
+        """Yields whether the index lock was taken, holding it until the
+        context exits.
+        """
+        timeout = time.time() + self.lock_timeout
+        locked = self.cache.add(self.lock_key, 1, self.lock_timeout)
+        while not locked and time.time() < timeout:
+            time.sleep(SERIALIZED_CACHE_POLL_INTERVAL)
+            locked = self.cache.add(self.lock_key, 1, self.lock_timeout)
+        try:
+            yield locked
+        finally:
+            if locked:
+                self.cache.delete(self.lock_key)
+
+    def set(self, key, data):
+        size = len(data)
+        if size > min(self.max_size, self.max_total_size):
+            return False
+        with self.locked_index() as locked:
+            if not locked:
+                return False
+            index = self.get_index()
+            index.pop(key, None)
+            index[key] = size
+            total = sum(index.values())
+            while total > self.max_total_size:
+                evicted, evicted_size = index.popitem(last=False)
+                self.cache.delete(evicted)
+                total -= evicted_size
+            self.cache.set(key, data)
+            self.cache.set(self.index_key, index)
+        return True
+
+    def clear(self):
+        with self.locked_index():
+            self.cache.delete_many(
+                self.get_index().keys() + [self.index_key])
+
+
+def get_serialized_cache():
+    cache_name = get_serialized_cache_setting("CACHE")
+    if not cache_name:
+        return None
+    return SerializedCache(
+        get_cache(cache_name),
+        max_size=get_serialized_cache_setting("MAX_SIZE"),
+        max_total_size=get_serialized_cache_setting("MAX_TOTAL_SIZE"))
+
+
 class StoreSerialization(object):
     """Calls configured deserializers for Store"""
 
@@ -35,6 +137,12 @@ class StoreSerialization(object):
     def max_unit_revision(self):
         return self.store.data.max_unit_revision
 
+    @property
+    def headers(self):
+        return OrderedDict(
+            [("X_Pootle_Path", self.pootle_path),
+             ("X_Pootle_Revision", self.max_unit_revision or 0)])
+
     @cached_property
     def serializers(self):
         available_serializers = serializers.gather(
@@ -49,12 +157,8 @@ class StoreSerialization(object):
     def tostring(self, include_obsolete=False, raw=False):
         store = self.store.syncer.convert(
             include_obsolete=include_obsolete, raw=raw)
-        if hasattr(store, "updateheader"):
-            # FIXME We need those headers on import
-            # However some formats just don't support setting metadata
-            max_unit_revision = self.max_unit_revision or 0
-            store.updateheader(add=True, X_Pootle_Path=self.pootle_path)
-            store.updateheader(add=True, X_Pootle_Revision=max_unit_revision)
+        # FIXME We need those headers on import
+        self.store.syncer.set_headers(store, self.headers)
         return str(store)
 
     def pipeline(self, data):
@@ -64,6 +168,88 @@ class StoreSerialization(object):
             data = serializer(self.store, data).output
         return data
 
+    def get_units_digest(self):
+        """Digest of the ids of the units in order. Reordering units
+        doesnt change their revisions, so this is part of the cache key.
+        """
+        pks = self.store.unit_set.order_by("index", "pk").values_list(
+            "pk", flat=True)
+        return md5(
+            force_bytes(",".join(str(pk) for pk in pks))).hexdigest()
+
+    def get_cache_key(self, include_obsolete=False, raw=False):
+        key = (
+            self.pootle_path,
+            self.store.filetype_id,
+            self.max_unit_revision,
+            self.get_units_digest(),
+            list(self.project_serializers),
+            include_obsolete,
+            raw)
+        return (
+            "pootle.store.serialized.%s"
+            % md5(force_bytes(repr(key))).hexdigest())
+
     def serialize(self, include_obsolete=False, raw=False):
-        return self.pipeline(
-            self.tostring(include_obsolete=include_obsolete, raw=raw))
+        cache = get_serialized_cache()
+        if cache is None:
+            return self.pipeline(
+                self.tostring(include_obsolete=include_obsolete, raw=raw))
+        cache_key = self.get_cache_key(
+            include_obsolete=include_obsolete, raw=raw)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.pipeline(
+                self.tostring(include_obsolete=include_obsolete, raw=raw))
+            if isinstance(data, basestring):
+                cache.set(cache_key, data)
+        return data
+
+    @property
+    def streamable(self):
+        return (
+            self.store.syncer.streamable
+            and all(
+                getattr(serializer, "chunked", False)
+                for serializer
+                in self.serializers))
+
+    def stream(self, include_obsolete=False, raw=False):
+        """Yields the serialized store in chunks.
+
+        Units are written incrementally if the store syncer and all of the
+        configured serializers support it, otherwise the whole serialized
+        store is yielded at once.
+        """
+        if not self.streamable:
+            yield self.serialize(include_obsolete=include_obsolete, raw=raw)
+            return
+        chunks = self.pipeline(
+            self.store.syncer.stream(
+                include_obsolete=include_obsolete,
+                raw=raw,
+                headers=self.headers))
+        cache = get_serialized_cache()
+        if cache is None:
+            for chunk in chunks:
+                yield chunk
+            return
+        cache_key = self.get_cache_key(
+            include_obsolete=include_obsolete, raw=raw)
+        data = cache.get(cache_key)
+        if data is not None:
+            yield data
+            return
+        # keep the chunks to cache them, unless the store is too big
+        cached = []
+        size = 0
+        for chunk in chunks:
+            if cached is not None:
+                size += len(chunk)
+                if size > cache.max_size:
+                    cached = None
+                else:
+                    cached.append(chunk)
+            yield chunk
+        if cached is not None:
+            cache.set(cache_key, "".join(cached))
@@ -119,6 +119,9 @@ class UnitSyncer(object):
 class StoreSyncer(object):
     unit_sync_class = UnitSyncer
 
+    # whether ``stream`` writes units incrementally
+    streamable = False
+
     def __init__(self, store):
         self.store = store
 
@@ -168,15 +171,34 @@ class StoreSyncer(object):
         output = fileclass()
         output.settargetlanguage(self.language.code)
         # FIXME: we should add some headers
-        units = (
-            self.store.unit_set
-            if include_obsolete
-            else self.store.units)
-        for unit in units.iterator():
+        for unit in self.get_units(include_obsolete).iterator():
             output.addunit(
                 self.unit_sync_class(unit, raw=raw).convert(output.UnitClass))
         return output
 
+    def get_units(self, include_obsolete=False):
+        return (
+            self.store.unit_set
+            if include_obsolete
+            else self.store.units)
+
+    def set_headers(self, output, headers):
+        if not headers or not hasattr(output, "updateheader"):
+            # some formats just don't support setting metadata
+            return
+        for k, v in headers.items():
+            output.updateheader(add=True, **{k: v})
+
+    def stream(self, include_obsolete=False, raw=False, headers=None):
+        """Yields the converted store as strings.
+
+        The whole store is converted at once, formats that can write units
+        incrementally override this and set ``streamable``.
+        """
+        output = self.convert(include_obsolete=include_obsolete, raw=raw)
+        self.set_headers(output, headers)
+        yield str(output)
+
     def _getclass(self, obj):
         try:
             return getclass(obj)
@@ -59,4 +59,4 @@ class AltSrcUnits(object):
 
     @property
     def units(self):
-        return [AltSrcUnitProxy(x) for x in self.qs.values(*self.fields)]
+        return [AltSrcUnitProxy(x) for x in self.qs.raw_values(*self.fields)]
@@ -6,10 +6,14 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from django.db.models import Q
+from django.db.models import F, OuterRef, Q, Subquery
 
+from pootle.core.delegate import states
+from pootle_checks.bitmap import get_category_mask, get_checks_mask
+from pootle_checks.constants import CATEGORY_BITS
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import FUZZY, TRANSLATED, UNTRANSLATED
+from pootle_store.models import Suggestion
 
 
 class FilterNotFound(Exception):
@@ -36,12 +40,22 @@ class UnitChecksFilter(BaseUnitFilter):
         self.checks = kwargs.get("checks")
         self.category = kwargs.get("category")
 
+    def filter_bitmap(self, mask):
+        return self.qs.annotate(
+            checks_matched=F("checks_bitmap").bitand(mask)).exclude(
+                checks_matched=0)
+
     def filter_checks(self):
         if self.checks:
+            mask = get_checks_mask(self.checks)
+            if mask is not None:
+                return self.filter_bitmap(mask)
             return self.qs.filter(
                 qualitycheck__false_positive=False,
                 qualitycheck__name__in=self.checks).distinct()
         elif self.category:
+            if self.category in CATEGORY_BITS:
+                return self.filter_bitmap(get_category_mask(self.category))
             return self.qs.filter(
                 qualitycheck__false_positive=False,
                 qualitycheck__category=self.category).distinct()
@@ -76,15 +90,23 @@ class UnitContributionFilter(BaseUnitFilter):
         self.user = kwargs.get("user")
 
     def filter_suggestions(self):
-        return self.qs.filter(
-            suggestion__state__name="pending").distinct()
+        return self.qs.filter(pending_suggestion_count__gt=0)
 
     def filter_user_suggestions(self):
+        """Units with pending suggestions from the user, annotated with
+        ``user_suggested_on``, the creation time of the latest of them.
+        """
         if not self.user:
             return self.qs.none()
+        pending = Suggestion.objects.filter(
+            user=self.user,
+            state_id=states.get(Suggestion)["pending"])
+        latest = pending.filter(unit_id=OuterRef("pk")).order_by(
+            "-creation_time").values("creation_time")[:1]
         return self.qs.filter(
-            suggestion__user=self.user,
-            suggestion__state__name="pending").distinct()
+            pending_suggestion_count__gt=0,
+            pk__in=pending.values("unit_id")).annotate(
+                user_suggested_on=Subquery(latest))
 
     def filter_my_suggestions(self):
         return self.filter_user_suggestions()
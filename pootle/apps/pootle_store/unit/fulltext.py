@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+import re
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models.expressions import RawSQL
+
+from .filters import UnitTextSearch
+
+
+logger = logging.getLogger(__name__)
+
+WORDS_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class UnitFullTextIndex(object):
+    """Native full text index of the text fields of units.
+
+    The index is tokenized into character ngrams, so that it matches any
+    part of a word. It is used to find candidate units containing all of
+    the searched words, which are then checked with the usual ``contains``
+    filters.
+    """
+
+    table = "pootle_store_unit"
+    fields = UnitTextSearch.search_fields
+    # words shorter than the indexed ngrams cant be matched, so are only
+    # checked with ``contains``
+    min_word_length = 3
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._exists = None
+
+    @property
+    def index_name(self):
+        return "%s_fts" % self.table
+
+    @property
+    def create_sql(self):
+        return []
+
+    @property
+    def drop_sql(self):
+        return []
+
+    @property
+    def exists(self):
+        if self._exists is None:
+            with self.connection.cursor() as cursor:
+                self._exists = self.check_exists(cursor)
+        return self._exists
+
+    def check_exists(self, cursor):
+        raise NotImplementedError
+
+    def execute(self, statements):
+        with transaction.atomic(using=self.connection.alias):
+            with self.connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+    def create(self):
+        """Creates the index, if it doesnt exist already.
+
+        Returns whether the index could be created.
+        """
+        if self.exists:
+            return True
+        try:
+            self.execute(self.create_sql)
+        except DatabaseError as e:
+            logger.warning(
+                "Unable to create full text index for units: %s", e)
+            return False
+        self._exists = True
+        return True
+
+    def drop(self):
+        self.execute(self.drop_sql)
+        self._exists = False
+
+    def get_words(self, words):
+        words = [
+            word
+            for word
+            in WORDS_RE.findall(u" ".join(words))
+            if len(word) >= self.min_word_length]
+        return words
+
+    def get_query(self, field, words):
+        raise NotImplementedError
+
+    def get_match_sql(self, field):
+        raise NotImplementedError
+
+    def filter(self, qs, field, words):
+        """Filters ``qs`` to units with ``field`` containing all of the
+        indexed ``words``.
+        """
+        words = self.get_words(words)
+        if not words:
+            return qs
+        return qs.filter(
+            pk__in=RawSQL(
+                self.get_match_sql(field),
+                [self.get_query(field, words)]))
+
+
+class SQLiteUnitFullTextIndex(UnitFullTextIndex):
+    """FTS5 external content table, kept up to date by triggers.
+
+    Requires the FTS5 ``trigram`` tokenizer, added in SQLite 3.34.
+    """
+
+    triggers = ("ai", "ad", "au")
+
+    @property
+    def columns(self):
+        return ", ".join(self.fields)
+
+    def get_columns(self, prefix):
+        return ", ".join(
+            "%s.%s" % (prefix, field)
+            for field
+            in self.fields)
+
+    def get_trigger_name(self, trigger):
+        return "%s_%s" % (self.index_name, trigger)
+
+    @property
+    def create_sql(self):
+        insert = (
+            "INSERT INTO %s(rowid, %s) VALUES (new.id, %s);"
+            % (self.index_name, self.columns, self.get_columns("new")))
+        delete = (
+            "INSERT INTO %s(%s, rowid, %s) VALUES ('delete', old.id, %s);"
+            % (self.index_name, self.index_name, self.columns,
+               self.get_columns("old")))
+        return [
+            ("CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5(%s, "
+             "content='%s', content_rowid='id', tokenize='trigram')"
+             % (self.index_name, self.columns, self.table)),
+            ("CREATE TRIGGER IF NOT EXISTS %s AFTER INSERT ON %s BEGIN "
+             "%s END"
+             % (self.get_trigger_name("ai"), self.table, insert)),
+            ("CREATE TRIGGER IF NOT EXISTS %s AFTER DELETE ON %s BEGIN "
+             "%s END"
+             % (self.get_trigger_name("ad"), self.table, delete)),
+            ("CREATE TRIGGER IF NOT EXISTS %s AFTER UPDATE OF %s ON %s "
+             "BEGIN %s %s END"
+             % (self.get_trigger_name("au"), self.columns, self.table,
+                delete, insert)),
+            ("INSERT INTO %s(%s) VALUES ('rebuild')"
+             % (self.index_name, self.index_name))]
+
+    @property
+    def drop_sql(self):
+        return (
+            ["DROP TRIGGER IF EXISTS %s" % self.get_trigger_name(trigger)
+             for trigger
+             in self.triggers]
+            + ["DROP TABLE IF EXISTS %s" % self.index_name])
+
+    def check_exists(self, cursor):
+        # the triggers are dropped if the unit table is rebuilt by a
+        # migration, in which case the index is rebuilt
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s)"
+            % ", ".join(["%s"] * (len(self.triggers) + 1)),
+            [self.index_name]
+            + [self.get_trigger_name(trigger)
+               for trigger
+               in self.triggers])
+        return len(cursor.fetchall()) == len(self.triggers) + 1
+
+    def get_query(self, field, words):
+        return u"%s : (%s)" % (
+            field,
+            u" AND ".join(u'"%s"' % word for word in words))
+
+    def get_match_sql(self, field):
+        return (
+            "SELECT rowid FROM %s WHERE %s MATCH %%s"
+            % (self.index_name, self.index_name))
+
+
+class MySQLUnitFullTextIndex(UnitFullTextIndex):
+    """A ``FULLTEXT`` index for each of the text fields, using the ``ngram``
+    parser.
+    """
+
+    # the default ``ngram_token_size``
+    min_word_length = 2
+
+    def get_field_index_name(self, field):
+        return "%s_%s" % (self.index_name, field)
+
+    @property
+    def create_sql(self):
+        return [
+            ("CREATE FULLTEXT INDEX %s ON %s (%s) WITH PARSER ngram"
+             % (self.get_field_index_name(field), self.table, field))
+            for field
+            in self.fields]
+
+    @property
+    def drop_sql(self):
+        return [
+            ("DROP INDEX %s ON %s"
+             % (self.get_field_index_name(field), self.table))
+            for field
+            in self.fields]
+
+    def check_exists(self, cursor):
+        indexes = self.connection.introspection.get_constraints(
+            cursor, self.table)
+        return all(
+            self.get_field_index_name(field) in indexes
+            for field
+            in self.fields)
+
+    def get_query(self, field, words):
+        return u" ".join(u'+"%s"' % word for word in words)
+
+    def get_match_sql(self, field):
+        return (
+            "SELECT id FROM %s WHERE MATCH (%s) AGAINST (%%s IN BOOLEAN MODE)"
+            % (self.table, field))
+
+
+class PostgreSQLUnitFullTextIndex(UnitFullTextIndex):
+    """A trigram index for each of the text fields.
+
+    Trigram indexes match the ``UPPER(field) LIKE`` queries used for
+    ``icontains`` directly, so no other filter is needed.
+    """
+
+    def get_field_index_name(self, field):
+        return "%s_%s" % (self.index_name, field)
+
+    @property
+    def create_sql(self):
+        return (
+            ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+            + [("CREATE INDEX IF NOT EXISTS %s ON %s "
+                "USING gin (UPPER(%s::text) gin_trgm_ops)"
+                % (self.get_field_index_name(field), self.table, field))
+               for field
+               in self.fields])
+
+    @property
+    def drop_sql(self):
+        return [
+            "DROP INDEX IF EXISTS %s" % self.get_field_index_name(field)
+            for field
+            in self.fields]
+
+    def check_exists(self, cursor):
+        indexes = self.connection.introspection.get_constraints(
+            cursor, self.table)
+        return all(
+            self.get_field_index_name(field) in indexes
+            for field
+            in self.fields)
+
+    def filter(self, qs, field, words):
+        return qs
+
+
+fulltext_indexes = {
+    "sqlite": SQLiteUnitFullTextIndex,
+    "mysql": MySQLUnitFullTextIndex,
+    "postgresql": PostgreSQLUnitFullTextIndex}
+
+_indexes = {}
+
+
+def get_fulltext_index(using="default"):
+    """Returns the full text index for the ``using`` db connection, or
+    ``None`` if its vendor has no native full text search.
+    """
+    if using not in _indexes:
+        connection = connections[using]
+        index_class = fulltext_indexes.get(connection.vendor)
+        _indexes[using] = index_class and index_class(connection)
+    return _indexes[using]
+
+
+class UnitFullTextSearch(UnitTextSearch):
+    """Search Unit's fields for text strings, using the db's full text
+    index where it exists
+    """
+
+    @property
+    def index(self):
+        index = get_fulltext_index(self.qs.db)
+        if index and index.exists:
+            return index
+
+    def search_field(self, k, words, exact=False, case=False):
+        subresult = self.qs
+        if self.index:
+            subresult = self.index.filter(subresult, k, words)
+        for word in words:
+            subresult = subresult.filter(
+                **{("%s__icontains" % k): word})
+            if case:
+                subresult = subresult.filter(
+                    **{("%s__contains" % k): word})
+        return subresult
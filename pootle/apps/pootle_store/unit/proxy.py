@@ -10,15 +10,23 @@ from pootle_store.fields import to_python as multistring_to_python
 
 
 class UnitProxy(object):
-    """Wraps a values Unit dictionary"""
+    """Wraps a values Unit dictionary
+
+    Multistring values can be raw db strings, in which case they are parsed
+    on first access.
+    """
+
+    def _get_multistring(self, k):
+        value = self.unit[k] = multistring_to_python(self.unit[k])
+        return value
 
     @property
     def source(self):
-        return multistring_to_python(self.unit["source_f"])
+        return self._get_multistring("source_f")
 
     @property
     def target(self):
-        return multistring_to_python(self.unit["target_f"])
+        return self._get_multistring("target_f")
 
     def __init__(self, unit):
         self.unit = unit
@@ -131,7 +131,7 @@ class GroupedResults(object):
             unit["id"]: unit
             for unit
             in Unit.objects.filter(
-                pk__in=self.units).values(*self.select_fields)}
+                pk__in=self.units).raw_values(*self.select_fields)}
         units = [units[pk] for pk in self.units]
         units_by_path = groupby(
             units,
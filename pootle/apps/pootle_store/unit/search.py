@@ -6,12 +6,22 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import json
+from hashlib import md5
+
+from django.conf import settings
 from django.db.models import Max
 from django.utils.functional import cached_property
 
+from pootle.core.cache import get_cache
+from pootle.core.delegate import revision
+from pootle_app.models import Directory
 from pootle_store.constants import SIMPLY_SORTED
 from pootle_store.models import Unit
 from pootle_store.unit.filters import UnitSearchFilter, UnitTextSearch
+from pootle_store.unit.fulltext import UnitFullTextSearch
+from pootle_store.unit.textindex import get_text_index
+from pootle_translationproject.models import TranslationProject
 
 
 class DBSearchBackend(object):
@@ -21,6 +31,13 @@ class DBSearchBackend(object):
     select_related = (
         'store__translation_project__project',
         'store__translation_project__language')
+    text_search_class = UnitTextSearch
+    # result sets with more units than this are not cached
+    max_cached_results = 100000
+    cache_key_fields = (
+        "project_code", "language_code", "dir_path", "filename", "filter",
+        "checks", "category", "month", "modified-since", "search", "soptions",
+        "sfields", "sort_by", "sort_on")
 
     def __init__(self, request_user, **kwargs):
         self.kwargs = kwargs
@@ -60,6 +77,10 @@ class DBSearchBackend(object):
     def previous_uids(self):
         return self.kwargs.get("previous_uids", []) or []
 
+    @property
+    def cursor(self):
+        return self.kwargs.get("cursor")
+
     @property
     def sort_by(self):
         return self.kwargs.get("sort_by")
@@ -109,6 +130,31 @@ class DBSearchBackend(object):
                 sort_by, "store__pootle_path", "index")
         return qs
 
+    @property
+    def text_index(self):
+        return get_text_index()
+
+    def get_search_tps(self):
+        tps = TranslationProject.objects.all()
+        if self.project_code:
+            tps = tps.filter(project__code=self.project_code)
+        if self.language_code:
+            tps = tps.filter(language__code=self.language_code)
+        return list(tps.values_list("pk", flat=True))
+
+    def prefilter_qs(self, qs, search, sfields, exact):
+        """Narrows down the units to those the text index finds for the
+        ``search`` words.
+        """
+        text_search = self.text_search_class(qs)
+        candidates = self.text_index.find(
+            self.get_search_tps(),
+            text_search.get_words(search, exact),
+            text_search.get_search_fields(sfields))
+        if candidates is None:
+            return qs
+        return qs.filter(pk__in=candidates)
+
     def filter_qs(self, qs):
         kwargs = self.kwargs
         category = kwargs['category']
@@ -121,6 +167,9 @@ class DBSearchBackend(object):
         sfields = kwargs['sfields']
         user = kwargs['user']
 
+        if sfields and search and self.text_index:
+            qs = self.prefilter_qs(qs, search, sfields, exact)
+
         if self.unit_filter:
             qs = UnitSearchFilter().filter(
                 qs, self.unit_filter,
@@ -136,7 +185,7 @@ class DBSearchBackend(object):
                     change__submitted_on__lte=month[1]).distinct()
 
         if sfields and search:
-            qs = UnitTextSearch(qs).search(
+            qs = self.text_search_class(qs).search(
                 search, sfields, exact=exact, case=case)
         return qs
 
@@ -144,13 +193,142 @@ class DBSearchBackend(object):
     def results(self):
         return self.sort_qs(self.filter_qs(self.units_qs))
 
+    @property
+    def results_cache(self):
+        cache_name = settings.POOTLE_SEARCH_RESULTS_CACHE
+        return cache_name and get_cache(cache_name)
+
+    @property
+    def context_path(self):
+        """The path of the directory whose revisions change when the
+        results could change.
+        """
+        if self.language_code and self.project_code:
+            return "/%s/%s/%s" % (
+                self.language_code,
+                self.project_code,
+                self.dir_path or "")
+        if self.project_code:
+            return "/projects/%s/" % self.project_code
+        if self.language_code:
+            return "/%s/" % self.language_code
+        return "/projects/"
+
+    def get_revision(self):
+        directory = Directory.objects.filter(
+            pootle_path=self.context_path).first()
+        if directory is None:
+            return ""
+        revisions = revision.get(Directory)(directory)
+        stats = revisions.get(key="stats")
+        if not stats:
+            return ""
+        return "%s.%s" % (stats, revisions.get(key="checks"))
+
+    def get_cache_key_data(self):
+        data = {
+            k: self.kwargs.get(k)
+            for k
+            in self.cache_key_fields}
+        data["user"] = getattr(self.kwargs.get("user"), "pk", None)
+        data["request_user"] = getattr(self.request_user, "pk", None)
+        return data
+
+    @cached_property
+    def results_key(self):
+        """Identifies the results for the search kwargs, user and context
+        revision, or is ``None`` if the results cant be cached.
+        """
+        if not (self.results_cache and self.chunk_size):
+            return None
+        revision = self.get_revision()
+        if not revision:
+            return None
+        data = json.dumps(
+            self.get_cache_key_data(),
+            sort_keys=True,
+            default=unicode)
+        return md5("%s:%s" % (data, revision)).hexdigest()
+
+    @cached_property
+    def cached_uids(self):
+        """The ordered ids of the results, from the cache where possible.
+
+        Returns ``None`` if the results are not cached.
+        """
+        if self.results_key is None:
+            return None
+        cache_key = "pootle.search.results.%s" % self.results_key
+        uids = self.results_cache.get(cache_key)
+        if uids is not None:
+            return uids
+        uids = list(
+            self.results.values_list(
+                "pk", flat=True)[:self.max_cached_results + 1])
+        if len(uids) > self.max_cached_results:
+            return None
+        self.results_cache.set(cache_key, uids)
+        return uids
+
+    @cached_property
+    def total(self):
+        if self.cached_uids is not None:
+            return len(self.cached_uids)
+        return self.results.count()
+
+    def get_uids(self, start=None, end=None):
+        if self.cached_uids is not None:
+            return self.cached_uids[start:end]
+        return list(self.results[start:end].values_list("pk", flat=True))
+
+    @property
+    def cursor_offset(self):
+        """The offset of the ``cursor``, or ``None`` if the cursor was not
+        issued for the current results.
+        """
+        if not (self.cursor and self.chunk_size):
+            return None
+        if self.cached_uids is None:
+            return None
+        key, __, offset = self.cursor.rpartition(":")
+        if key != self.results_key or not offset.isdigit():
+            return None
+        return min(int(offset), self.total)
+
+    def get_cursor(self, offset):
+        if self.cached_uids is None:
+            return None
+        return "%s:%s" % (self.results_key, offset)
+
+    def get_cursors(self, start, end):
+        """Returns cursors for the chunks before and after the results from
+        ``start`` to ``end``.
+        """
+        cursors = dict(nextCursor=None, previousCursor=None)
+        if self.chunk_size is None:
+            return cursors
+        if end < self.total:
+            cursors["nextCursor"] = self.get_cursor(end)
+        if start > 0:
+            cursors["previousCursor"] = self.get_cursor(
+                max(start - (2 * self.chunk_size), 0))
+        return cursors
+
     def search(self):
-        total = self.results.count()
+        total = self.total
         start = self.offset
 
         if start > (total + len(self.previous_uids)):
             return total, total, total, self.results.none()
 
+        cursor_offset = self.cursor_offset
+        if cursor_offset is not None:
+            # the cursor was issued for these results, so they dont need
+            # adjusting for units that have changed since the last chunk
+            start = cursor_offset
+            end = min(start + (2 * self.chunk_size), total)
+            return total, start, end, self.get_uids(start, end)
+
         find_unit = (
             self.language_code
             and self.project_code
@@ -166,7 +344,7 @@ class DBSearchBackend(object):
             # result set
             _start = start = max(self.offset - len(self.previous_uids), 0)
             end = min(self.offset + (2 * self.chunk_size), total)
-            uid_list = self.results[start:end].values_list("pk", flat=True)
+            uid_list = self.get_uids(start, end)
             offset = 0
             for i, uid in enumerate(uid_list):
                 if uid in self.previous_uids:
@@ -181,7 +359,7 @@ class DBSearchBackend(object):
                 uid_list[offset:offset + (2 * self.chunk_size)])
         if find_unit:
             # find the uid in the Store
-            uid_list = list(self.results.values_list("pk", flat=True))
+            uid_list = self.get_uids()
             if self.chunk_size and self.uids[0] in uid_list:
                 unit_index = uid_list.index(self.uids[0])
                 start = (
@@ -195,4 +373,10 @@ class DBSearchBackend(object):
             total,
             start,
             end,
-            list(self.results[start:end].values_list("pk", flat=True)))
+            self.get_uids(start, end))
+
+
+class FullTextSearchBackend(DBSearchBackend):
+    """Searches unit text using the db's full text index"""
+
+    text_search_class = UnitFullTextSearch
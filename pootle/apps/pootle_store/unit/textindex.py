@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from array import array
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+from pootle_store.models import Unit
+
+from .filters import UnitTextSearch
+
+
+logger = logging.getLogger(__name__)
+
+
+class TextIndexSegment(object):
+    """Postings of the tokens in the text of the units of a translation
+    project, stored on local disk.
+
+    The segment file holds a directory of tokens, followed by the packed
+    ids of the units for each token, and is memory mapped when searched.
+    Units saved since the segment was written are appended to a log, which
+    is merged into the segment once it is bigger than ``max_log_size``.
+    Units are only logged once the segment has been built, or while it is
+    being built.
+
+    The thread ``lock`` is always taken before the file lock of the log.
+
+    Postings are never removed, other than when the segment is rebuilt, so
+    a segment can return units that no longer contain a token.
+    """
+
+    magic = b"PTI1"
+    header = struct.Struct("<4sI")
+    max_log_size = 4 * 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.segment = None
+        self.segment_key = None
+        self.directory = {}
+        self.data_offset = 0
+        self.log = {}
+        self.log_offset = 0
+
+    @property
+    def segment_path(self):
+        return "%s.seg" % self.path
+
+    @property
+    def log_path(self):
+        return "%s.log" % self.path
+
+    @property
+    def building_path(self):
+        return "%s.building" % self.path
+
+    @property
+    def exists(self):
+        return os.path.exists(self.segment_path)
+
+    @property
+    def building(self):
+        return os.path.exists(self.building_path)
+
+    @contextmanager
+    def locked_log(self, shared=False):
+        directory = os.path.dirname(self.path)
+        if not os.path.exists(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # created by another process
+                pass
+        with open(self.log_path, "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_segment_key(self):
+        try:
+            stat = os.stat(self.segment_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime, stat.st_size
+
+    def open_segment(self):
+        self.segment = None
+        self.directory = {}
+        self.data_offset = 0
+        if not self.exists:
+            return
+        with open(self.segment_path, "rb") as f:
+            self.segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size = self.header.unpack_from(self.segment)
+        if magic != self.magic:
+            logger.warning("Ignoring bad text index segment: %s", self.path)
+            self.segment = None
+            return
+        start = self.header.size
+        self.directory = json.loads(
+            self.segment[start:start + size].decode("utf-8"))
+        self.data_offset = start + size + (-size % 4)
+
+    def read_log(self, f):
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == self.log_offset:
+            return
+        f.seek(self.log_offset)
+        data = f.read(size - self.log_offset)
+        for line in data.splitlines():
+            unit_id, tokens = json.loads(line)
+            for token in tokens:
+                self.log.setdefault(token, set()).add(unit_id)
+        self.log_offset = size
+
+    def refresh(self):
+        """Reopens the segment if it has been rewritten, and reads any
+        units that have been added to the log.
+        """
+        with self.locked_log(shared=True) as f:
+            segment_key = self.get_segment_key()
+            if segment_key != self.segment_key:
+                self.open_segment()
+                self.segment_key = segment_key
+                self.log = {}
+                self.log_offset = 0
+            self.read_log(f)
+
+    def get(self, token):
+        ids = set(self.log.get(token, ()))
+        if token in self.directory:
+            offset, count = self.directory[token]
+            start = self.data_offset + offset * 4
+            postings = array("I")
+            postings.fromstring(self.segment[start:start + count * 4])
+            ids.update(postings)
+        return ids
+
+    def find(self, tokens):
+        """Returns the ids of the units that have all of ``tokens``"""
+        with self.lock:
+            self.refresh()
+            result = None
+            for token in tokens:
+                ids = self.get(token)
+                result = ids if result is None else result & ids
+                if not result:
+                    break
+            return result or set()
+
+    def get_postings(self):
+        postings = {}
+        for token, ids in self.log.items():
+            postings.setdefault(token, set()).update(ids)
+        for token in self.directory:
+            postings.setdefault(token, set()).update(self.get(token))
+        return postings
+
+    def write(self, postings):
+        ids = array("I")
+        directory = {}
+        for token, token_ids in postings.items():
+            directory[token] = (len(ids), len(token_ids))
+            ids.extend(sorted(token_ids))
+        directory = json.dumps(directory).encode("utf-8")
+        tmp_path = "%s.%s.tmp" % (self.segment_path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            f.write(self.header.pack(self.magic, len(directory)))
+            f.write(directory)
+            f.write(b"\0" * (-len(directory) % 4))
+            ids.tofile(f)
+        os.rename(tmp_path, self.segment_path)
+
+    def append(self, unit_id, tokens):
+        if not (self.exists or self.building):
+            # the unit will be indexed when the segment is built
+            return
+        with self.lock:
+            with self.locked_log() as f:
+                f.seek(0, os.SEEK_END)
+                f.write(
+                    json.dumps([unit_id, tokens]).encode("utf-8") + b"\n")
+                f.flush()
+                if f.tell() > self.max_log_size and self.exists:
+                    self.merge(f)
+
+    def merge(self, f):
+        """Merges the log into the segment, while the thread lock and the
+        log are locked.
+        """
+        self.open_segment()
+        self.log = {}
+        self.log_offset = 0
+        self.read_log(f)
+        self.write(self.get_postings())
+        f.truncate(0)
+        self.segment_key = None
+
+    def build(self, get_postings):
+        """Rewrites the segment with the postings returned by
+        ``get_postings``.
+
+        Units are only logged once they have been committed, so units
+        logged before ``get_postings`` is called are included in its
+        postings, and only the units logged since are kept in the log.
+        Units are logged while the segment is being built, even if it
+        doesn't exist yet.
+        """
+        with self.lock:
+            with self.locked_log() as f:
+                open(self.building_path, "ab").close()
+                f.seek(0, os.SEEK_END)
+                log_size = f.tell()
+        try:
+            postings = get_postings()
+            with self.lock:
+                with self.locked_log() as f:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell() < log_size:
+                        # the log has been merged in the meantime
+                        log_size = 0
+                    f.seek(log_size)
+                    logged = f.read()
+                    self.write(postings)
+                    f.truncate(0)
+                    f.write(logged)
+                    self.segment_key = None
+        finally:
+            try:
+                os.remove(self.building_path)
+            except OSError:
+                # removed by another build
+                pass
+
+
+class UnitTextIndex(object):
+    """Index of the trigrams in the text fields of units, with a segment
+    for each translation project.
+
+    Units containing a search word contain all of its trigrams, so the
+    index finds candidate units for text searches, which are then checked
+    by the usual search filters.
+    """
+
+    fields = UnitTextSearch.search_fields
+    # searches matching more units than this are not worth prefiltering
+    max_candidates = 500
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.segments = {}
+
+    def get_segment(self, tp_id):
+        with self.lock:
+            if tp_id not in self.segments:
+                self.segments[tp_id] = TextIndexSegment(
+                    os.path.join(self.path, str(tp_id)))
+            return self.segments[tp_id]
+
+    def get_trigrams(self, text):
+        text = text.lower()
+        return set(text[i:i + 3] for i in xrange(len(text) - 2))
+
+    def get_field_tokens(self, field, text):
+        i = self.fields.index(field)
+        return set(
+            u"%s%s" % (i, trigram)
+            for trigram
+            in self.get_trigrams(text))
+
+    def get_unit_tokens(self, unit):
+        tokens = set()
+        for field in self.fields:
+            tokens.update(self.get_field_tokens(field, unit[field] or u""))
+        return tokens
+
+    def get_unit_values(self, unit):
+        values = dict(id=unit.id)
+        for field in self.fields:
+            values[field] = unit._meta.get_field(field).get_prep_value(
+                getattr(unit, field))
+        return values
+
+    def add_unit(self, tp_id, unit):
+        self.get_segment(tp_id).append(
+            unit["id"],
+            sorted(self.get_unit_tokens(unit)))
+
+    def add_saved_unit(self, unit):
+        """Adds a saved ``Unit`` to the index, once it has been committed.
+        """
+        tp_id = unit.store.translation_project_id
+        values = self.get_unit_values(unit)
+        transaction.on_commit(lambda: self.add_unit(tp_id, values))
+
+    def add_units(self, units):
+        """Adds the units of queryset ``units`` to the index, once they have
+        been committed.
+        """
+        tp_field = "store__translation_project_id"
+        values = list(units.raw_values("id", tp_field, *self.fields))
+
+        def _add_units():
+            for unit in values:
+                self.add_unit(unit.pop(tp_field), unit)
+
+        transaction.on_commit(_add_units)
+
+    def get_postings(self, tp_id):
+        postings = {}
+        units = Unit.objects.filter(
+            store__translation_project_id=tp_id).raw_values(
+                "id", *self.fields)
+        for unit in units:
+            for token in self.get_unit_tokens(unit):
+                postings.setdefault(token, []).append(unit["id"])
+        return postings
+
+    def build(self, tp_id):
+        logger.debug("Building text index for translation project %s", tp_id)
+        self.get_segment(tp_id).build(lambda: self.get_postings(tp_id))
+
+    def find(self, tp_ids, words, fields):
+        """Returns the ids of units in the ``tp_ids`` translation projects
+        that may contain all of ``words`` in any of ``fields``.
+
+        Returns ``None`` if the units cant be narrowed down, as the words
+        are too short or match too many units, or any of the translation
+        projects has not been indexed yet. Segments are built by the
+        ``refresh_text_index`` command rather than when searching, as
+        building one can take a long time for large projects.
+        """
+        words = [word for word in words if len(word) > 2]
+        if not words:
+            return None
+        field_tokens = [
+            set().union(
+                *[self.get_field_tokens(field, word)
+                  for word
+                  in words])
+            for field
+            in fields]
+        candidates = set()
+        for tp_id in tp_ids:
+            segment = self.get_segment(tp_id)
+            if not segment.exists:
+                return None
+            for tokens in field_tokens:
+                candidates |= segment.find(tokens)
+            if len(candidates) > self.max_candidates:
+                return None
+        return candidates
+
+
+_text_index = None
+
+
+def get_text_index():
+    """Returns the ``UnitTextIndex`` stored in
+    ``POOTLE_TEXT_INDEX_DIRECTORY``, or ``None`` if it isnt set.
+    """
+    global _text_index
+
+    path = settings.POOTLE_TEXT_INDEX_DIRECTORY
+    if not path:
+        return None
+    if _text_index is None or _text_index.path != path:
+        _text_index = UnitTextIndex(path)
+    return _text_index
@@ -7,17 +7,24 @@
 # AUTHORS file for copyright and authorship information.
 
 import logging
+from contextlib import nested
 
 from django.contrib.auth import get_user_model
+from django.db import router
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
 from django.utils.functional import cached_property
 
+from pootle.core.bulk import bulk_update
 from pootle.core.delegate import frozen, review, versioned
 from pootle.core.models import Revision
-from pootle_store.contextmanagers import update_store_after
+from pootle.core.signals import update_data
+from pootle_statistics.models import SubmissionTypes
+from pootle_store.contextmanagers import bulk_submissions, update_store_after
 
 from .constants import OBSOLETE, PARSED, POOTLE_WINS
 from .diff import StoreDiff
-from .models import Suggestion
+from .models import Suggestion, UnitChange
 from .util import get_change_str
 
 
@@ -33,6 +40,10 @@ class StoreUpdate(object):
         self.source_store = source_store
         self.target_store = target_store
         self.kwargs = kwargs
+        # units whose index has changed, saved together in batched mode
+        self.reindexed = []
+        # units that have been updated, saved together in batched mode
+        self.updated = []
 
     def find_source_unit(self, uid):
         return self.source_store.findid(uid)
@@ -72,6 +83,10 @@ class StoreUpdate(object):
     def user(self):
         return self.kwargs["user"]
 
+    @property
+    def batched(self):
+        return self.kwargs.get("batched", False)
+
     @property
     def suggest_on_conflict(self):
         return self.kwargs.get("suggest_on_conflict", True)
@@ -261,6 +276,9 @@ class UnitUpdater(object):
 
     def save_unit(self):
         self.db_unit.revision = self.update.update_revision
+        if self.update.batched:
+            self.update.updated.append(self.db_unit)
+            return
         self.db_unit.save(
             user=self.update.user,
             changed_with=self.update.submission_type)
@@ -282,7 +300,10 @@ class UnitUpdater(object):
             self.db_unit.index = self.update.get_index(self.uid)
             reordered = True
             if not updated:
-                self.db_unit.save(user=self.update.user)
+                if self.update.batched:
+                    self.update.reindexed.append(self.db_unit)
+                else:
+                    self.db_unit.save(user=self.update.user)
         if self.should_create_suggestion:
             suggested = self.create_suggestion()
         if updated:
@@ -290,9 +311,99 @@ class UnitUpdater(object):
         return (updated or reordered), suggested
 
 
+class BulkUnitSaver(object):
+    """Saves changed units of a store, with their ``UnitSource`` and
+    ``UnitChange``, using bulk updates and inserts rather than a
+    ``Unit.save`` for each unit.
+
+    The save signals are still sent for each object, so the receivers that
+    update wordcounts, unit ids, checks and lifecycle submissions run as
+    they do when saving a unit. Only units that already exist can be saved.
+    """
+
+    def __init__(self, store, user=None, changed_with=None):
+        self.store = store
+        self.user = user or get_user_model().objects.get_system_user()
+        self.changed_with = changed_with or SubmissionTypes.SYSTEM
+
+    def send_pre_save(self, model, objects):
+        using = router.db_for_write(model)
+        for obj in objects:
+            pre_save.send(
+                sender=model, instance=obj, raw=False, using=using,
+                update_fields=None)
+
+    def send_post_save(self, model, objects, created=False):
+        using = router.db_for_write(model)
+        for obj in objects:
+            post_save.send(
+                sender=model, instance=obj, created=created, raw=False,
+                using=using, update_fields=None)
+
+    def update(self, model, objects, fields=None):
+        self.send_pre_save(model, objects)
+        bulk_update(objects, update_fields=fields)
+        self.send_post_save(model, objects)
+
+    def create_changes(self, changes):
+        self.send_pre_save(UnitChange, changes)
+        UnitChange.objects.bulk_create(changes)
+        missing_pks = [change for change in changes if change.pk is None]
+        if missing_pks:
+            # not all db backends return the ids of created rows
+            pks = dict(
+                UnitChange.objects.filter(
+                    unit_id__in=[change.unit_id for change in missing_pks])
+                                  .values_list("unit_id", "pk"))
+            for change in missing_pks:
+                change.pk = pks[change.unit_id]
+        for change in changes:
+            change._state.adding = False
+            change._state.db = router.db_for_write(UnitChange)
+        self.send_post_save(UnitChange, changes, created=True)
+
+    def save(self, units):
+        if not units:
+            return
+        mtime = timezone.now()
+        for unit in units:
+            unit.mtime = mtime
+        self.update(
+            units[0].__class__, units,
+            fields=units[0].get_update_fields())
+        sources = [
+            unit.unit_source
+            for unit
+            in units
+            if unit.source_updated]
+        if sources:
+            self.update(sources[0].__class__, sources)
+        new_changes = []
+        changes = []
+        for unit in units:
+            change = unit.update_change(
+                self.user, self.user, self.changed_with, mtime)
+            if change is None:
+                continue
+            elif change.pk is None:
+                new_changes.append(change)
+            else:
+                changes.append(change)
+        if new_changes:
+            self.create_changes(new_changes)
+        if changes:
+            self.update(UnitChange, changes)
+        update_data.send(self.store.__class__, instance=self.store)
+
+
 class StoreUpdater(object):
 
     unit_updater_class = UnitUpdater
+    # revisions reserved for an update - the ``update_revision`` that the
+    # added, obsoleted and updated units are all saved with, and one for
+    # the units changed since the last sync. Any other unit revisions are
+    # taken from the counter as usual.
+    reserved_revisions = 2
 
     def __init__(self, target_store):
         self.target_store = target_store
@@ -308,18 +419,23 @@ class StoreUpdater(object):
 
     def units(self, uids):
         unit_set = self.target_store.unit_set.select_related(
-            "change", "change__submitted_by")
+            "change", "change__submitted_by", "unit_source")
         for unit in self.target_store.findid_bulk(uids, unit_set):
             unit.store = self.target_store
             yield unit
 
     def update(self, *args, **kwargs):
-        with update_store_after(self.target_store):
+        if not kwargs.get("batched"):
+            with update_store_after(self.target_store):
+                return self._update(*args, **kwargs)
+        # submissions are saved before the aggregate signals are sent
+        with nested(update_store_after(self.target_store),
+                    bulk_submissions(self.target_store)):
             return self._update(*args, **kwargs)
 
     def _update(self, store, user=None, store_revision=None,
                 submission_type=None, resolve_conflict=POOTLE_WINS,
-                allow_add_and_obsolete=True):
+                allow_add_and_obsolete=True, batched=False):
         old_state = self.target_store.state
 
         if user is None:
@@ -331,14 +447,16 @@ class StoreUpdater(object):
         try:
             diff = StoreDiff(self.target_store, store, store_revision).diff()
             if diff is not None:
-                update_revision = Revision.incr()
-                changes = self.update_from_diff(
-                    store,
-                    store_revision,
-                    diff, update_revision,
-                    user, submission_type,
-                    resolve_conflict,
-                    allow_add_and_obsolete)
+                with Revision.reserved(self.reserved_revisions):
+                    update_revision = Revision.incr()
+                    changes = self.update_from_diff(
+                        store,
+                        store_revision,
+                        diff, update_revision,
+                        user, submission_type,
+                        resolve_conflict,
+                        allow_add_and_obsolete,
+                        batched)
         finally:
             if old_state < PARSED:
                 self.target_store.state = PARSED
@@ -358,30 +476,29 @@ class StoreUpdater(object):
         :param uids_to_obsolete: UIDs of the units to be marked as obsolete.
         :return: The number of units marked as obsolete.
         """
-        obsoleted = 0
+        obsoleted = []
         old_store = update.last_sync_store
-        for unit in self.target_store.findid_bulk(uids_to_obsolete):
-            # Use the same (parent) object since units will
-            # accumulate the list of cache attributes to clear
-            # in the parent Store object
+        for unit in self.units(uids_to_obsolete):
             added_since_sync = not bool(old_store.findid(unit.getid()))
             pootle_wins = (
                 (unit.revision > update.store_revision or 0)
                 and update.resolve_conflict == POOTLE_WINS)
             if added_since_sync or pootle_wins:
                 continue
-            unit.store = self.target_store
             if not unit.isobsolete():
                 unit.makeobsolete()
                 unit.revision = update.update_revision
-                unit.save(user=update.user)
-                obsoleted += 1
-        return obsoleted
+                if not update.batched:
+                    unit.save(user=update.user)
+                obsoleted.append(unit)
+        if update.batched:
+            BulkUnitSaver(self.target_store, update.user).save(obsoleted)
+        return len(obsoleted)
 
     def update_from_diff(self, store, store_revision,
                          to_change, update_revision, user,
                          submission_type, resolve_conflict=POOTLE_WINS,
-                         allow_add_and_obsolete=True):
+                         allow_add_and_obsolete=True, batched=False):
         changes = {}
         update_dbids, uid_index_map = to_change['update']
         update = StoreUpdate(
@@ -394,7 +511,8 @@ class StoreUpdater(object):
             uids=update_dbids,
             indices=uid_index_map,
             store_revision=store_revision,
-            update_revision=update_revision)
+            update_revision=update_revision,
+            batched=batched)
 
         if resolve_conflict == POOTLE_WINS:
             to_change["obsolete"] = [
@@ -440,4 +558,21 @@ class StoreUpdater(object):
                 update_count += 1
             if suggested:
                 suggestion_count += 1
+        BulkUnitSaver(
+            self.target_store,
+            update.user,
+            update.submission_type).save(update.updated)
+        self.save_reindexed(update.reindexed)
         return update_count, suggestion_count
+
+    def save_reindexed(self, units):
+        """Saves the indices of units that have only been reordered."""
+        if not units:
+            return
+        mtime = timezone.now()
+        for unit in units:
+            unit.mtime = mtime
+        bulk_update(units, update_fields=["index", "mtime"])
+        update_data.send(
+            self.target_store.__class__,
+            instance=self.target_store)
@@ -6,12 +6,15 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from collections import OrderedDict
+import threading
+from collections import OrderedDict, defaultdict
+from hashlib import md5
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.template import loader
 from django.utils import timezone
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 
 from pootle.core.delegate import site, states, unitid
@@ -29,10 +32,56 @@ from .models import Suggestion
 User = get_user_model()
 
 
+class CollectedSubmissions(threading.local):
+    """Submissions created by unit lifecycles in the current thread, while
+    ``pootle_store.contextmanagers.bulk_submissions`` is active.
+
+    Collected submissions are not in the db until they are flushed, so code
+    that reads a unit's submissions while they are being collected should
+    call ``flush`` first.
+    """
+
+    subs = None
+    sender = None
+    batch_size = 1000
+
+    def flush(self):
+        """Saves the submissions collected so far."""
+        if not self.subs:
+            return
+        subs = self.subs
+        self.subs = []
+        subs[0].__class__.objects.bulk_create(
+            subs,
+            batch_size=self.batch_size)
+        users = defaultdict(set)
+        for sub in subs:
+            users[localdate(sub.creation_time)].add(sub.submitter_id)
+        for date, date_users in users.items():
+            update_scores.send(
+                self.sender.__class__,
+                instance=self.sender,
+                users=list(date_users),
+                date=date)
+
+
+collected_submissions = CollectedSubmissions()
+
+
 class UnitWordcount(object):
+    """Counts the words in unit sources and targets.
+
+    The same source string is usually found in every language of a project,
+    so source wordcounts are memoized by the source hash, and the least
+    recently used counts are dropped once there are more than `memo_size`.
+    """
+
+    memo_size = 10000
 
     def __init__(self, counter):
         self.counter = counter
+        self.lock = threading.Lock()
+        self.memo = OrderedDict()
 
     def count(self, string):
         return self.counter(string)
@@ -40,6 +89,32 @@ class UnitWordcount(object):
     def count_words(self, strings):
         return sum(self.count(string) for string in strings)
 
+    def get_source_hash(self, source):
+        """Returns the md5 of all of the strings of `source`, which is the
+        same as the md5 of the source for sources with a single string.
+        """
+        strings = getattr(source, "strings", [source])
+        return md5(force_bytes(u"\x00".join(strings))).hexdigest()
+
+    def count_source(self, source, source_hash=None):
+        source_hash = source_hash or self.get_source_hash(source)
+        with self.lock:
+            wordcount = self.memo.pop(source_hash, None)
+            if wordcount is not None:
+                # move to the end of the lru
+                self.memo[source_hash] = wordcount
+                return wordcount
+        wordcount = self.count_words(source.strings) or 0
+        with self.lock:
+            self.memo[source_hash] = wordcount
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+        return wordcount
+
+    def clear(self):
+        with self.lock:
+            self.memo = OrderedDict()
+
 
 class DefaultUnitid(object):
 
@@ -213,6 +288,7 @@ class SuggestionsReview(object):
         old_revision = suggestion.unit.revision
         self.update_unit_on_accept(suggestion, target=target)
         if suggestion.unit.revision > old_revision:
+            collected_submissions.flush()
             suggestion.submission_set.add(
                 *suggestion.unit.submission_set.filter(
                     revision=suggestion.unit.revision))
@@ -347,6 +423,9 @@ class UnitLifecycle(object):
         subs = list(subs)
         if not subs:
             return
+        if collected_submissions.subs is not None:
+            collected_submissions.subs.extend(subs)
+            return
         self.unit.submission_set.bulk_create(subs)
         update_scores.send(
             self.unit.store.__class__,
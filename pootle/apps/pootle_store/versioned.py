@@ -21,43 +21,61 @@ class VersionedStore(object):
                     include_obsolete=True,
                     raw=True)))
 
-    def _revert_state(self, unit, sub):
-        if sub.old_value == "50":
+    def _revert_state(self, unit, old_value, new_value):
+        if old_value == "50":
             unit.markfuzzy()
-        if sub.old_value == "-100":
+        if old_value == "-100":
             unit.makeobsolete()
-        if sub.old_value in ["0", "200"]:
-            if sub.new_value == "50":
+        if old_value in ["0", "200"]:
+            if new_value == "50":
                 unit.markfuzzy(False)
-            if sub.new_value == "-100":
+            if new_value == "-100":
                 unit.resurrect()
 
+    def get_units_by_id(self, store):
+        return {unit.getid(): unit for unit in store.units}
+
+    def remove_units(self, store, unitids):
+        store.units = [
+            unit for unit
+            in store.units
+            if unit.getid() not in unitids]
+        store.makeindex()
+
+    def get_submissions(self, revision):
+        """Target and state changes since `revision`, in the order they
+        were made
+        """
+        subs = Submission.objects.filter(
+            unit__store=self.store,
+            revision__gt=revision,
+            field__in=[SubmissionFields.TARGET, SubmissionFields.STATE])
+        return subs.order_by("revision", "creation_time").values_list(
+            "unit_id", "unit__unitid", "field", "old_value", "new_value")
+
     def at_revision(self, revision):
+        """Returns the store as it was at `revision`, by reverting the
+        first change to the target and state of each unit since then
+        """
         store = self.current_store
-        subs = Submission.objects.filter(
-            unit__store=self.store).filter(
-                revision__gt=revision).order_by(
-                    "revision", "creation_time")
-        checking = dict(target=[], state=[])
-        unit_creation = self.store.unit_set.filter(
-            unit_source__creation_revision__gt=revision).values_list(
-                "unitid", flat=True)
-        for unit in unit_creation:
-            del store.units[store.units.index(store.findid(unit))]
-            del store.id_index[unit]
-
-        for sub in subs.iterator():
-            unit = store.findid(sub.unit.getid())
-            if not unit:
+        created = set(
+            self.store.unit_set.filter(
+                unit_source__creation_revision__gt=revision).values_list(
+                    "unitid", flat=True))
+        if created:
+            self.remove_units(store, created)
+        units = self.get_units_by_id(store)
+        reverted = {
+            SubmissionFields.TARGET: set(),
+            SubmissionFields.STATE: set()}
+        subs = self.get_submissions(revision)
+        for unit_id, unitid, field, old_value, new_value in subs.iterator():
+            unit = units.get(unitid)
+            if not unit or unit_id in reverted[field]:
                 continue
-            if sub.field == SubmissionFields.TARGET:
-                if sub.unit.pk in checking["target"]:
-                    continue
-                checking["target"].append(sub.unit.pk)
-                unit.target = sub.old_value
-            if sub.field == SubmissionFields.STATE:
-                if sub.unit.pk in checking["state"]:
-                    continue
-                checking["state"].append(sub.unit.pk)
-                self._revert_state(unit, sub)
+            reverted[field].add(unit_id)
+            if field == SubmissionFields.TARGET:
+                unit.target = old_value
+            else:
+                self._revert_state(unit, old_value, new_value)
         return store
@@ -92,7 +92,7 @@ def _filter_ctx_units(units_qs, unit, how_many, gap=0):
     """Returns ``how_many``*2 units that are before and after ``index``."""
     result = {'before': [], 'after': []}
 
-    if how_many and unit.index - gap > 0:
+    if how_many:
         before = units_qs.filter(store=unit.store_id, index__lt=unit.index) \
                          .order_by('-index')[gap:how_many+gap]
         result['before'] = _build_units_list(before, reverse=True)
@@ -169,6 +169,9 @@ def get_units(request, **kwargs_):
 
         When the `initial` GET parameter is present, a sorted list of
         the result set ids will be returned too.
+
+        `nextCursor` and `previousCursor` can be passed back as the
+        `cursor` GET parameter to fetch the adjacent chunks.
     """
     search_form = UnitSearchForm(request.GET, user=request.user)
 
@@ -182,13 +185,16 @@ def get_units(request, **kwargs_):
                     raise Http400(_('Arguments missing.'))
         raise Http404(forms.ValidationError(search_form.errors).messages)
 
-    total, start, end, units_qs = search_backend.get(Unit)(
-        request.user, **search_form.cleaned_data).search()
-    return JsonResponse(
-        {'start': start,
-         'end': end,
-         'total': total,
-         'unitGroups': GroupedResults(units_qs).data})
+    backend = search_backend.get(Unit)(
+        request.user, **search_form.cleaned_data)
+    total, start, end, units_qs = backend.search()
+    response = {
+        'start': start,
+        'end': end,
+        'total': total,
+        'unitGroups': GroupedResults(units_qs).data}
+    response.update(backend.get_cursors(start, end))
+    return JsonResponse(response)
 
 
 @ajax_required
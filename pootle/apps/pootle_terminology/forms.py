@@ -33,7 +33,7 @@ def term_unit_form_factory(terminology_store):
             value = self.cleaned_data['index']
 
             if self.instance.id is None:
-                value = terminology_store.max_index() + 1
+                value = terminology_store.next_index()
 
             return value
 
@@ -19,3 +19,8 @@ class VFolderDBSearchBackend(DBSearchBackend):
     def filter_qs(self, qs):
         filtered = super(VFolderDBSearchBackend, self).filter_qs(qs)
         return filtered.filter(store__vfolders=self.vfolder)
+
+    def get_cache_key_data(self):
+        data = super(VFolderDBSearchBackend, self).get_cache_key_data()
+        data["vfolder"] = self.vfolder.pk
+        return data
@@ -90,6 +90,9 @@ def get_vfolder_units(request, **kwargs):
 
         When the `initial` GET parameter is present, a sorted list of
         the result set ids will be returned too.
+
+        `nextCursor` and `previousCursor` can be passed back as the
+        `cursor` GET parameter to fetch the adjacent chunks.
     """
     search_form = UnitSearchForm(request.GET, user=request.user)
 
@@ -111,11 +114,13 @@ def get_vfolder_units(request, **kwargs):
     backend = search_backend.get(VirtualFolder)(
         request.user, **search_form.cleaned_data)
     total, start, end, units_qs = backend.search()
-    return JsonResponse(
-        {'start': start,
-         'end': end,
-         'total': total,
-         'unitGroups': GroupedResults(units_qs).data})
+    response = {
+        'start': start,
+        'end': end,
+        'total': total,
+        'unitGroups': GroupedResults(units_qs).data}
+    response.update(backend.get_cursors(start, end))
+    return JsonResponse(response)
 
 
 class VFoldersDataView(object):
@@ -9,7 +9,7 @@
 import logging
 import time
 
-from bulk_update.helper import bulk_update
+from pootle.core.bulk import bulk_update
 
 
 logger = logging.getLogger(__name__)
@@ -21,7 +21,22 @@ class Batch(object):
         self.target = target
         self.batch_size = batch_size
 
-    def batched_create(self, qs, create_method, reduces=True):
+    def batched_create(self, qs, create_method, reduces=True, cursor=False):
+        if cursor:
+            return self.cursor_batched_create(qs, create_method)
+        return self.offset_batched_create(qs, create_method, reduces)
+
+    def create_objects(self, items, create_method):
+        return self.target.bulk_create(
+            self.target.model(
+                **create_method(
+                    *(args
+                      if isinstance(args, (list, tuple))
+                      else [args])))
+            for args
+            in items)
+
+    def offset_batched_create(self, qs, create_method, reduces=True):
         complete = 0
         offset = 0
         if isinstance(qs, (list, tuple)):
@@ -35,14 +50,9 @@ class Batch(object):
             else 0)
         while True:
             complete += self.batch_size
-            result = self.target.bulk_create(
-                self.target.model(
-                    **create_method(
-                        *(args
-                          if isinstance(args, (list, tuple))
-                          else [args])))
-                for args
-                in self.iterate_qs(qs, offset))
+            result = self.create_objects(
+                self.iterate_qs(qs, offset),
+                create_method)
             if not result:
                 break
             logger.debug(
@@ -55,9 +65,23 @@ class Batch(object):
                 break
             offset = offset + step
 
-    def create(self, qs, create_method, reduces=True):
+    def cursor_batched_create(self, qs, create_method):
+        complete = 0
+        start = time.time()
+        for items in self.iterate_cursor(qs):
+            result = self.create_objects(items, create_method)
+            complete += len(result)
+            logger.debug(
+                "added %s in %s seconds",
+                complete,
+                (time.time() - start))
+            yield result
+
+    def create(self, qs, create_method, reduces=True, cursor=False):
         created = 0
-        for result in self.batched_create(qs, create_method, reduces):
+        batches = self.batched_create(
+            qs, create_method, reduces, cursor=cursor)
+        for result in batches:
             created += len(result)
         return created
 
@@ -66,19 +90,78 @@ class Batch(object):
             return qs[offset:offset + self.batch_size]
         return qs[offset:offset + self.batch_size].iterator()
 
+    def iterate_cursor(self, qs):
+        """Yields lists of items from ``qs`` walking it in ``pk`` order.
+
+        Each batch is selected with a ``pk`` range rather than an offset, so
+        the cost of fetching a batch does not grow as the iteration proceeds.
+
+        Lists and tuples have no ``pk`` order, and are yielded in slices of
+        ``batch_size`` items in their own order.
+        """
+        if isinstance(qs, (list, tuple)):
+            for offset in xrange(0, len(qs), self.batch_size):
+                yield list(qs[offset:offset + self.batch_size])
+            return
+        last_pk = None
+        while True:
+            remaining = qs.order_by("pk")
+            if last_pk is not None:
+                remaining = remaining.filter(pk__gt=last_pk)
+            upper = list(
+                remaining.values_list("pk", flat=True)[
+                    self.batch_size - 1:self.batch_size])
+            if upper:
+                remaining = remaining.filter(pk__lte=upper[0])
+            items = list(remaining.iterator())
+            if items:
+                yield items
+            if not upper:
+                break
+            last_pk = upper[0]
+
     def bulk_update(self, objects, update_fields=None):
         return bulk_update(objects, update_fields=update_fields)
 
     def objects_to_update(self, qs, offset, update_method=None):
+        return self.apply_update_method(
+            self.iterate_qs(qs, offset),
+            update_method)
+
+    def apply_update_method(self, items, update_method=None):
         if not update_method:
-            return list(self.iterate_qs(qs, offset))
+            return list(items)
         return [
             update_method(item)
             for item
-            in self.iterate_qs(qs, offset)]
+            in items]
 
     def batched_update(self, qs, update_method=None, reduces=True,
-                       update_fields=None):
+                       update_fields=None, cursor=False):
+        if cursor:
+            return self.cursor_batched_update(
+                qs, update_method, update_fields)
+        return self.offset_batched_update(
+            qs, update_method, reduces, update_fields)
+
+    def cursor_batched_update(self, qs, update_method=None,
+                              update_fields=None):
+        complete = 0
+        start = time.time()
+        for items in self.iterate_cursor(qs):
+            objects_to_update = self.apply_update_method(items, update_method)
+            complete += len(objects_to_update)
+            result = self.bulk_update(
+                objects=objects_to_update,
+                update_fields=update_fields)
+            logger.debug(
+                "updated %s in %s seconds",
+                complete,
+                (time.time() - start))
+            yield result
+
+    def offset_batched_update(self, qs, update_method=None, reduces=True,
+                              update_fields=None):
         complete = 0
         offset = 0
         if isinstance(qs, (list, tuple)):
@@ -108,10 +191,12 @@ class Batch(object):
                 break
             offset = offset + step
 
-    def update(self, qs, update_method=None, reduces=True, update_fields=None):
+    def update(self, qs, update_method=None, reduces=True, update_fields=None,
+               cursor=False):
         return sum(
             self.batched_update(
                 qs,
                 update_method,
                 reduces,
-                update_fields))
+                update_fields,
+                cursor=cursor))
@@ -8,12 +8,235 @@
 
 import logging
 
-from bulk_update.helper import bulk_update
+from django.db import connections, router
+from django.db.models import Case, F, Value, When
 
 
 logger = logging.getLogger(__name__)
 
 
+def get_original_values(obj):
+    """Returns the values of ``obj`` recorded before they were changed."""
+    return obj.__dict__.setdefault("_original_values", {})
+
+
+def record_original_value(obj, name):
+    """Keeps the value of ``name`` before it is first changed, so that the
+    next bulk update of ``obj`` can tell whether it has changed.
+    """
+    get_original_values(obj).setdefault(name, getattr(obj, name))
+
+
+def clear_original_values(obj):
+    obj.__dict__.pop("_original_values", None)
+
+
+class BulkUpdateEngine(object):
+    """Updates ``fields`` on many objects using a single ``UPDATE`` per
+    chunk of objects.
+
+    Only objects and fields that have changed are written. Values are
+    compared with those recorded with ``record_original_value``, and fields
+    without a recorded value are always written. Recorded values are
+    cleared by each update, as the object may be saved in other ways
+    afterwards.
+    """
+
+    batch_size = 1000
+
+    def __init__(self, model, using=None, batch_size=None):
+        self.model = model
+        self.using = using or router.db_for_write(model)
+        if batch_size is not None:
+            self.batch_size = batch_size
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def get_fields(self, fields=None):
+        if fields is None:
+            return [
+                field
+                for field
+                in self.model._meta.concrete_fields
+                if not field.primary_key]
+        return [
+            self.model._meta.get_field(field)
+            for field
+            in fields]
+
+    def get_batch_size(self, objects, fields):
+        # each object uses a param for its pk, plus one for each field value
+        # and one for each pk in a ``WHEN`` clause
+        params = [self.model._meta.pk] + (fields * 2)
+        return max(
+            1,
+            min(self.batch_size,
+                self.connection.ops.bulk_batch_size(params, objects)))
+
+    def chunks(self, objects, fields):
+        batch_size = self.get_batch_size(objects, fields)
+        for i in range(0, len(objects), batch_size):
+            yield objects[i:i + batch_size]
+
+    def get_changed_fields(self, obj, fields):
+        original = get_original_values(obj)
+        return [
+            field
+            for field
+            in fields
+            if (field.attname not in original
+                or original[field.attname] != getattr(obj, field.attname))]
+
+    def get_changes(self, objects, fields):
+        """Returns a list of ``(obj, changed_fields)`` for changed objects.
+        """
+        changes = []
+        for obj in objects:
+            if obj.pk is None:
+                continue
+            changed = self.get_changed_fields(obj, fields)
+            if changed:
+                changes.append((obj, changed))
+        return changes
+
+    def get_chunk_fields(self, changes):
+        chunk_fields = set()
+        for obj_, changed in changes:
+            chunk_fields.update(changed)
+        return [
+            field
+            for field
+            in self.model._meta.concrete_fields
+            if field in chunk_fields]
+
+    def update(self, objects, fields=None):
+        fields = self.get_fields(fields)
+        if not fields:
+            return 0
+        changes = self.get_changes(objects, fields)
+        for obj in objects:
+            clear_original_values(obj)
+        updated = 0
+        for chunk in self.chunks(changes, fields):
+            updated += self.update_chunk(chunk, self.get_chunk_fields(chunk))
+        return updated
+
+    def update_chunk(self, changes, fields):
+        raise NotImplementedError
+
+
+class CaseUpdateEngine(BulkUpdateEngine):
+    """Updates using ``SET field = CASE WHEN pk = ... THEN ... END``.
+
+    Fields are only set for the objects they have changed on, and fields
+    that have changed to the same value on every object in a chunk are set
+    directly.
+    """
+
+    def field_update(self, changes, field):
+        values = [
+            (obj.pk, getattr(obj, field.attname))
+            for obj, changed
+            in changes
+            if field in changed]
+        first = values[0][1]
+        common = (
+            len(values) == len(changes)
+            and all(value == first for pk_, value in values[1:]))
+        if common:
+            return Value(first, output_field=field)
+        return Case(
+            *[When(pk=pk, then=Value(value, output_field=field))
+              for pk, value
+              in values],
+            default=F(field.attname),
+            output_field=field)
+
+    def update_chunk(self, changes, fields):
+        return self.model._base_manager.using(self.using).filter(
+            pk__in=[obj.pk for obj, changed_ in changes]).update(
+                **{field.attname: self.field_update(changes, field)
+                   for field
+                   in fields})
+
+
+class ValuesUpdateEngine(BulkUpdateEngine):
+    """Updates by joining the table against a ``VALUES`` list.
+
+    Used for backends supporting ``UPDATE ... FROM (VALUES ...)``.
+    """
+
+    def cast_type(self, field):
+        if field.primary_key:
+            # dont cast to ``serial`` for auto pks
+            return field.rel_db_type(self.connection)
+        return field.db_type(self.connection)
+
+    def update_chunk(self, changes, fields):
+        objects = [obj for obj, changed_ in changes]
+        qn = self.connection.ops.quote_name
+        pk = self.model._meta.pk
+        table = qn(self.model._meta.db_table)
+        columns = [pk] + fields
+        row = "(%s)" % ", ".join(
+            "CAST(%%s AS %s)" % self.cast_type(field)
+            for field
+            in columns)
+        params = []
+        for obj in objects:
+            params.extend(
+                field.get_db_prep_save(
+                    getattr(obj, field.attname),
+                    connection=self.connection)
+                for field
+                in columns)
+        sql = (
+            "UPDATE %s SET %s FROM (VALUES %s) AS __values (%s) "
+            "WHERE %s.%s = __values.%s"
+            % (table,
+               ", ".join(
+                   "%s = __values.%s" % (qn(field.column), qn(field.column))
+                   for field
+                   in fields),
+               ", ".join([row] * len(objects)),
+               ", ".join(qn(field.column) for field in columns),
+               table,
+               qn(pk.column),
+               qn(pk.column)))
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+
+update_engines = {
+    "postgresql": ValuesUpdateEngine}
+
+
+def get_update_engine(model, using=None, batch_size=None):
+    using = using or router.db_for_write(model)
+    engine = update_engines.get(
+        connections[using].vendor,
+        CaseUpdateEngine)
+    return engine(model, using=using, batch_size=batch_size)
+
+
+def bulk_update(objects, update_fields=None, using=None, batch_size=None):
+    """Updates ``update_fields`` (or all concrete fields) of ``objects``
+    using the update engine for the database backend.
+
+    Returns the number of rows updated.
+    """
+    objects = list(objects)
+    if not objects:
+        return 0
+    return get_update_engine(
+        objects[0].__class__,
+        using=using,
+        batch_size=batch_size).update(objects, fields=update_fields)
+
+
 class BulkCRUD(object):
 
     model = None
@@ -84,6 +307,7 @@ class BulkCRUD(object):
     def update_object(self, obj, update):
         for k, v in update.items():
             if not getattr(obj, k) == v:
+                record_original_value(obj, k)
                 setattr(obj, k, v)
                 yield k
 
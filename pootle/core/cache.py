@@ -6,6 +6,11 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import cPickle as pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
 
 from django.conf import settings
 from django.core.cache import cache as default_cache, caches
@@ -13,6 +18,12 @@ from django.core.cache.backends.base import InvalidCacheBackendError
 from django.core.exceptions import ImproperlyConfigured
 
 
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
 PERSISTENT_STORES = ('redis',)
 
 
@@ -64,3 +75,156 @@ def get_cache(cache=None):
         return caches[cache]
     except InvalidCacheBackendError:
         return default_cache
+
+
+class LocalCache(object):
+    """A small in-process LRU cache with a per-item timeout.
+
+    :param size: Maximum number of items kept.
+    :param timeout: Seconds before an item expires.
+    """
+
+    def __init__(self, size=500, timeout=60):
+        self.size = size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        with self.lock:
+            item = self.items.pop(key, None)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.time():
+                return default
+            # move to the end of the lru
+            self.items[key] = item
+            return value
+
+    def set(self, key, value, timeout=None):
+        if not self.size:
+            return
+        expires = time.time() + (
+            self.timeout
+            if timeout is None
+            else timeout)
+        with self.lock:
+            self.items.pop(key, None)
+            self.items[key] = (expires, value)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+class PickledValue(object):
+    """A pickled cache value, compressed with ``compressor`` unless it is
+    ``None``.
+    """
+
+    def __init__(self, compressor, data):
+        self.compressor = compressor
+        self.data = data
+
+
+class CompactRows(object):
+    """A list of dicts sharing the same keys, stored as the keys and a tuple
+    of values for each dict.
+    """
+
+    def __init__(self, keys, rows):
+        self.keys = keys
+        self.rows = rows
+
+    def expand(self):
+        return [dict(zip(self.keys, row)) for row in self.rows]
+
+
+class CompactMapping(CompactRows):
+    """A dict of dicts sharing the same keys, stored as the keys and a
+    (name, values) tuple for each dict.
+    """
+
+    def expand(self):
+        return {
+            name: dict(zip(self.keys, row))
+            for name, row
+            in self.rows}
+
+
+class CacheCodec(object):
+    """Encodes values for caching.
+
+    Lists and dicts of dicts with the same keys are stored as tuples, and
+    values that pickle to at least `threshold` bytes are compressed. Values
+    are stored pickled, so the cache only has to store the bytes.
+    """
+
+    compressors = {
+        "zlib": (zlib.compress, zlib.decompress)}
+    if lz4_frame is not None:
+        compressors["lz4"] = (lz4_frame.compress, lz4_frame.decompress)
+
+    def __init__(self, threshold=16384, compressor="zlib"):
+        self.threshold = threshold
+        if compressor not in self.compressors:
+            compressor = "zlib"
+        self.compressor = compressor
+
+    def _row_keys(self, rows):
+        if not all(type(row) is dict for row in rows):
+            return
+        keys = tuple(rows[0].keys())
+        key_set = set(keys)
+        if all(set(row.keys()) == key_set for row in rows[1:]):
+            return keys
+
+    def compact(self, value):
+        if type(value) is list and value:
+            keys = self._row_keys(value)
+            if keys is not None:
+                return CompactRows(
+                    keys,
+                    [tuple(row[k] for k in keys) for row in value])
+        elif type(value) is dict and value:
+            keys = self._row_keys(value.values())
+            if keys is not None:
+                return CompactMapping(
+                    keys,
+                    [(name, tuple(row[k] for k in keys))
+                     for name, row
+                     in value.items()])
+        return value
+
+    def encode(self, value):
+        """Encodes a value for caching.
+
+        :return: a tuple of the encoded value, and the size in bytes of the
+            value when pickled before and after compression.
+        """
+        data = pickle.dumps(self.compact(value), pickle.HIGHEST_PROTOCOL)
+        if not self.threshold or len(data) < self.threshold:
+            return PickledValue(None, data), len(data), len(data)
+        compress = self.compressors[self.compressor][0]
+        compressed = PickledValue(self.compressor, compress(data))
+        return compressed, len(data), len(compressed.data)
+
+    def decode(self, value):
+        if isinstance(value, PickledValue):
+            data = value.data
+            if value.compressor is not None:
+                data = self.compressors[value.compressor][1](data)
+            value = pickle.loads(data)
+        if isinstance(value, CompactRows):
+            return value.expand()
+        return value
@@ -6,8 +6,10 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import logging
 import threading
 import types
+from collections import OrderedDict
 from contextlib import contextmanager, nested
 
 from django.dispatch import Signal, receiver
@@ -17,16 +19,39 @@ from pootle.core.signals import (
     update_scores)
 
 
+logger = logging.getLogger(__name__)
+
+# number of primary keys to include in each delete/update sent on exiting
+# a bulk context
+BULK_CHUNK_SIZE = 5000
+
+
 class BulkUpdated(object):
+    chunk_size = BULK_CHUNK_SIZE
     create = None
-    delete_qs = None
     delete = None
     delete_ids = None
+    delete_received = 0
     update_qs = None
     update = None
     updates = None
     update_fields = None
     update_objects = None
+    update_received = 0
+
+    @property
+    def update_ids(self):
+        return (
+            set(self.update_objects or ())
+            | set(self.updates or ()))
+
+    @property
+    def collapsed(self):
+        """Number of rows that were requested more than once, by operation
+        """
+        return dict(
+            delete=self.delete_received - len(self.delete_ids or ()),
+            update=self.update_received - len(self.update_ids))
 
 
 @contextmanager
@@ -84,26 +109,24 @@ def keep_data(keep=True, signals=None, suppress=None):
 
 
 def _create_handler(updated, **kwargs):
-    to_create = kwargs.get("objects") or []
-    to_create += (
-        [kwargs.get("instance")]
-        if kwargs.get("instance")
-        else [])
+    to_create = list(kwargs.get("objects") or [])
+    if kwargs.get("instance"):
+        to_create.append(kwargs["instance"])
     if to_create:
-        updated.create = (updated.create or []) + to_create
+        if updated.create is None:
+            updated.create = []
+        updated.create.extend(to_create)
 
 
 def _delete_handler(updated, **kwargs):
+    if updated.delete_ids is None:
+        updated.delete_ids = set()
     if "objects" in kwargs:
-        if updated.delete_qs is None:
-            updated.delete_qs = kwargs["objects"]
-        else:
-            updated.delete_qs = (
-                updated.delete_qs
-                | kwargs["objects"])
+        pks = list(kwargs["objects"].values_list("pk", flat=True))
+        updated.delete_received += len(pks)
+        updated.delete_ids.update(pks)
     if "instance" in kwargs:
-        if updated.delete_ids is None:
-            updated.delete_ids = set()
+        updated.delete_received += 1
         updated.delete_ids.add(kwargs["instance"].pk)
 
 
@@ -115,43 +138,53 @@ def _update_handler(updated, **kwargs):
         updated.update_fields = (
             updated.update_fields
             | set(kwargs["update_fields"]))
-    if "updates" in kwargs:
+    if kwargs.get("updates"):
         # dict of pk: dict(up=date)
-        updated.updates = (
-            kwargs["updates"]
-            if updated.updates is None
-            else (updated.updates.update(kwargs["updates"])
-                  or updated.updates))
-    if "objects" in kwargs:
-        updated.update_objects = (
-            kwargs["objects"]
-            if updated.update_objects is None
-            else (updated.update_objects
-                  + kwargs["objects"]))
-    if "instance" in kwargs:
-        updated.update_objects = (
-            [kwargs["instance"]]
-            if updated.update_objects is None
-            else (updated.update_objects
-                  + [kwargs["instance"]]))
+        if updated.updates is None:
+            updated.updates = {}
+        updated.update_received += len(kwargs["updates"])
+        updated.updates.update(kwargs["updates"])
+    to_update = list(kwargs.get("objects") or [])
+    if kwargs.get("instance") is not None:
+        to_update.append(kwargs["instance"])
+    if to_update:
+        if updated.update_objects is None:
+            updated.update_objects = OrderedDict()
+        updated.update_received += len(to_update)
+        for obj in to_update:
+            # later instances of an object replace earlier ones
+            updated.update_objects[obj.pk] = obj
+
+
+def _chunked(ids, chunk_size):
+    ids = sorted(ids)
+    for i in range(0, len(ids), chunk_size):
+        yield ids[i:i + chunk_size]
+
+
+def _log_collapsed(model, updated):
+    collapsed = updated.collapsed
+    if updated.delete_received or updated.update_received:
+        logger.debug(
+            "[bulk] %s: deleted %s/%s, updated %s/%s "
+            "(collapsed: %s deletes, %s updates)",
+            model.__name__,
+            len(updated.delete_ids or ()),
+            updated.delete_received,
+            len(updated.update_ids),
+            updated.update_received,
+            collapsed["delete"],
+            collapsed["update"])
 
 
 def _callback_handler(model, updated):
 
     # delete
-    to_delete = None
-    if updated.delete_ids is not None:
-        to_delete = model.objects.filter(
-            pk__in=updated.delete_ids)
-    if updated.delete_qs is not None:
-        to_delete = (
-            updated.delete_qs
-            if to_delete is None
-            else to_delete | updated.delete_qs)
-    if to_delete is not None:
-        delete.send(
-            model,
-            objects=to_delete)
+    if updated.delete_ids:
+        for ids in _chunked(updated.delete_ids, updated.chunk_size):
+            delete.send(
+                model,
+                objects=model.objects.filter(pk__in=ids))
 
     # create
     if updated.create is not None:
@@ -160,20 +193,32 @@ def _callback_handler(model, updated):
             objects=updated.create)
 
     # update
-    should_update = (
-        updated.update_objects is not None
-        or updated.updates is not None)
-    if should_update:
+    update_objects = updated.update_objects or {}
+    updates = updated.updates or {}
+    for ids in _chunked(updated.update_ids, updated.chunk_size):
+        objects = [
+            update_objects[pk]
+            for pk
+            in ids
+            if pk in update_objects]
+        chunk_updates = {
+            pk: updates[pk]
+            for pk
+            in ids
+            if pk in updates}
         update.send(
             model,
-            objects=updated.update_objects,
-            updates=updated.updates,
+            objects=objects or None,
+            updates=chunk_updates or None,
             update_fields=updated.update_fields)
+    _log_collapsed(model, updated)
 
 
 @contextmanager
 def bulk_context(model=None, **kwargs):
     updated = BulkUpdated()
+    if kwargs.get("chunk_size"):
+        updated.chunk_size = kwargs.pop("chunk_size")
     signals = [create, delete, update]
     create_handler = kwargs.pop("create", _create_handler)
     delete_handler = kwargs.pop("delete", _delete_handler)
@@ -193,7 +238,7 @@ def bulk_context(model=None, **kwargs):
         @receiver(update, sender=model)
         def handle_update(**kwargs):
             update_handler(updated, **kwargs)
-        yield
+        yield updated
     callback_handler(model, updated)
 
 
@@ -201,5 +246,5 @@ def bulk_context(model=None, **kwargs):
 def bulk_operations(model=None, models=None, **kwargs):
     if models is None and model is not None:
         models = [model]
-    with nested(*(bulk_context(m, **kwargs) for m in models)):
-        yield
+    with nested(*(bulk_context(m, **kwargs) for m in models)) as updated:
+        yield dict(zip(models, updated))
@@ -7,9 +7,11 @@
 # AUTHORS file for copyright and authorship information.
 
 import logging
+import threading
 import time
 from functools import wraps
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
@@ -20,13 +22,24 @@ from pootle_app.models.permissions import (check_permission,
                                            get_matching_permissions)
 from pootle_project.models import Project, ProjectSet
 
-from .cache import get_cache
+from .cache import CacheCodec, LocalCache, get_cache
 from .exceptions import Http400
 from .url_helpers import split_pootle_path
 
 
 logger = logging.getLogger(__name__)
 
+PERSISTENT_CACHE_DEFAULTS = dict(
+    LOCAL_TIMEOUT=0,
+    LOCAL_SIZE=500,
+    LOCK_TIMEOUT=30,
+    COMPRESS_THRESHOLD=16384,
+    COMPRESSOR="zlib")
+# seconds between checks for a value being computed by another process
+PERSISTENT_CACHE_POLL_INTERVAL = .05
+
+_local_cache = None
+_codec = None
 
 CLS2ATTR = {
     'TranslationProject': 'translation_project',
@@ -163,6 +176,74 @@ def admin_required(func):
     return wrapped
 
 
+class PersistentStats(object):
+    """Counts cache hits, misses, compute time and the size of cached values
+    for persistent properties, by property name.
+
+    ``raw_bytes`` and ``stored_bytes`` are the total sizes of the computed
+    values before and after compression.
+    """
+
+    fields = (
+        "local_hits", "hits", "misses", "waits", "computed", "compute_time",
+        "raw_bytes", "stored_bytes")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def clear(self):
+        with self.lock:
+            self.stats = {}
+
+    def get(self, name):
+        with self.lock:
+            return dict(
+                self.stats.get(
+                    name,
+                    dict.fromkeys(self.fields, 0)))
+
+    def incr(self, name, field, value=1):
+        with self.lock:
+            if name not in self.stats:
+                self.stats[name] = dict.fromkeys(self.fields, 0)
+            self.stats[name][field] += value
+
+    def summary(self):
+        with self.lock:
+            return {
+                name: dict(stats)
+                for name, stats
+                in self.stats.items()}
+
+
+persistent_stats = PersistentStats()
+
+
+def get_persistent_cache_setting(k):
+    return getattr(
+        settings,
+        "POOTLE_PERSISTENT_CACHE",
+        {}).get(k, PERSISTENT_CACHE_DEFAULTS[k])
+
+
+def get_local_cache():
+    global _local_cache
+    if _local_cache is None:
+        _local_cache = LocalCache(
+            size=get_persistent_cache_setting("LOCAL_SIZE"))
+    return _local_cache
+
+
+def get_cache_codec():
+    global _codec
+    if _codec is None:
+        _codec = CacheCodec(
+            threshold=get_persistent_cache_setting("COMPRESS_THRESHOLD"),
+            compressor=get_persistent_cache_setting("COMPRESSOR"))
+    return _codec
+
+
 class persistent_property(object):
     """
     Similar to cached_property, except it caches in the memory cache rather
@@ -178,10 +259,18 @@ class persistent_property(object):
     If no cache_key attribute is present or returns None, it will use instance
     caching by default. This behaviour can be switched off by setting
     `always_cache` to False in the decorator.
+
+    Values can also be kept in a per-process cache for `local_timeout`
+    seconds. On a cache miss only one process computes the value, while others
+    wait up to `lock_timeout` seconds for it. Both default to the values in
+    the `POOTLE_PERSISTENT_CACHE` setting.
+
+    Values are stored compactly, and compressed if they are large.
     """
 
     def __init__(self, func, name=None, key_attr=None, always_cache=True,
-                 ns_attr=None, version_attr=None):
+                 ns_attr=None, version_attr=None, local_timeout=None,
+                 lock_timeout=None):
         self.func = func
         self.__doc__ = getattr(func, '__doc__')
         self.name = name or func.__name__
@@ -189,6 +278,20 @@ class persistent_property(object):
         self.key_attr = key_attr or "cache_key"
         self.version_attr = version_attr or "sw_version"
         self.always_cache = always_cache
+        self._local_timeout = local_timeout
+        self._lock_timeout = lock_timeout
+
+    @property
+    def local_timeout(self):
+        if self._local_timeout is not None:
+            return self._local_timeout
+        return get_persistent_cache_setting("LOCAL_TIMEOUT")
+
+    @property
+    def lock_timeout(self):
+        if self._lock_timeout is not None:
+            return self._lock_timeout
+        return get_persistent_cache_setting("LOCK_TIMEOUT")
 
     def _get_cache_key(self, instance):
         ns = getattr(instance, self.ns_attr, "pootle.core")
@@ -199,25 +302,75 @@ class persistent_property(object):
                 "%s.%s.%s.%s"
                 % (ns, sw_version, cache_key, self.name))
 
-    def __get__(self, instance, cls=None):
-        if instance is None:
-            return self
-        cache_key = self._get_cache_key(instance)
-        if cache_key:
-            cache = get_cache('lru')
+    def _get_stats_name(self, instance):
+        return "%s.%s" % (instance.__class__.__name__, self.name)
+
+    def _wait_for(self, cache, cache_key, lock_key):
+        timeout = time.time() + self.lock_timeout
+        while time.time() < timeout:
+            time.sleep(PERSISTENT_CACHE_POLL_INTERVAL)
             cached = cache.get(cache_key)
-            if cached is not None:
-                # cache hit
+            if cached is not None or cache.get(lock_key) is None:
                 return cached
-            # cache miss
+
+    def _compute(self, instance, cache, cache_key):
+        stats_name = self._get_stats_name(instance)
+        persistent_stats.incr(stats_name, "misses")
+        lock_key = "%s.lock" % cache_key
+        locked = False
+        if self.lock_timeout:
+            locked = cache.add(lock_key, 1, self.lock_timeout)
+            if not locked:
+                # another process is computing the value
+                cached = self._wait_for(cache, cache_key, lock_key)
+                if cached is not None:
+                    persistent_stats.incr(stats_name, "waits")
+                    return get_cache_codec().decode(cached)
+        try:
             start = time.time()
             res = self.func(instance)
             timetaken = time.time() - start
-            cache.set(cache_key, res)
-            logger.debug(
-                "[cache] generated %s in %s seconds",
-                cache_key, timetaken)
-            return res
+            encoded, raw_size, size = get_cache_codec().encode(res)
+            cache.set(cache_key, encoded)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        persistent_stats.incr(stats_name, "computed")
+        persistent_stats.incr(stats_name, "compute_time", timetaken)
+        persistent_stats.incr(stats_name, "raw_bytes", raw_size)
+        persistent_stats.incr(stats_name, "stored_bytes", size)
+        logger.debug(
+            "[cache] generated %s in %s seconds, %s bytes (%s stored)",
+            cache_key, timetaken, raw_size, size)
+        return res
+
+    def _get_cached(self, instance, cache_key):
+        local_timeout = self.local_timeout
+        if local_timeout:
+            cached = get_local_cache().get(cache_key)
+            if cached is not None:
+                persistent_stats.incr(
+                    self._get_stats_name(instance), "local_hits")
+                return cached
+        cache = get_cache('lru')
+        cached = cache.get(cache_key)
+        if cached is not None:
+            # cache hit
+            persistent_stats.incr(self._get_stats_name(instance), "hits")
+            cached = get_cache_codec().decode(cached)
+        else:
+            # cache miss
+            cached = self._compute(instance, cache, cache_key)
+        if local_timeout:
+            get_local_cache().set(cache_key, cached, local_timeout)
+        return cached
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        cache_key = self._get_cache_key(instance)
+        if cache_key:
+            return self._get_cached(instance, cache_key)
         elif self.always_cache:
             res = instance.__dict__[self.name] = self.func(instance)
             return res
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from django.dispatch import Signal
+
+
+def get_signal_names():
+    """Maps the ids of signals, providers and getters defined in ``pootle``
+    modules to their dotted names.
+    """
+    names = {}
+    for module_name, module in sys.modules.items():
+        if module is None or not module_name.startswith("pootle"):
+            continue
+        for k, v in vars(module).items():
+            if isinstance(v, Signal):
+                names.setdefault(id(v), "%s.%s" % (module_name, k))
+    return names
+
+
+def get_sender_name(sender):
+    if sender is None:
+        return "None"
+    if isinstance(sender, type):
+        return sender.__name__
+    return sender.__class__.__name__
+
+
+def get_receiver_name(receiver):
+    name = getattr(
+        receiver,
+        "__name__",
+        receiver.__class__.__name__)
+    return "%s.%s" % (getattr(receiver, "__module__", "?"), name)
+
+
+class SignalStats(object):
+    """Call count, cumulative and max time for each signal, sender and
+    receiver.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def __len__(self):
+        return len(self.stats)
+
+    @property
+    def calls(self):
+        return sum(item[0] for item in self.stats.values())
+
+    @property
+    def total(self):
+        return sum(item[1] for item in self.stats.values())
+
+    def clear(self):
+        with self.lock:
+            self.stats = {}
+
+    def record(self, signal, sender, receiver, elapsed):
+        key = (
+            signal,
+            get_sender_name(sender),
+            get_receiver_name(receiver))
+        with self.lock:
+            item = self.stats.get(key)
+            if item is None:
+                item = self.stats[key] = [0, 0, 0]
+            item[0] += 1
+            item[1] += elapsed
+            item[2] = max(item[2], elapsed)
+
+    def summary(self, sort="total", limit=None):
+        names = get_signal_names()
+        rows = [
+            dict(signal=names.get(id(signal), repr(signal)),
+                 sender=sender,
+                 receiver=receiver,
+                 calls=item[0],
+                 total=item[1],
+                 max=item[2])
+            for (signal, sender, receiver), item
+            in self.stats.items()]
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def format_summary(self, sort="total", limit=None):
+        return [
+            ("%(calls)8d %(total)10.4fs %(max)10.4fs  "
+             "%(signal)s [%(sender)s] -> %(receiver)s"
+             % row)
+            for row
+            in self.summary(sort=sort, limit=limit)]
+
+
+class Instrumentation(object):
+    """Records receiver timings for the ``SignalStats`` collecting in the
+    current thread.
+
+    Nothing is recorded unless a collector is active, so the cost when
+    disabled is a thread-local lookup per receiver call.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    @property
+    def collectors(self):
+        return getattr(self.local, "collectors", ())
+
+    @property
+    def active(self):
+        return bool(self.collectors)
+
+    def start(self):
+        stats = SignalStats()
+        self.local.collectors = self.collectors + (stats, )
+        return stats
+
+    def stop(self, stats):
+        self.local.collectors = tuple(
+            collector
+            for collector
+            in self.collectors
+            if collector is not stats)
+
+    @contextmanager
+    def collect(self):
+        stats = self.start()
+        try:
+            yield stats
+        finally:
+            self.stop(stats)
+
+    def call_receiver(self, signal, receiver, sender, **named):
+        collectors = self.collectors
+        if not collectors:
+            return receiver(signal=signal, sender=sender, **named)
+        start = time.time()
+        try:
+            return receiver(signal=signal, sender=sender, **named)
+        finally:
+            elapsed = time.time() - start
+            for stats in collectors:
+                stats.record(signal, sender, receiver, elapsed)
+
+
+instrumentation = Instrumentation()
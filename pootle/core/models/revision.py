@@ -6,11 +6,17 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import threading
+from contextlib import contextmanager
+
 from ..cache import get_cache
 
 
 cache = get_cache('redis')
 
+# revisions reserved for the current thread by ``Revision.reserved``
+_reserved = threading.local()
+
 
 class NoRevision(Exception):
     pass
@@ -66,10 +72,55 @@ class Revision(object):
     def incr(cls):
         """Increments the revision number.
 
+        If revisions have been reserved for the current thread with
+        `reserved` the next one is used instead.
+
         :return: the new revision number after incrementing it, or the
             initial number if there's no revision stored yet.
         """
+        revisions = getattr(_reserved, "revisions", None)
+        if revisions is not None:
+            revision = next(revisions, None)
+            if revision is not None:
+                return revision
         try:
             return cache.incr(cls.CACHE_KEY)
         except ValueError:
             raise NoRevision()
+
+    @classmethod
+    def reserve(cls, count):
+        """Atomically reserves a contiguous block of `count` revision numbers.
+
+        :return: an `xrange` of the reserved revision numbers.
+        """
+        if count < 1:
+            return xrange(0)
+        try:
+            last = cache.incr(cls.CACHE_KEY, count)
+        except ValueError:
+            raise NoRevision()
+        return xrange(last - count + 1, last + 1)
+
+    @classmethod
+    @contextmanager
+    def reserved(cls, count):
+        """Reserves `count` revision numbers, which are then returned in
+        order by calls to `incr` in the current thread, until they are used
+        up.
+
+        The revisions are reserved up front, so while they are being used
+        other threads and processes can commit changes with higher
+        revisions. A change saved later with a reserved revision can then be
+        older than changes that are already committed, and anything that has
+        synced up to a stored revision in the meantime (eg a store's
+        ``last_sync_revision``) will skip it. Store updates already share
+        this with their ``update_revision``, which is taken before the units
+        are saved. Keep reserved blocks short-lived.
+        """
+        previous = getattr(_reserved, "revisions", None)
+        _reserved.revisions = iter(cls.reserve(count))
+        try:
+            yield
+        finally:
+            _reserved.revisions = previous
@@ -9,34 +9,82 @@
 from django.dispatch import Signal
 from django.dispatch.dispatcher import NO_RECEIVERS, NONE_ID, _make_id, weakref
 
+from pootle.core.instrumentation import instrumentation
+
 from .exceptions import StopProviding
 from .results import GatheredDict
 
 
-class Provider(Signal):
+class DispatchCacheMixin(object):
+    """Caches the receivers resolved for ``None`` and class senders in
+    ``sender_receivers_cache``.
+
+    The cache is cleared by ``Signal`` when receivers are connected or
+    disconnected, and is bypassed while there are dead receivers to clear.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._sender_map = {}
+        super(DispatchCacheMixin, self).__init__(*args, **kwargs)
+
+    def connect(self, receiver, sender=None, weak=True, dispatch_uid=None):
+        super(DispatchCacheMixin, self).connect(
+            receiver, sender, weak, dispatch_uid)
+        self._sender_map[_make_id(sender)] = sender
+
+    def _resolve_receivers(self, sender):
+        raise NotImplementedError
+
+    def _cacheable(self, sender):
+        if sender is None:
+            # cant weakref ``None`` if ``use_caching`` was set on init
+            return isinstance(self.sender_receivers_cache, dict)
+        return isinstance(sender, type)
+
+    def _live_receivers(self, sender):
+        cacheable = self._cacheable(sender)
+        receivers = None
+        if cacheable and not self._dead_receivers:
+            receivers = self.sender_receivers_cache.get(sender)
+        if receivers is None:
+            receivers = self._resolve_receivers(sender)
+            if cacheable:
+                # Note, we must cache the weakref versions.
+                self.sender_receivers_cache[sender] = (
+                    receivers or NO_RECEIVERS)
+        if receivers is NO_RECEIVERS:
+            return []
+        non_weak_receivers = []
+        for receiver in receivers:
+            if isinstance(receiver, weakref.ReferenceType):
+                # Dereference the weak reference.
+                receiver = receiver()
+                if receiver is not None:
+                    non_weak_receivers.append(receiver)
+            else:
+                non_weak_receivers.append(receiver)
+        return non_weak_receivers
+
+
+class Provider(DispatchCacheMixin, Signal):
 
     result_class = GatheredDict
 
     def __init__(self, *args, **kwargs):
         self.result_class = kwargs.pop("result_class", self.result_class)
-        self._sender_map = {}
         super(Provider, self).__init__(*args, **kwargs)
 
     def gather(self, sender=None, **named):
         gathered = self.result_class(self)
-        named["gathered"] = gathered
-        no_receivers = (
-            not self.receivers
-            or (sender and self.use_caching
-                and not self._dead_receivers
-                and self.sender_receivers_cache.get(sender) is NO_RECEIVERS))
-        if no_receivers:
+        if not self.receivers:
             return gathered
+        named["gathered"] = gathered
         for provider in self._live_receivers(sender):
             try:
                 gathered.add_result(
                     provider,
-                    provider(signal=self, sender=sender, **named))
+                    instrumentation.call_receiver(
+                        self, provider, sender, **named))
             except StopProviding as e:
                 # allow a provider to prevent further gathering
                 gathered.add_result(
@@ -45,15 +93,9 @@ class Provider(Signal):
                 break
         return gathered
 
-    def connect(self, receiver, sender=None, weak=True, dispatch_uid=None):
-        super(Provider, self).connect(receiver, sender, weak, dispatch_uid)
-        self._sender_map[_make_id(sender)] = sender
-
-    def _live_receivers(self, sender):
-        """
-        Filter sequence of receivers to get resolved, live receivers.
-        This checks for weak references and resolves them, then returning only
-        live receivers.
+    def _resolve_receivers(self, sender):
+        """Receivers connected for ``sender``, any of its base classes, or
+        for any sender.
         """
         with self.lock:
             self._clear_dead_receivers()
@@ -65,22 +107,7 @@ class Provider(Signal):
                     receivers.append(receiver)
                 elif sender and issubclass(sender, r_sender):
                     receivers.append(receiver)
-            if self.use_caching and sender:
-                if not receivers:
-                    self.sender_receivers_cache[sender] = NO_RECEIVERS
-                else:
-                    # Note, we must cache the weakref versions.
-                    self.sender_receivers_cache[sender] = receivers
-        non_weak_receivers = []
-        for receiver in receivers:
-            if isinstance(receiver, weakref.ReferenceType):
-                # Dereference the weak reference.
-                receiver = receiver()
-                if receiver is not None:
-                    non_weak_receivers.append(receiver)
-            else:
-                non_weak_receivers.append(receiver)
-        return non_weak_receivers
+        return receivers
 
 
 def provider(signal, **kwargs):
@@ -94,33 +121,32 @@ def provider(signal, **kwargs):
     return _decorator
 
 
-class Getter(Signal):
+class Getter(DispatchCacheMixin, Signal):
 
     def __init__(self, *args, **kwargs):
         super(Getter, self).__init__(*args, **kwargs)
         self.use_caching = True
 
     def get(self, sender=None, **named):
-        receivers_cache = self.sender_receivers_cache.get(sender)
-        no_receivers = (
-            not self.receivers
-            or receivers_cache is NO_RECEIVERS)
-        if no_receivers:
+        if not self.receivers:
             return None
-        elif receivers_cache:
-            for receiver in receivers_cache:
-                if isinstance(receiver, weakref.ReferenceType):
-                    # Dereference the weak reference.
-                    receiver = receiver()
-                if receiver is not None:
-                    response = receiver(signal=self, sender=sender, **named)
-                    if response is not None:
-                        return response
         for receiver in self._live_receivers(sender):
-            response = receiver(signal=self, sender=sender, **named)
+            response = instrumentation.call_receiver(
+                self, receiver, sender, **named)
             if response is not None:
                 return response
 
+    def _resolve_receivers(self, sender):
+        """Receivers connected for ``sender`` or for any sender."""
+        with self.lock:
+            self._clear_dead_receivers()
+            senderkey = _make_id(sender)
+            return [
+                receiver
+                for (receiverkey, r_senderkey), receiver
+                in self.receivers
+                if r_senderkey == NONE_ID or r_senderkey == senderkey]
+
 
 def getter(signal, **kwargs):
     def _connect(s, func, **kwargs):
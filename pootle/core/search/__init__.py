@@ -6,9 +6,12 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+from .backends import (ElasticSearchBackend, NgramSearchBackend,
+                       StubSearchBackend)
 from .base import SearchBackend
 from .broker import SearchBroker
-from .backends import ElasticSearchBackend
 
 
-__all__ = ('SearchBackend', 'SearchBroker', 'ElasticSearchBackend')
+__all__ = (
+    'SearchBackend', 'SearchBroker', 'ElasticSearchBackend',
+    'NgramSearchBackend', 'StubSearchBackend')
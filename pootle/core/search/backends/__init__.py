@@ -7,6 +7,8 @@
 # AUTHORS file for copyright and authorship information.
 
 from .elasticsearch import ElasticSearchBackend
+from .ngram import NgramSearchBackend
+from .stub import StubSearchBackend
 
 
-__all__ = ('ElasticSearchBackend', )
+__all__ = ('ElasticSearchBackend', 'NgramSearchBackend', 'StubSearchBackend')
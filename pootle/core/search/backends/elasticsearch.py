@@ -30,6 +30,22 @@ logger = logging.getLogger(__name__)
 DEFAULT_MIN_SIMILARITY = 0.7
 
 
+def get_similarity(source_text, hit_source_text):
+    """Returns the similarity (0..1) of `hit_source_text` to `source_text`,
+    from their Levenshtein distance.
+    """
+    distance = Levenshtein.distance(source_text, hit_source_text)
+    similarity = (
+        1 - distance / float(max(len(source_text), len(hit_source_text), 1))
+    )
+
+    logger.debug(
+        'Similarity: %.2f (distance: %d)\nOriginal:\t%s\nComparing with:\t%s',
+        similarity, distance, source_text, hit_source_text
+    )
+    return similarity
+
+
 def filter_hits_by_distance(hits, source_text,
                             min_similarity=DEFAULT_MIN_SIMILARITY):
     """Returns ES `hits` filtered according to their Levenshtein distance
@@ -45,15 +61,7 @@ def filter_hits_by_distance(hits, source_text,
     filtered_hits = []
     for hit in hits:
         hit_source_text = hit['_source']['source']
-        distance = Levenshtein.distance(source_text, hit_source_text)
-        similarity = (
-            1 - distance / float(max(len(source_text), len(hit_source_text)))
-        )
-
-        logger.debug(
-            'Similarity: %.2f (distance: %d)\nOriginal:\t%s\nComparing with:\t%s',
-            similarity, distance, source_text, hit_source_text
-        )
+        similarity = get_similarity(source_text, hit_source_text)
 
         if similarity < min_similarity:
             break
@@ -68,8 +76,7 @@ class ElasticSearchBackend(SearchBackend):
         super(ElasticSearchBackend, self).__init__(config_name)
         self._es = self._get_es_server()
         self._create_index_if_missing()
-        self.weight = min(max(self._settings.get('WEIGHT', self.weight),
-                              0.0), 1.0)
+        self._setup_options()
 
     def _get_es_server(self):
         return Elasticsearch([
@@ -106,6 +113,7 @@ class ElasticSearchBackend(SearchBackend):
             "search",
             index=self._settings['INDEX_NAME'],
             doc_type=language,
+            request_timeout=self.timeout,
             body={
                 "query": {
                     "match": {
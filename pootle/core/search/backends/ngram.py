@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import fcntl
+import heapq
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ..base import SearchBackend
+from .elasticsearch import (DEFAULT_MIN_SIMILARITY, filter_hits_by_distance,
+                            get_similarity)
+
+
+__all__ = ('NgramSearchBackend',)
+
+
+class NgramIndex(object):
+    """Character trigram index of the sources of the TM entries for a
+    language.
+
+    Entries are appended to a file as json lines, so a later line for an
+    entry replaces the earlier ones. The file is read into memory when the
+    index is searched, and is compacted once it has more than
+    ``max_stale_lines`` replaced lines.
+    """
+
+    max_stale_lines = 10000
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.clear_entries()
+
+    def clear_entries(self):
+        self.entries = {}
+        self.postings = {}
+        # number of trigrams of each entry
+        self.sizes = {}
+        self.lines = 0
+        self.offset = 0
+        self.file_key = None
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def open_locked(self, shared=False):
+        """Opens and locks the file, retrying if it has been replaced by
+        another process while waiting for the lock.
+        """
+        while True:
+            f = open(self.path, "a+b")
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            file_key = self.get_file_key()
+            if file_key and os.fstat(f.fileno()).st_ino == file_key[0]:
+                return f
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    @contextmanager
+    def locked_file(self, shared=False):
+        directory = os.path.dirname(self.path)
+        if not os.path.exists(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # created by another process
+                pass
+        f = self.open_locked(shared=shared)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    def get_file_key(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size
+
+    def get_trigrams(self, text):
+        text = u" %s " % text.lower()
+        return set(text[i:i + 3] for i in xrange(len(text) - 2))
+
+    def remove_entry(self, entry_id):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        del self.sizes[entry_id]
+        for trigram in self.get_trigrams(entry["source"]):
+            ids = self.postings.get(trigram)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self.postings[trigram]
+
+    def add_entry(self, entry):
+        entry_id = entry["id"]
+        self.remove_entry(entry_id)
+        self.entries[entry_id] = entry
+        trigrams = self.get_trigrams(entry["source"])
+        self.sizes[entry_id] = len(trigrams)
+        for trigram in trigrams:
+            self.postings.setdefault(trigram, set()).add(entry_id)
+
+    def read(self, f):
+        """Reads the lines added to the file since it was last read."""
+        file_key = self.get_file_key()
+        if self.file_key is None or file_key[0] != self.file_key[0]:
+            # the file has been rewritten
+            self.clear_entries()
+        f.seek(self.offset)
+        data = f.read()
+        # ignore any partly written line
+        data = data[:data.rfind(b"\n") + 1]
+        for line in data.splitlines():
+            self.add_entry(json.loads(line))
+            self.lines += 1
+        self.offset += len(data)
+        self.file_key = file_key
+
+    def refresh(self):
+        if self.get_file_key() == self.file_key:
+            return
+        if not self.exists:
+            self.clear_entries()
+            return
+        with self.locked_file(shared=True) as f:
+            self.read(f)
+
+    def get_entry_line(self, entry):
+        return (
+            json.dumps(entry, cls=DjangoJSONEncoder).encode("utf-8")
+            + b"\n")
+
+    def update(self, entries):
+        """Adds ``entries`` to the index, replacing any entries with the same
+        ids.
+        """
+        with self.lock:
+            with self.locked_file() as f:
+                self.read(f)
+                f.seek(0, os.SEEK_END)
+                f.write(b"".join(
+                    self.get_entry_line(entry)
+                    for entry
+                    in entries))
+                f.flush()
+                self.read(f)
+                if self.lines - len(self.entries) > self.max_stale_lines:
+                    self.compact()
+
+    def compact(self):
+        """Rewrites the file with the current entries, while it is locked."""
+        tmp_path = "%s.%s.tmp" % (self.path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            for entry in self.entries.values():
+                f.write(self.get_entry_line(entry))
+        os.rename(tmp_path, self.path)
+        self.lines = len(self.entries)
+        self.file_key = self.get_file_key()
+        self.offset = self.file_key[1]
+
+    def delete(self):
+        with self.lock:
+            if self.exists:
+                os.remove(self.path)
+            self.clear_entries()
+
+    def find(self, text, limit):
+        """Returns up to ``limit`` entries with the most similar trigrams to
+        ``text``.
+
+        The shared trigrams are normalized by the size of both texts (Dice
+        coefficient), so that longer entries containing ``text`` dont rank
+        above entries with the same source.
+        """
+        trigrams = self.get_trigrams(text)
+        with self.lock:
+            self.refresh()
+            overlap = {}
+            for trigram in trigrams:
+                for entry_id in self.postings.get(trigram, ()):
+                    overlap[entry_id] = overlap.get(entry_id, 0) + 1
+            candidates = heapq.nlargest(
+                limit,
+                overlap.items(),
+                key=lambda item: (
+                    2.0 * item[1] / (len(trigrams) + self.sizes[item[0]])))
+            return [
+                self.entries[entry_id]
+                for entry_id, count_
+                in candidates]
+
+
+class NgramSearchBackend(SearchBackend):
+    """TM server that keeps a character trigram index of the sources of its
+    translations for each language, in files in its ``DIRECTORY``.
+
+    Matches are scored by their similarity to the searched source.
+    """
+
+    # candidate entries checked for each search
+    max_candidates = 50
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, config_name):
+        super(NgramSearchBackend, self).__init__(config_name)
+        self._setup_options()
+
+    @property
+    def path(self):
+        return os.path.join(
+            self._settings['DIRECTORY'],
+            self._settings['INDEX_NAME'])
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def get_index(self, language):
+        path = os.path.join(self.path, "%s.jsonl" % language)
+        with self._indexes_lock:
+            if path not in self._indexes:
+                self._indexes[path] = NgramIndex(path)
+            return self._indexes[path]
+
+    def get_indexes(self):
+        if not self.exists:
+            return []
+        return [
+            self.get_index(filename[:-len(".jsonl")])
+            for filename
+            in os.listdir(self.path)
+            if filename.endswith(".jsonl")]
+
+    def get_hits(self, unit, language):
+        hits = [
+            {'_id': entry['id'],
+             '_source': entry,
+             '_score': get_similarity(unit.source, entry['source'])}
+            for entry
+            in self.get_index(language).find(
+                unit.source,
+                self.max_candidates)]
+        hits.sort(key=lambda hit: hit['_score'], reverse=True)
+        return filter_hits_by_distance(
+            hits,
+            unit.source,
+            min_similarity=self._settings.get('MIN_SIMILARITY',
+                                              DEFAULT_MIN_SIMILARITY))
+
+    def _is_valuable_hit(self, unit, hit):
+        return str(unit.id) != hit['_id']
+
+    def search(self, unit):
+        counter = {}
+        res = []
+        language = unit.store.translation_project.language.code
+        for hit in self.get_hits(unit, language):
+            if self._is_valuable_hit(unit, hit):
+                body = hit['_source']
+                translation_pair = body['source'] + body['target']
+                if translation_pair not in counter:
+                    counter[translation_pair] = 1
+                    res.append({
+                        'unit_id': hit['_id'],
+                        'source': body['source'],
+                        'target': body['target'],
+                        'project': body['project'],
+                        'path': body['path'],
+                        'username': body['username'],
+                        'fullname': body['fullname'],
+                        'email_md5': body['email_md5'],
+                        'iso_submitted_on': body.get('iso_submitted_on'),
+                        'display_submitted_on': body.get(
+                            'display_submitted_on'),
+                        'score': hit['_score'] * self.weight,
+                    })
+                else:
+                    counter[translation_pair] += 1
+
+        for item in res:
+            item['count'] = counter[item['source']+item['target']]
+
+        return res
+
+    def get_entry(self, obj):
+        entry = dict(obj)
+        # ids are strings, like those of Elasticsearch hits
+        entry['id'] = u"%s" % obj['id']
+        return entry
+
+    def update(self, language, obj):
+        self.get_index(language).update([self.get_entry(obj)])
+
+    def bulk_update(self, language, objs):
+        self.get_index(language).update(
+            [self.get_entry(obj) for obj in objs])
+
+    def get_max_revision(self):
+        """Returns the highest revision of the entries in the TM, or ``None``
+        if it is empty.
+        """
+        revisions = []
+        for index in self.get_indexes():
+            with index.lock:
+                index.refresh()
+                revisions.extend(
+                    entry.get('revision') or 0
+                    for entry
+                    in index.entries.values())
+        return max(revisions) if revisions else None
+
+    def delete(self):
+        for index in self.get_indexes():
+            index.delete()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import time
+
+from ..base import SearchBackend
+
+
+__all__ = ('StubSearchBackend',)
+
+
+class StubSearchBackend(SearchBackend):
+    """TM server returning the results given in its settings, for testing
+    and development without an Elasticsearch server.
+
+    ``RESULTS`` is a list of dicts with at least ``source``, ``target`` and
+    ``score`` keys, and ``DELAY`` is a number of seconds to wait before
+    returning them.
+    """
+
+    def __init__(self, config_name):
+        super(StubSearchBackend, self).__init__(config_name)
+        self._setup_options()
+        self.delay = self._settings.get('DELAY', 0)
+
+    def search(self, unit):
+        if self.delay:
+            time.sleep(self.delay)
+        res = []
+        counter = {}
+        for result in self._settings.get('RESULTS', []):
+            translation_pair = result['source'] + result['target']
+            if translation_pair not in counter:
+                counter[translation_pair] = 1
+                result = dict(result)
+                result['score'] = result['score'] * self.weight
+                res.append(result)
+            else:
+                counter[translation_pair] += 1
+
+        for item in res:
+            item['count'] = counter[item['source']+item['target']]
+
+        return res
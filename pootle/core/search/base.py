@@ -11,18 +11,27 @@ from django.conf import settings
 
 SERVER_SETTINGS_NAME = 'POOTLE_TM_SERVER'
 
+# seconds to wait for the results of a TM server
+DEFAULT_TIMEOUT = 5
+
 
 class SearchBackend(object):
 
     def __init__(self, config_name=None):
         self._setup_settings(config_name)
         self.weight = 1.0
+        self.timeout = DEFAULT_TIMEOUT
 
     def _setup_settings(self, config_name):
         self._settings = getattr(settings, SERVER_SETTINGS_NAME, None)
         if config_name is not None:
             self._settings = self._settings[config_name]
 
+    def _setup_options(self):
+        self.weight = min(max(self._settings.get('WEIGHT', self.weight),
+                              0.0), 1.0)
+        self.timeout = self._settings.get('TIMEOUT', self.timeout)
+
     @property
     def is_auto_updatable(self):
         """Tells if TM is automatically updated from DB translations.
@@ -30,7 +39,7 @@ class SearchBackend(object):
         Basically this tells if TM is the 'local' TM.
         """
         for key, value in getattr(settings, SERVER_SETTINGS_NAME, {}).items():
-            if (value['INDEX_NAME'] == self._settings['INDEX_NAME'] and
+            if (value.get('INDEX_NAME') == self._settings.get('INDEX_NAME') and
                 key == 'local'):
 
                 return True
@@ -8,10 +8,64 @@
 
 import importlib
 import logging
+import threading
+import time
+from Queue import Full, Queue
+
+from django.db import connections
+from django.db.models import prefetch_related_objects
 
 from . import SearchBackend
 
 
+class SearchWorkers(object):
+    """A fixed number of daemon threads that TM servers are searched in.
+
+    Searches that time out keep their worker busy until they end, so rather
+    than starting more threads, searches are refused while the queue of
+    pending searches is full.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.tasks = Queue(size)
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            while len(self.threads) < self.size:
+                thread = threading.Thread(target=self.work)
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+
+    def work(self):
+        while True:
+            func, args, done = self.tasks.get()
+            try:
+                func(*args)
+            finally:
+                # db connections are per thread
+                connections.close_all()
+                done.set()
+
+    def submit(self, func, *args):
+        """Queues a call of ``func`` with ``args``, returning an ``Event``
+        that is set once it has run, or ``None`` if the queue is full.
+        """
+        self.start()
+        done = threading.Event()
+        try:
+            self.tasks.put_nowait((func, args, done))
+        except Full:
+            return None
+        return done
+
+
+search_workers = SearchWorkers(8)
+
+
 class SearchBroker(SearchBackend):
     def __init__(self, config_name=None):
         super(SearchBroker, self).__init__(config_name)
@@ -43,14 +97,57 @@ class SearchBroker(SearchBackend):
                     logging.warning("Search backend '%s'. Cannot import '%s'",
                                     server, _module)
 
+    def search_server(self, server, unit, results):
+        try:
+            results[server] = self._servers[server].search(unit)
+        except Exception as e:
+            logging.error("Search backend '%s' failed: %s", server, e)
+
+    def search_servers(self, unit):
+        """Searches all the TM servers concurrently in ``search_workers``,
+        waiting up to the ``timeout`` of each server for its results.
+
+        A single server is searched in the current thread, without a
+        timeout other than its own.
+
+        Returns a list of the results of the servers that replied in time.
+        """
+        results = {}
+        if len(self._servers) == 1:
+            server = list(self._servers)[0]
+            self.search_server(server, unit, results)
+            return [results.get(server, [])]
+        # load the relations used by the servers, so the workers share them
+        # rather than each querying the db
+        prefetch_related_objects([unit], "store__translation_project__language")
+        searches = {}
+        start = time.time()
+        for server in self._servers:
+            searches[server] = search_workers.submit(
+                self.search_server, server, unit, results)
+        server_results = []
+        for server, done in searches.items():
+            if done is None:
+                logging.warning("Search backend '%s' not searched, too many "
+                                "pending searches", server)
+                continue
+            timeout = self._servers[server].timeout
+            if timeout is not None:
+                timeout = max(timeout - (time.time() - start), 0)
+            if not done.wait(timeout):
+                logging.warning("Search backend '%s' timed out", server)
+                continue
+            server_results.append(results.get(server, []))
+        return server_results
+
     def search(self, unit):
         if not self._servers:
             return []
 
         results = []
         counter = {}
-        for server in self._servers:
-            for result in self._servers[server].search(unit):
+        for server_results in self.search_servers(unit):
+            for result in server_results:
                 translation_pair = result['source'] + result['target']
                 if translation_pair not in counter:
                     counter[translation_pair] = result['count']
@@ -9,6 +9,11 @@
 
 class Serializer(object):
 
+    # Serializers that can process data in chunks set this, in which case
+    # ``original_data`` may be an iterator of chunks, and ``output`` should
+    # then also be an iterator of chunks
+    chunked = False
+
     def __init__(self, context, data):
         self.context = context
         self.original_data = data
@@ -7,7 +7,30 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from django.dispatch import Signal
+from django.dispatch import Signal as BaseSignal
+from django.dispatch.dispatcher import NO_RECEIVERS
+
+from pootle.core.instrumentation import instrumentation
+
+
+class Signal(BaseSignal):
+    """Signal that times its receivers when instrumentation is active."""
+
+    def send(self, sender, **named):
+        if not instrumentation.active:
+            return super(Signal, self).send(sender, **named)
+        no_receivers = (
+            not self.receivers
+            or (self.sender_receivers_cache.get(sender)
+                is NO_RECEIVERS))
+        if no_receivers:
+            return []
+        return [
+            (receiver,
+             instrumentation.call_receiver(
+                 self, receiver, sender, **named))
+            for receiver
+            in self._live_receivers(sender)]
 
 
 changed = Signal(
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+from pootle.core.instrumentation import instrumentation
+
+
+logger = logging.getLogger(__name__)
+
+# number of receivers to log for each request
+SUMMARY_LIMIT = 20
+
+
+class SignalStatsMiddleware(MiddlewareMixin):
+    """Logs a summary of signal, provider and getter receiver calls made
+    while handling each request.
+
+    Enabled with ``POOTLE_SIGNAL_STATS``.
+    """
+
+    def __init__(self, get_response=None):
+        if not getattr(settings, "POOTLE_SIGNAL_STATS", False):
+            raise MiddlewareNotUsed
+        super(SignalStatsMiddleware, self).__init__(get_response)
+
+    def process_request(self, request):
+        request.signal_stats = instrumentation.start()
+
+    def process_response(self, request, response):
+        stats = getattr(request, "signal_stats", None)
+        if stats is None:
+            return response
+        instrumentation.stop(stats)
+        if stats.calls:
+            logger.info(
+                "[signals] %s %s: %s receiver calls, %.4fs",
+                request.method,
+                request.path,
+                stats.calls,
+                stats.total)
+            for line in stats.format_summary(limit=SUMMARY_LIMIT):
+                logger.debug("[signals] %s", line)
+        return response
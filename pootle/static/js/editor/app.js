@@ -1477,9 +1477,12 @@ PTL.editor = {
     let offsetToFetch = -1;
     let uidToFetch = -1;
     let previousUids = [];
+    let cursor = null;
     if (initial) {
       this.initialOffset = -1;
       this.offset = 0;
+      this.nextCursor = null;
+      this.previousCursor = null;
       if (uId > 0) {
         uidToFetch = uId;
       }
@@ -1493,9 +1496,11 @@ PTL.editor = {
         // the last chunk of uids to allow server to adjust results
         previousUids = this.getPreviousUids();
         offsetToFetch = this.offset;
+        cursor = this.nextCursor;
       } else if (this.needsPreviousUnitBatch()) {
         // The unit is in the first 7, try and get the previous chunk
         offsetToFetch = Math.max(this.initialOffset - (2 * this.units.chunkSize), 0);
+        cursor = this.previousCursor;
       }
     }
     if (initial || uidToFetch > -1 ||
@@ -1516,6 +1521,10 @@ PTL.editor = {
       if (previousUids.length > 0) {
         reqData.previous_uids = previousUids;
       }
+      if (cursor) {
+        // the server falls back to the offset if the results have changed
+        reqData.cursor = cursor;
+      }
       return UnitAPI.fetchUnits(reqData)
         .then(
           (data) => this.storeUnitData(data, { isInitial: initial }),
@@ -1546,10 +1555,15 @@ PTL.editor = {
     if (this.initialOffset === -1) {
       this.initialOffset = start;
       this.units.frozenTotal = total;
+      this.previousCursor = data.previousCursor;
     } else if (start < this.initialOffset) {
       this.initialOffset = start;
       prependUnits = true;
       unitGroups = unitGroups.reverse();
+      this.previousCursor = data.previousCursor;
+    }
+    if (!prependUnits) {
+      this.nextCursor = data.nextCursor;
     }
     for (let i = 0; i < unitGroups.length; i++) {
       const unitGroup = unitGroups[i];
@@ -152,6 +152,12 @@ GET_UNITS_TESTS = OrderedDict(
      ("sort_user_suggestion_oldest",
       {"sort": "oldest",
        "filter": "user-suggestions"}),
+     ("sort_suggestion_newest",
+      {"sort": "newest",
+       "filter": "suggestions"}),
+     ("sort_suggestion_oldest",
+      {"sort": "oldest",
+       "filter": "suggestions"}),
      ("checks_foo",
       {"filter": "checks",
        "checks": "foo"}),
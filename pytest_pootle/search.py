@@ -90,8 +90,10 @@ def calculate_search_results(kwargs, user):
                 change__submitted_on__gte=month[0],
                 change__submitted_on__lte=month[1]).distinct()
         # sort results
-        if unit_filter in ["my-suggestions", "user-suggestions"]:
-            sort_on = "suggestions"
+        if unit_filter == "suggestions":
+            sort_on = "pending_suggestions"
+        elif unit_filter in ["my-suggestions", "user-suggestions"]:
+            sort_on = "user_suggestions"
         elif unit_filter in ["my-submissions", "user-submissions"]:
             sort_on = "submissions"
         else:
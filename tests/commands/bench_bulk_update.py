@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from pootle_store.models import Unit
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_bench_bulk_update(capfd):
+    revisions = dict(Unit.objects.values_list("id", "revision"))
+    call_command("bench_bulk_update", "--rows=5", "--rows=10")
+    out, err = capfd.readouterr()
+    assert "5 rows: helper" in out
+    assert "10 rows: helper" in out
+    # changes are rolled back
+    assert dict(Unit.objects.values_list("id", "revision")) == revisions
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_bench_bulk_update_bad_field():
+    with pytest.raises(CommandError):
+        call_command("bench_bulk_update", "--field=target_f")
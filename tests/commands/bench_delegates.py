@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.core.management import call_command
+
+
+@pytest.mark.cmd
+def test_bench_delegates(capfd):
+    call_command(
+        "bench_delegates",
+        "--iterations=10",
+        "--delegate=format_diffs",
+        "--delegate=search_backend")
+    out, err = capfd.readouterr()
+    assert "format_diffs [" in out
+    assert "search_backend [" in out
+    assert "/s uncached" in out
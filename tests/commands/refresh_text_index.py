@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from pootle_store.unit.textindex import get_text_index
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_refresh_text_index_disabled():
+    with pytest.raises(CommandError):
+        call_command("refresh_text_index")
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_refresh_text_index(capfd, tmpdir, settings, tp0):
+    settings.POOTLE_TEXT_INDEX_DIRECTORY = str(tmpdir)
+    call_command(
+        "refresh_text_index",
+        "--project", tp0.project.code,
+        "--language", tp0.language.code)
+    out, err = capfd.readouterr()
+    assert "Building text index for %s" % tp0 in out
+    assert get_text_index().get_segment(tp0.pk).exists
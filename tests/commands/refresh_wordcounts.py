@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.core.management import call_command
+
+from pootle_store.models import UnitSource
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_refresh_wordcounts(capfd, store0):
+    unit = store0.units.first()
+    unit_source = unit.unit_source
+    source_wordcount = unit_source.source_wordcount
+    assert source_wordcount
+    total_words = store0.data.total_words
+    same_source = UnitSource.objects.filter(
+        source_hash=unit_source.source_hash)
+    same_source.update(source_wordcount=0)
+    call_command("refresh_wordcounts")
+    out, err = capfd.readouterr()
+    assert "updated %s units" % same_source.count() in out
+    assert all(
+        wc == source_wordcount
+        for wc
+        in same_source.values_list("source_wordcount", flat=True))
+    store0.data.refresh_from_db()
+    assert store0.data.total_words == total_words
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_refresh_wordcounts_project(capfd, store0):
+    unit_source = store0.units.first().unit_source
+    other_projects = UnitSource.objects.filter(
+        source_hash=unit_source.source_hash).exclude(
+            unit__store__translation_project__project=store0.tp.project)
+    UnitSource.objects.filter(
+        source_hash=unit_source.source_hash).update(source_wordcount=0)
+    call_command(
+        "refresh_wordcounts",
+        "--project",
+        store0.tp.project.code)
+    unit_source.refresh_from_db()
+    assert unit_source.source_wordcount
+    assert not any(
+        other_projects.values_list("source_wordcount", flat=True))
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.core.management import call_command
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_signal_stats(capfd, store0):
+    call_command(
+        "signal_stats",
+        "update_data",
+        "--store=%s" % store0.pootle_path)
+    out, err = capfd.readouterr()
+    lines = out.strip().split("\n")
+    assert lines[0].split()[:3] == ["calls", "total", "max"]
+    assert "pootle.core.signals.update_data [Store]" in out
+    assert len(lines) > 1
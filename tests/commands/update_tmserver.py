@@ -118,3 +118,36 @@ msgstr "test"
                  '--target-language=af', os.path.join(p.dirname, p.basename))
     out, err = capfd.readouterr()
     assert "1 translations to index" in out
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_update_tmserver_ngram(capfd, settings, tmpdir, tp0):
+    """Load the local n-gram TM from the database"""
+    from pootle.core.search import NgramSearchBackend
+    from pootle_store.models import Unit
+
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': 'pootle.core.search.backends.NgramSearchBackend',
+            'DIRECTORY': str(tmpdir),
+            'INDEX_NAME': 'translations',
+        }
+    }
+    call_command('update_tmserver')
+    out, err = capfd.readouterr()
+    assert "Last indexed revision = -1" in out
+    units = (
+        Unit.objects.exclude(target_f__isnull=True)
+                    .exclude(target_f__exact='')
+                    .exclude(store__obsolete=True))
+    units = units.exclude(
+        store__translation_project__project__disabled=True)
+    assert (
+        NgramSearchBackend('local').get_max_revision()
+        == max(units.values_list("revision", flat=True)))
+
+    # only new translations are added
+    call_command('update_tmserver')
+    out, err = capfd.readouterr()
+    assert "No translations to index" in out
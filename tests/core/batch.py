@@ -148,3 +148,81 @@ def test_batch_lists(store0, member):
         reduces=False)
     for suggestion in Suggestion.objects.filter(pk__gt=last_sugg_pk):
         assert suggestion.target_f == "suggestion %s" % suggestion.id
+
+
+@pytest.mark.django_db
+def test_batch_create_cursor(store0, member):
+    batch = Batch(Suggestion.objects, batch_size=2)
+    last_sugg_pk = Suggestion.objects.order_by(
+        "-pk").values_list("pk", flat=True).first()
+
+    def _create_method(unit, source, mtime):
+        return dict(
+            unit_id=unit,
+            creation_time=mtime,
+            target_f=source,
+            user_id=member.id)
+    batches = batch.batched_create(
+        store0.units.values_list("id", "source_f", "mtime"),
+        _create_method,
+        cursor=True)
+    new_suggs = Suggestion.objects.filter(pk__gt=last_sugg_pk)
+    assert new_suggs.count() == 0
+    for batched in batches:
+        assert len(batched)
+        assert len(batched) <= 2
+        assert all(isinstance(b, Suggestion) for b in batched)
+        assert all(b.target_f == b.unit.source_f for b in batched)
+    assert new_suggs.count() == store0.units.count()
+    new_suggs.delete()
+    created = batch.create(
+        store0.units.values_list("id", "source_f", "mtime"),
+        _create_method,
+        cursor=True)
+    new_suggs = Suggestion.objects.filter(pk__gt=last_sugg_pk)
+    assert created == new_suggs.count() == store0.units.count()
+    assert (
+        sorted(new_suggs.values_list("unit", flat=True))
+        == sorted(store0.units.values_list("id", flat=True)))
+
+
+@pytest.mark.django_db
+def test_batch_update_cursor(store0, member):
+    batch = Batch(Unit, batch_size=2)
+    store0.units.exclude(
+        pk=store0.units.first().pk).update(target_f="FOO")
+    seen = []
+
+    def _update_method(unit):
+        seen.append(unit.pk)
+        unit.target_f = "BAR"
+        return unit
+    count = batch.update(
+        store0.units.filter(target_f="FOO"),
+        _update_method,
+        cursor=True)
+    assert count == store0.units.count() - 1
+    assert count == store0.units.filter(target_f="BAR").count()
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == count
+
+
+@pytest.mark.django_db
+def test_batch_create_cursor_list(store0, member):
+    batch = Batch(Suggestion.objects, batch_size=2)
+    last_sugg_pk = Suggestion.objects.order_by(
+        "-pk").values_list("pk", flat=True).first()
+
+    def _create_method(unit, source, mtime):
+        return dict(
+            unit_id=unit,
+            creation_time=mtime,
+            target_f=source,
+            user_id=member.id)
+    units = list(store0.units.values_list("id", "source_f", "mtime"))
+    created = batch.create(units, _create_method, cursor=True)
+    new_suggs = Suggestion.objects.filter(pk__gt=last_sugg_pk)
+    assert created == new_suggs.count() == len(units)
+    assert (
+        sorted(new_suggs.values_list("unit", flat=True))
+        == sorted(unit[0] for unit in units))
@@ -8,7 +8,11 @@
 
 import pytest
 
-from pootle.core.bulk import BulkCRUD
+from django.db import connection
+
+from pootle.core.bulk import (
+    BulkCRUD, CaseUpdateEngine, ValuesUpdateEngine, bulk_update,
+    get_update_engine, record_original_value)
 from pootle_data.models import StoreChecksData
 from pootle_store.models import Unit
 
@@ -270,3 +274,92 @@ def test_bulk_crud_update_common(store0):
         assert unit.target == "BAR TARGET"
         assert unit.context == "BAR CONTEXT"
     assert result == 3
+
+
+@pytest.mark.django_db
+def test_bulk_update_engine(store0):
+    engine = get_update_engine(Unit)
+    assert engine.model == Unit
+    assert isinstance(
+        engine,
+        (ValuesUpdateEngine
+         if connection.vendor == "postgresql"
+         else CaseUpdateEngine))
+    unit0, unit1, unit2 = store0.units[:3]
+    unit0.target_f = "FOO"
+    unit1.target_f = "BAR"
+    unit2.target_f = "BAZ"
+    unit0.context = unit1.context = unit2.context = "COMMON CONTEXT"
+    unit2.developer_comment = "NOT UPDATED"
+    assert engine.update(
+        [unit0, unit1, unit2],
+        fields=["target_f", "context"]) == 3
+    for unit, target in [(unit0, "FOO"), (unit1, "BAR"), (unit2, "BAZ")]:
+        unit.refresh_from_db()
+        assert unit.target == target
+        assert unit.context == "COMMON CONTEXT"
+    assert unit2.developer_comment != "NOT UPDATED"
+    assert engine.update([], fields=["target_f"]) == 0
+
+
+@pytest.mark.django_db
+def test_bulk_update_engine_chunks(store0):
+    units = list(store0.units)
+    for unit in units:
+        unit.target_f = "TARGET %s" % unit.id
+    engine = CaseUpdateEngine(Unit, batch_size=2)
+    assert (
+        [len(chunk) for chunk in engine.chunks(units, [])]
+        == [len(units[i:i + 2]) for i in range(0, len(units), 2)])
+    assert engine.update(units, fields=["target_f"]) == len(units)
+    for unit in store0.units:
+        assert unit.target == "TARGET %s" % unit.id
+    for unit in units:
+        unit.target_f = "UPDATED %s" % unit.id
+    assert bulk_update(units, update_fields=["target_f"]) == len(units)
+    for unit in store0.units:
+        assert unit.target == "UPDATED %s" % unit.id
+
+
+@pytest.mark.django_db
+def test_bulk_update_engine_unchanged(store0):
+    engine = CaseUpdateEngine(Unit)
+    unit0, unit1, unit2 = store0.units[:3]
+    # fields without a recorded value are written
+    unit0.target_f = "FOO"
+    assert engine.update([unit0], fields=["target_f"]) == 1
+    unit0.refresh_from_db()
+    assert unit0.target == "FOO"
+
+    # recorded fields are only written if they have changed
+    for unit in [unit0, unit1, unit2]:
+        record_original_value(unit, "target_f")
+        record_original_value(unit, "context")
+    unit0.target_f = "BAR"
+    unit1.context = "BAR"
+    # changed in the db, but not a field thats updated
+    Unit.objects.filter(pk=unit1.pk).update(target_f="UPDATED ELSEWHERE")
+    assert engine.update(
+        [unit0, unit1, unit2],
+        fields=["target_f", "context"]) == 2
+    unit1.refresh_from_db()
+    assert unit1.target == "UPDATED ELSEWHERE"
+    assert unit1.context == "BAR"
+
+    # values are written if they were changed back after saving the unit
+    loaded_target = unit2.target_f
+    unit2.target_f = "BAZ"
+    unit2.save()
+    unit2.target_f = loaded_target
+    assert engine.update([unit2], fields=["target_f"]) == 1
+    unit2.refresh_from_db()
+    assert unit2.target_f == loaded_target
+
+    # recorded values are cleared by each update, so the value unit0 had
+    # before the last update is not taken as its value in the db
+    unit0.target_f = "BAZ"
+    unit0.save()
+    unit0.target_f = "FOO"
+    assert engine.update([unit0], fields=["target_f"]) == 1
+    unit0.refresh_from_db()
+    assert unit0.target == "FOO"
@@ -298,3 +298,47 @@ def test_contextmanager_bulk_ops_update(tp0, store0):
             update.send(Unit, updates=d2)
         d1.update(d2)
         assert updated.unit_updates == d1
+
+
+@pytest.mark.django_db
+def test_contextmanager_bulk_ops_collapsed(tp0, store0):
+    units = list(store0.unit_set.order_by("id")[:4])
+    unit_ids = [unit.id for unit in units]
+
+    class Update(object):
+        deleted = None
+        delete_called = 0
+        updated = None
+        update_called = 0
+
+    with keep_data(signals=[delete, update]):
+        updated = Update()
+
+        @receiver(delete, sender=Unit)
+        def handle_unit_delete(**kwargs):
+            updated.deleted = (
+                (updated.deleted or [])
+                + list(kwargs["objects"].values_list("id", flat=True)))
+            updated.delete_called += 1
+
+        @receiver(update, sender=Unit)
+        def handle_unit_update(**kwargs):
+            updated.updated = (
+                (updated.updated or [])
+                + [unit.id for unit in kwargs["objects"]])
+            updated.update_called += 1
+
+        with bulk_operations(Unit, chunk_size=3) as bulk:
+            delete.send(Unit, instance=units[0])
+            delete.send(Unit, objects=Unit.objects.filter(id__in=unit_ids))
+            delete.send(
+                Unit,
+                objects=Unit.objects.filter(id__in=unit_ids[:2]))
+            update.send(Unit, instance=units[0])
+            update.send(Unit, objects=units)
+            update.send(Unit, objects=units[1:])
+        assert bulk[Unit].collapsed == dict(delete=3, update=4)
+        assert updated.delete_called == 2
+        assert sorted(updated.deleted) == unit_ids
+        assert updated.update_called == 2
+        assert sorted(updated.updated) == unit_ids
@@ -10,8 +10,11 @@ import pytest
 
 from django.http import Http404
 
-from pootle.core.cache import get_cache
-from pootle.core.decorators import get_path_obj, persistent_property
+from pootle.core.cache import (
+    CacheCodec, CompactMapping, CompactRows, LocalCache, PickledValue,
+    get_cache)
+from pootle.core.decorators import (
+    get_local_cache, get_path_obj, persistent_property, persistent_stats)
 from pootle_language.models import Language
 from pootle_project.models import Project
 from pootle_translationproject.models import TranslationProject
@@ -226,3 +229,139 @@ def test_deco_persistent_property():
     assert get_cache("lru").get('pootle.foo.0.2.3.foo-cache.bar') == "Baz"
     # cached version this time
     assert foo.bar == "Baz"
+
+
+def test_deco_persistent_property_local_cache():
+    get_local_cache().clear()
+    persistent_stats.clear()
+    computed = []
+
+    class Foo(object):
+        cache_key = "foo-local-cache"
+
+        def _bar(self):
+            computed.append(1)
+            return "Baz"
+        bar = persistent_property(_bar, name="bar", local_timeout=10)
+
+    foo = Foo()
+    assert foo.bar == "Baz"
+    assert persistent_stats.get("Foo.bar")["misses"] == 1
+    assert persistent_stats.get("Foo.bar")["computed"] == 1
+    assert get_local_cache().get('pootle.core..foo-local-cache.bar') == "Baz"
+    get_cache("lru").delete('pootle.core..foo-local-cache.bar')
+    # served from the local cache
+    assert foo.bar == "Baz"
+    assert computed == [1]
+    assert persistent_stats.get("Foo.bar")["local_hits"] == 1
+    get_local_cache().clear()
+    assert foo.bar == "Baz"
+    assert computed == [1, 1]
+    assert foo.bar == "Baz"
+    assert persistent_stats.get("Foo.bar")["local_hits"] == 2
+    get_local_cache().clear()
+    assert foo.bar == "Baz"
+    assert persistent_stats.get("Foo.bar")["hits"] == 1
+    assert computed == [1, 1]
+
+
+def test_deco_persistent_property_locked():
+    persistent_stats.clear()
+    cache = get_cache("lru")
+    cache_key = 'pootle.core..foo-locked-cache.bar'
+    cache.delete(cache_key)
+
+    class Foo(object):
+        cache_key = "foo-locked-cache"
+
+        def _bar(self):
+            return "Baz"
+        bar = persistent_property(_bar, name="bar", lock_timeout=1)
+
+    # another process is computing the value and never completes
+    cache.add("%s.lock" % cache_key, 1, 1)
+    assert Foo().bar == "Baz"
+    assert persistent_stats.get("Foo.bar")["computed"] == 1
+    assert persistent_stats.get("Foo.bar")["waits"] == 0
+    cache.delete("%s.lock" % cache_key)
+    cache.delete(cache_key)
+    assert Foo().bar == "Baz"
+    assert cache.get("%s.lock" % cache_key) is None
+    assert persistent_stats.summary()["Foo.bar"]["computed"] == 2
+
+
+def test_local_cache():
+    local_cache = LocalCache(size=2, timeout=10)
+    local_cache.set("foo", 1)
+    local_cache.set("bar", 2)
+    assert local_cache.get("foo") == 1
+    local_cache.set("baz", 3)
+    # bar was least recently used
+    assert local_cache.get("bar") is None
+    assert local_cache.get("foo") == 1
+    assert len(local_cache) == 2
+    local_cache.set("expired", 4, timeout=-1)
+    assert local_cache.get("expired", "default") == "default"
+    local_cache.delete("foo")
+    assert local_cache.get("foo") is None
+    local_cache.clear()
+    assert len(local_cache) == 0
+
+
+def test_cache_codec_compact():
+    codec = CacheCodec(threshold=0)
+    rows = [dict(id=i, name="row%s" % i) for i in range(3)]
+    assert isinstance(codec.compact(rows), CompactRows)
+    encoded, raw_size, size = codec.encode(rows)
+    assert isinstance(encoded, PickledValue)
+    assert encoded.compressor is None
+    assert raw_size == size == len(encoded.data)
+    assert codec.decode(encoded) == rows
+    mapping = {
+        "child%s" % i: dict(total=i, critical=0)
+        for i in range(3)}
+    assert isinstance(codec.compact(mapping), CompactMapping)
+    encoded = codec.encode(mapping)[0]
+    assert codec.decode(encoded) == mapping
+    # dicts with different keys are left as they are
+    mixed = [dict(id=1), dict(name="foo")]
+    assert codec.compact(mixed) == mixed
+    assert codec.decode(codec.encode(mixed)[0]) == mixed
+    assert codec.decode(codec.encode("foo")[0]) == "foo"
+    # values cached before they were pickled are decoded as they are
+    assert codec.decode(mixed) == mixed
+
+
+def test_cache_codec_compress():
+    codec = CacheCodec(threshold=100)
+    assert codec.encode("small")[0].compressor is None
+    value = [dict(id=i, name="row%s" % i) for i in range(1000)]
+    encoded, raw_size, size = codec.encode(value)
+    assert isinstance(encoded, PickledValue)
+    assert encoded.compressor == "zlib"
+    assert size < raw_size
+    assert codec.decode(encoded) == value
+    # unknown compressors fall back to zlib
+    assert CacheCodec(compressor="DOES_NOT_EXIST").compressor == "zlib"
+
+
+def test_deco_persistent_property_compressed():
+    persistent_stats.clear()
+    cache = get_cache("lru")
+    cache_key = 'pootle.core..foo-compressed-cache.bar'
+    cache.delete(cache_key)
+    value = [dict(id=i, name="row%s" % i) for i in range(5000)]
+
+    class Foo(object):
+        cache_key = "foo-compressed-cache"
+
+        def _bar(self):
+            return value
+        bar = persistent_property(_bar, name="bar")
+
+    assert Foo().bar == value
+    assert cache.get(cache_key).compressor == "zlib"
+    stats = persistent_stats.get("Foo.bar")
+    assert 0 < stats["stored_bytes"] < stats["raw_bytes"]
+    assert Foo().bar == value
+    assert persistent_stats.get("Foo.bar")["hits"] == 1
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from pootle.core.instrumentation import instrumentation
+from pootle.core.plugin import getter, provider
+from pootle.core.plugin.delegate import Getter, Provider
+from pootle.core.signals import Signal
+
+
+def test_instrumentation_signal():
+    signal_test = Signal()
+
+    def receiver_for_test(**kwargs):
+        return 23
+
+    signal_test.connect(receiver_for_test, sender=str)
+    assert not instrumentation.active
+    assert signal_test.send(str) == [(receiver_for_test, 23)]
+    with instrumentation.collect() as stats:
+        assert instrumentation.active
+        assert signal_test.send(str) == [(receiver_for_test, 23)]
+        assert signal_test.send(str) == [(receiver_for_test, 23)]
+        assert signal_test.send(int) == []
+    assert not instrumentation.active
+    signal_test.send(str)
+    assert len(stats) == 1
+    assert stats.calls == 2
+    summary = stats.summary()
+    assert summary[0]["sender"] == "str"
+    assert summary[0]["receiver"].endswith(".receiver_for_test")
+    assert summary[0]["calls"] == 2
+    assert summary[0]["max"] <= summary[0]["total"]
+
+
+def test_instrumentation_delegates():
+    provider_test = Provider()
+    getter_test = Getter()
+
+    @provider(provider_test)
+    def provider_for_test(**kwargs):
+        return dict(result=2)
+
+    @getter(getter_test)
+    def getter_for_test(**kwargs):
+        return 3
+
+    with instrumentation.collect() as stats:
+        with instrumentation.collect() as nested_stats:
+            assert provider_test.gather()["result"] == 2
+        assert getter_test.get() == 3
+        assert getter_test.get() == 3
+    assert stats.calls == 3
+    assert nested_stats.calls == 1
+    calls = {
+        row["receiver"].split(".")[-1]: row["calls"]
+        for row
+        in stats.summary()}
+    assert calls == dict(provider_for_test=1, getter_for_test=2)
+    assert len(stats.format_summary(limit=1)) == 1
+    stats.clear()
+    assert stats.calls == 0
@@ -146,3 +146,29 @@ def test_getter_handle_order_3():
         return 3
 
     assert get_test.get(str, foo="bar") == 2
+
+
+def test_getter_caching():
+
+    get_test = Getter(providing_args=["foo"])
+    called = []
+
+    @getter(get_test, sender=str)
+    def getter_for_get_test(sender, *args, **kwargs):
+        called.append(sender)
+
+    assert get_test.get(str) is None
+    # receivers are only called once
+    assert called == [str]
+    assert get_test.get(int) is None
+    assert called == [str]
+
+    @getter(get_test, sender=int)
+    def getter_for_get_test_2(sender, *args, **kwargs):
+        return 2
+
+    # cache is cleared on connect
+    assert get_test.get(int) == 2
+    assert get_test.get(str) is None
+    get_test.disconnect(getter_for_get_test_2, sender=int)
+    assert get_test.get(int) is None
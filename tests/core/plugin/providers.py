@@ -282,3 +282,34 @@ def test_provider_caching_no_receiver():
 
     assert provider_test.gather(NotSender).keys() == []
     assert provider_test.gather(NotSender).keys() == []
+
+
+def test_provider_caching_connect():
+
+    class Sender(object):
+        pass
+
+    class SubSender(Sender):
+        pass
+
+    provider_test = Provider()
+
+    @provider(provider_test, sender=Sender)
+    def provider_for_test(sender, *args, **kwargs):
+        return dict(foo="bar")
+
+    assert provider_test.gather(SubSender)["foo"] == "bar"
+    assert SubSender in provider_test.sender_receivers_cache
+    assert provider_test.gather(None).keys() == []
+
+    @provider(provider_test, sender=SubSender)
+    def provider_for_test_2(sender, *args, **kwargs):
+        return dict(foo="baz")
+
+    # cache is cleared on connect
+    assert SubSender not in provider_test.sender_receivers_cache
+    assert provider_test.gather(SubSender)["foo"] == "baz"
+    assert provider_test.gather(Sender)["foo"] == "bar"
+
+    provider_test.disconnect(provider_for_test_2, sender=SubSender)
+    assert provider_test.gather(SubSender)["foo"] == "bar"
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import threading
+import time
+
+import pytest
+
+from pootle.core.search import (NgramSearchBackend, SearchBroker,
+                                StubSearchBackend)
+from pootle.core.search.broker import search_workers
+
+
+STUB_ENGINE = 'pootle.core.search.backends.StubSearchBackend'
+
+
+def _result(source, target, score):
+    return dict(source=source, target=target, score=score)
+
+
+@pytest.mark.django_db
+def test_search_broker_stub(settings, store0):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': STUB_ENGINE,
+            'RESULTS': [
+                _result("Foo", "Bar", 2),
+                _result("Foo", "Bar", 2),
+                _result("Foo", "Baz", 1)]},
+        'external': {
+            'ENGINE': STUB_ENGINE,
+            'WEIGHT': 0.5,
+            'RESULTS': [
+                _result("Foo", "Bar", 2),
+                _result("Foo", "Qux", 8)]}}
+    broker = SearchBroker()
+    assert isinstance(broker._servers["local"], StubSearchBackend)
+    assert broker._servers["external"].weight == 0.5
+    results = broker.search(store0.units.first())
+    # results are deduped by source and target, and sorted by weighted score
+    assert (
+        [(result["target"], result["score"], result["count"])
+         for result
+         in results]
+        == [("Qux", 4, 1), ("Bar", 2, 3), ("Baz", 1, 1)])
+
+
+@pytest.mark.django_db
+def test_search_broker_timeout(settings, store0):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': STUB_ENGINE,
+            'RESULTS': [_result("Foo", "Bar", 1)]},
+        'slow': {
+            'ENGINE': STUB_ENGINE,
+            'DELAY': 2,
+            'TIMEOUT': 0.1,
+            'RESULTS': [_result("Foo", "Baz", 1)]},
+        'other_slow': {
+            'ENGINE': STUB_ENGINE,
+            'DELAY': 0.2,
+            'RESULTS': [_result("Foo", "Qux", 1)]}}
+    broker = SearchBroker()
+    start = time.time()
+    results = broker.search(store0.units.first())
+    # the servers are searched concurrently, and the results of the timed
+    # out server are left out
+    assert time.time() - start < 1
+    assert (
+        sorted(result["target"] for result in results)
+        == ["Bar", "Qux"])
+
+
+@pytest.mark.django_db
+def test_search_broker_workers(settings, store0):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': STUB_ENGINE,
+            'RESULTS': [_result("Foo", "Bar", 1)]},
+        'slow': {
+            'ENGINE': STUB_ENGINE,
+            'DELAY': 1,
+            'TIMEOUT': 0.1,
+            'RESULTS': [_result("Foo", "Baz", 1)]}}
+    broker = SearchBroker()
+    unit = store0.units.first()
+    for i in range(3):
+        results = broker.search(unit)
+        assert [result["target"] for result in results] == ["Bar"]
+    # timed out searches dont start more threads than the workers
+    assert len(search_workers.threads) == search_workers.size
+    assert all(thread.is_alive() for thread in search_workers.threads)
+
+
+@pytest.mark.django_db
+def test_ngram_search_backend(settings, tmpdir, store0):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': 'pootle.core.search.backends.NgramSearchBackend',
+            'DIRECTORY': str(tmpdir),
+            'INDEX_NAME': 'translations'}}
+    broker = SearchBroker()
+    backend = broker._servers["local"]
+    assert isinstance(backend, NgramSearchBackend)
+    assert backend.is_auto_updatable
+    unit, other_unit = store0.units[:2]
+    # load the related objects, so backends dont query the db in threads
+    language = unit.store.translation_project.language.code
+
+    def _obj(unit_id, source, target):
+        return dict(
+            id=unit_id, revision=unit_id, source=source, target=target,
+            project="Project 0", path=store0.pootle_path, username="",
+            fullname="", email_md5="")
+
+    broker.update(language, _obj(unit.id, unit.source, "Foo"))
+    # units dont match themselves
+    assert broker.search(unit) == []
+    broker.update(language, _obj(other_unit.id, unit.source, "Bar"))
+    broker.update(language, _obj(0, u"%s!" % unit.source, "Baz"))
+    broker.update(language, _obj(-1, u"Something else entirely", "Qux"))
+    results = broker.search(unit)
+    assert (
+        [result["target"] for result in results]
+        == ["Bar", "Baz"])
+    assert results[0]["score"] == 1
+
+    # entries are replaced, and persisted
+    backend.update(language, _obj(other_unit.id, unit.source, "Bar2"))
+    assert tmpdir.join("translations", "%s.jsonl" % language).exists()
+    backend.get_index(language).clear_entries()
+    assert (
+        [result["target"] for result in broker.search(unit)]
+        == ["Bar2", "Baz"])
+    assert backend.get_max_revision() == max(unit.id, other_unit.id)
+    backend.delete()
+    assert broker.search(unit) == []
+
+
+@pytest.mark.django_db
+def test_ngram_search_backend_candidates(settings, tmpdir, store0):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': 'pootle.core.search.backends.NgramSearchBackend',
+            'DIRECTORY': str(tmpdir),
+            'INDEX_NAME': 'translations'}}
+    backend = SearchBroker()._servers["local"]
+    unit = store0.units.first()
+    language = unit.store.translation_project.language.code
+
+    def _obj(unit_id, source, target):
+        return dict(
+            id=unit_id, revision=0, source=source, target=target,
+            project="Project 0", path=store0.pootle_path, username="",
+            fullname="", email_md5="")
+
+    # longer entries sharing all of the trigrams of the source dont crowd
+    # out an entry with the same source
+    backend.bulk_update(
+        language,
+        [_obj(-i, u"%s and then some more text %s" % (unit.source, i), "Foo")
+         for i
+         in range(1, backend.max_candidates + 20)]
+        + [_obj(0, unit.source, "Bar")])
+    entries = backend.get_index(language).find(
+        unit.source, backend.max_candidates)
+    assert entries[0]["target"] == "Bar"
+    results = backend.search(unit)
+    assert results[0]["target"] == "Bar"
+    assert results[0]["score"] == 1
+
+
+@pytest.mark.django_db
+def test_search_broker_single_server(settings, store0):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': STUB_ENGINE,
+            'RESULTS': [_result("Foo", "Bar", 1)]}}
+    broker = SearchBroker()
+    searched = []
+    search = broker._servers["local"].search
+
+    def _search(unit):
+        searched.append(threading.current_thread())
+        return search(unit)
+
+    broker._servers["local"].search = _search
+    results = broker.search(store0.units.first())
+    # a single server is searched without starting a thread
+    assert searched == [threading.current_thread()]
+    assert [result["target"] for result in results] == ["Bar"]
@@ -55,3 +55,34 @@ def test_revision_incr(store0):
     assert db_unit.revision != previous_revision
     assert Revision.get() != previous_revision
     assert db_unit.revision == Revision.get()
+
+
+@pytest.mark.django_db
+def test_revision_reserve():
+    previous_revision = Revision.get()
+    reserved = Revision.reserve(5)
+    assert list(reserved) == range(
+        previous_revision + 1, previous_revision + 6)
+    assert Revision.get() == previous_revision + 5
+    assert list(Revision.reserve(0)) == []
+    assert Revision.get() == previous_revision + 5
+
+
+@pytest.mark.django_db
+def test_revision_reserved(store0):
+    previous_revision = Revision.get()
+    units = list(store0.units[:3])
+    with Revision.reserved(2):
+        # revisions are reserved up front
+        assert Revision.get() == previous_revision + 2
+        for unit in units:
+            unit.target = "RESERVED %s" % unit.id
+            unit.save()
+        # first 2 units use the reserved revisions, then falls back to incr
+        assert Revision.get() == previous_revision + 3
+    assert (
+        [unit.revision for unit in units]
+        == [previous_revision + 1,
+            previous_revision + 2,
+            previous_revision + 3])
+    assert Revision.incr() == previous_revision + 4
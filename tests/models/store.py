@@ -24,6 +24,7 @@ from django.db.models import Max
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from pootle.core.cache import get_cache
 from pootle.core.delegate import (
     config, format_classes, format_diffs, formats)
 from pootle.core.models import Revision
@@ -42,9 +43,14 @@ from pootle_project.models import Project
 from pootle_statistics.models import (
     SubmissionFields, SubmissionTypes)
 from pootle_store.constants import (
-    NEW, OBSOLETE, PARSED, POOTLE_WINS, TRANSLATED)
-from pootle_store.diff import DiffableStore, StoreDiff
+    NEW, OBSOLETE, PARSED, POOTLE_WINS, TRANSLATED, UNIT_INDEX_GAP)
+from pootle_store.diff import (
+    DBUnit, DiffableStore, StoreDiff, get_content_hash)
 from pootle_store.models import Store
+from pootle_store.store.deserialize import (
+    ParsedStoreCache, get_parsed_store_cache)
+from pootle_store.store.serialize import (
+    SerializedCache, StoreSerialization, get_serialized_cache)
 from pootle_store.util import parse_pootle_revision
 from pootle_translationproject.models import TranslationProject
 
@@ -836,6 +842,135 @@ def test_store_po_serializer(test_fs, store_po):
     assert len(store_ttk.units) == len(ttk_po.units)
 
 
+@pytest.mark.django_db
+def test_store_po_stream(test_fs, store_po):
+    with test_fs.open("data/po/complex.po") as test_file:
+        test_string = test_file.read()
+    store_po.update(store_po.deserialize(test_string))
+    assert StoreSerialization(store_po).streamable
+    chunks = list(store_po.stream())
+    # the header and a chunk for each unit
+    assert len(chunks) == store_po.units.count() + 1
+    streamed = store_po.deserialize("".join(chunks))
+    serialized = store_po.deserialize(store_po.serialize())
+    assert (
+        [(unit.getid(), unit.target) for unit in streamed.units]
+        == [(unit.getid(), unit.target) for unit in serialized.units])
+    assert (
+        parse_pootle_revision(streamed)
+        == store_po.data.max_unit_revision)
+
+
+@pytest.mark.django_db
+def test_store_po_stream_not_chunked(test_fs, store_po):
+
+    class EGSerializer(Serializer):
+
+        @property
+        def output(self):
+            return "SERIALIZED: %s" % self.original_data
+
+    @provider(serializers, sender=Project)
+    def provide_serializers(**kwargs):
+        return dict(eg_serializer=EGSerializer)
+
+    project = store_po.translation_project.project
+    config.get(project.__class__, instance=project).set_config(
+        "pootle.core.serializers",
+        ["eg_serializer"])
+    assert not StoreSerialization(store_po).streamable
+    assert list(store_po.stream()) == [store_po.serialize()]
+    EGSerializer.chunked = True
+    assert StoreSerialization(store_po).streamable
+
+
+@pytest.mark.django_db
+def test_store_po_serializer_cached(settings, store0):
+    settings.POOTLE_SERIALIZED_CACHE = dict(CACHE="exports")
+    cache = get_serialized_cache()
+    cache.clear()
+    serialization = StoreSerialization(store0)
+    cache_key = serialization.get_cache_key()
+    assert cache.get(cache_key) is None
+    data = store0.serialize()
+    assert cache.get(cache_key) == data
+    assert cache.get_index().keys() == [cache_key]
+    assert (
+        serialization.get_cache_key(include_obsolete=True)
+        != cache_key)
+
+    # the key changes when the store is updated
+    unit = store0.units.first()
+    unit.target_f = "Some other string"
+    unit.save()
+    assert StoreSerialization(store0).get_cache_key() != cache_key
+    assert store0.serialize() != data
+
+    # and when units are reordered without changing their revisions
+    cache_key = StoreSerialization(store0).get_cache_key()
+    data = store0.serialize()
+    unit0, unit1 = store0.units[:2]
+    store0.unit_set.filter(pk=unit0.pk).update(index=unit1.index)
+    store0.unit_set.filter(pk=unit1.pk).update(index=unit0.index)
+    assert StoreSerialization(store0).get_cache_key() != cache_key
+    assert store0.serialize() != data
+    cache.clear()
+
+
+def test_store_serialized_cache_eviction():
+    cache = SerializedCache(
+        get_cache("exports"), max_size=10, max_total_size=15)
+    cache.clear()
+    assert not cache.set("too-big", "X" * 11)
+    assert cache.get("too-big") is None
+    assert cache.set("first", "X" * 10)
+    assert cache.set("second", "X" * 5)
+    assert cache.get("first") == "X" * 10
+    # adding another evicts the oldest
+    assert cache.set("third", "X" * 5)
+    assert cache.get("first") is None
+    assert cache.get_index().keys() == ["second", "third"]
+    cache.clear()
+    assert cache.get("second") is None
+
+
+def test_store_serialized_cache_locked():
+    cache = SerializedCache(
+        get_cache("exports"), max_size=10, max_total_size=15)
+    cache.clear()
+    cache.lock_timeout = 0
+    with cache.locked_index() as locked:
+        assert locked
+        # another process is updating the index
+        assert not cache.set("locked", "X" * 5)
+    assert cache.get("locked") is None
+    assert cache.set("unlocked", "X" * 5)
+    assert cache.get_index().keys() == ["unlocked"]
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_store_serializer_cache_evicted(settings, store0, store_po):
+    data = store0.serialize()
+    po_data = store_po.serialize()
+    # room for either of the stores, but not both
+    settings.POOTLE_SERIALIZED_CACHE = dict(
+        CACHE="exports",
+        MAX_TOTAL_SIZE=len(data) + len(po_data) - 1)
+    cache = get_serialized_cache()
+    cache.clear()
+    assert store0.serialize() == data
+    cache_key = StoreSerialization(store0).get_cache_key()
+    assert cache.get(cache_key) == data
+    assert store_po.serialize() == po_data
+    # the first store is evicted to make room for the second
+    assert cache.get(cache_key) is None
+    assert (
+        cache.get_index().keys()
+        == [StoreSerialization(store_po).get_cache_key()])
+    cache.clear()
+
+
 @pytest.mark.django_db
 def test_store_po_serializer_custom(test_fs, store_po):
 
@@ -875,6 +1010,68 @@ def test_store_po_serializer_custom(test_fs, store_po):
     assert checker.original_data == _store_as_string(store_po)
 
 
+@pytest.mark.django_db
+def test_store_deserialize_cached(store0):
+    cache = get_parsed_store_cache()
+    data = store0.serialize()
+    cache_key = cache.get_key(data, store0.name)
+    cache.cache.delete(cache_key)
+    parsed = store0.deserialize(data)
+    # the parsed po store round-trips through the cache
+    cached = cache.get(cache_key)
+    assert cached is not None
+    assert cached is not parsed
+    assert str(cached) == str(parsed)
+    assert (
+        [(unit.getid(), unit.source, unit.target)
+         for unit in cached.units]
+        == [(unit.getid(), unit.source, unit.target)
+            for unit in parsed.units])
+    unit = parsed.units[1]
+    original_target = unit.target
+    unit.target = "Changed target"
+    # changes to the returned store dont affect the cache
+    reparsed = store0.deserialize(data)
+    assert reparsed is not parsed
+    assert reparsed.units[1].getid() == unit.getid()
+    assert reparsed.units[1].target == original_target
+    cache.cache.delete(cache_key)
+
+
+def test_store_parsed_cache():
+    parsed = []
+
+    def _parse(data):
+        parsed.append(data)
+        return dict(data=data)
+
+    cache = ParsedStoreCache(get_cache("exports"), max_size=10)
+    keys = [
+        cache.get_key("X" * 6),
+        cache.get_key("X" * 6, "other.po"),
+        cache.get_key("Y" * 11)]
+    cache.cache.delete_many(keys)
+    assert cache.parse("X" * 6, _parse) == dict(data="X" * 6)
+    assert cache.parse("X" * 6, _parse) == dict(data="X" * 6)
+    assert parsed == ["X" * 6]
+    # the data is parsed again with different args
+    cache.parse("X" * 6, _parse, "other.po")
+    assert len(parsed) == 2
+    # data bigger than max_size is not cached
+    cache.parse("Y" * 11, _parse)
+    cache.parse("Y" * 11, _parse)
+    assert len(parsed) == 4
+    assert cache.cache.get(keys[2]) is None
+    # stores that cant be pickled are not cached
+    assert not cache.set("unpicklable", dict(parser=_parse), 1)
+    cache.cache.delete_many(keys)
+    # disabled
+    cache = ParsedStoreCache(None, max_size=10)
+    cache.parse("X" * 6, _parse)
+    cache.parse("X" * 6, _parse)
+    assert len(parsed) == 6
+
+
 @pytest.mark.django_db
 def test_store_po_deserializer_custom(test_fs, store_po):
 
@@ -1268,6 +1465,62 @@ def test_store_diff(diffable_stores):
     assert differ.source_store == source_store
 
 
+@pytest.mark.django_db
+def test_store_diff_hashes(diffable_stores):
+    target_store, source_store = diffable_stores
+    differ = StoreDiff(
+        target_store,
+        source_store,
+        target_store.get_max_unit_revision() + 1)
+    assert differ.is_unchanged()
+    assert (
+        differ.diffable.target_hashes.values()
+        == differ.diffable.source_hashes.values())
+
+    update_unit = target_store.units.first()
+    update_unit.target_f = "Some other string"
+    update_unit.save()
+    differ = StoreDiff(
+        target_store,
+        source_store,
+        target_store.get_max_unit_revision() + 1)
+    assert not differ.is_unchanged()
+    changed = [
+        uid for uid
+        in differ.active_target_units
+        if differ.unit_changed(uid)]
+    assert changed == [update_unit.unitid]
+
+
+@pytest.mark.django_db
+def test_store_diff_stored_hashes(diffable_stores):
+    target_store, source_store = diffable_stores
+    unit = target_store.units.first()
+    assert unit.content_hash == get_content_hash(unit)
+    differ = StoreDiff(
+        target_store,
+        source_store,
+        target_store.get_max_unit_revision() + 1)
+    stored = differ.diffable.target_units[unit.unitid]["content_hash"]
+    assert stored == unit.content_hash
+    assert differ.diffable.target_hashes[unit.unitid] == stored
+    assert (
+        stored
+        == DBUnit(differ.diffable.target_units[unit.unitid]).content_hash)
+
+    units = target_store.unit_set.filter(pk=unit.pk)
+    # content updated with a queryset update is rehashed
+    units.update(target_f="Updated with a queryset")
+    unit.refresh_from_db()
+    assert unit.content_hash != stored
+    assert unit.content_hash == get_content_hash(unit)
+    differ = StoreDiff(
+        target_store,
+        source_store,
+        target_store.get_max_unit_revision() + 1)
+    assert not differ.is_unchanged()
+
+
 @pytest.mark.django_db
 def test_store_diff_delete_target_unit(diffable_stores):
     target_store, source_store = diffable_stores
@@ -1428,6 +1681,26 @@ def test_store_diff_update_source_unit(diffable_stores):
     assert len(result["index"]) == 0
 
 
+@pytest.mark.django_db
+def test_store_diff_insert_indexes(diffable_stores):
+    target_store, source_store = diffable_stores
+    differ = StoreDiff(target_store, source_store, 0)
+    gap = UNIT_INDEX_GAP
+
+    # units added at the end are spaced by the gap
+    assert (
+        differ.get_insert_indexes(100, None, 2)
+        == ([100 + gap, 100 + 2 * gap], 0))
+    # units are spaced evenly between their neighbours
+    assert (
+        differ.get_insert_indexes(1024, 2048, 3)
+        == ([1280, 1536, 1792], 0))
+    # and the following units are only moved when there is no room
+    assert (
+        differ.get_insert_indexes(1, 3, 2)
+        == ([1 + gap, 1 + 2 * gap], 1 + 3 * gap - 3))
+
+
 @pytest.mark.django_db
 def test_store_diff_custom(diffable_stores):
     target_store, source_store = diffable_stores
@@ -22,6 +22,8 @@ from pootle_fs.utils import FSPlugin
 from pootle_store.constants import FUZZY, OBSOLETE, TRANSLATED, UNTRANSLATED
 from pootle_store.models import Suggestion, Unit
 from pootle_store.syncer import UnitSyncer
+from pootle_store.unit.filters import UnitContributionFilter
+from pootle_store.utils import UnitWordcount
 
 
 User = get_user_model()
@@ -110,12 +112,12 @@ def test_sync_plural_target(af_tutorial_po):
         db_unit.target.strings
         == file_unit.target.strings
         == [u'samaka', u'samak']
-        == file_store.units[db_unit.index].target.strings)
+        == file_store.findid(db_unit.getid()).target.strings)
     assert (
         db_unit.target
         == file_unit.target
         == u'samaka'
-        == file_store.units[db_unit.index].target)
+        == file_store.findid(db_unit.getid()).target)
 
 
 @pytest.mark.django_db
@@ -129,12 +131,12 @@ def test_sync_plural_target_dict(af_tutorial_po):
         db_unit.target.strings
         == file_unit.target.strings
         == [u'samaka', u'samak']
-        == file_store.units[db_unit.index].target.strings)
+        == file_store.findid(db_unit.getid()).target.strings)
     assert (
         db_unit.target
         == file_unit.target
         == u'samaka'
-        == file_store.units[db_unit.index].target)
+        == file_store.findid(db_unit.getid()).target)
 
 
 @pytest.mark.django_db
@@ -212,6 +214,99 @@ def test_add_suggestion(store0, system):
     assert len(untranslated_unit.get_suggestions()) == initial_suggestions + 1
 
 
+@pytest.mark.django_db
+def test_unit_suggested_on(store0, member, system):
+    unit = store0.units.filter(suggestion__isnull=True).first()
+    assert unit.suggested_on is None
+    suggestions = review.get(Suggestion)()
+
+    sugg1, created_ = suggestions.add(unit, "foo", user=member)
+    unit.refresh_from_db()
+    assert unit.suggested_on == sugg1.creation_time
+
+    sugg2, created_ = suggestions.add(unit, "bar", user=member)
+    unit.refresh_from_db()
+    assert unit.suggested_on == sugg2.creation_time
+
+    # the sort key is recalculated when suggestions are reviewed
+    review.get(Suggestion)([sugg2], system).reject()
+    unit.refresh_from_db()
+    assert unit.suggested_on == sugg1.creation_time
+
+    Unit.objects.filter(pk=unit.pk).update(suggested_on=None)
+    Unit.objects.filter(pk=unit.pk).update_pending_suggestions()
+    unit.refresh_from_db()
+    assert unit.suggested_on == sugg1.creation_time
+
+    review.get(Suggestion)([sugg1], system).reject()
+    unit.refresh_from_db()
+    assert unit.suggested_on is None
+
+
+@pytest.mark.django_db
+def test_unit_pending_suggestion_count(store0, member, member2, system):
+    unit = store0.units.filter(suggestion__isnull=True).first()
+    assert unit.pending_suggestion_count == 0
+    units = store0.unit_set.filter(pk=unit.pk)
+    suggestions = review.get(Suggestion)()
+
+    sugg1, created_ = suggestions.add(unit, "foo", user=member)
+    sugg2, created_ = suggestions.add(unit, "bar", user=member2)
+    assert unit.pending_suggestion_count == 2
+    unit.refresh_from_db()
+    assert unit.pending_suggestion_count == 2
+    assert UnitContributionFilter(units).filter("suggestions").count() == 1
+    assert (
+        list(UnitContributionFilter(units, user=member).filter(
+            "user-suggestions"))
+        == [unit])
+
+    review.get(Suggestion)([sugg1], system).reject()
+    unit.refresh_from_db()
+    assert unit.pending_suggestion_count == 1
+    assert not UnitContributionFilter(units, user=member).filter(
+        "user-suggestions").exists()
+
+    Unit.objects.filter(pk=unit.pk).update(pending_suggestion_count=0)
+    Unit.objects.filter(pk=unit.pk).update_pending_suggestions()
+    unit.refresh_from_db()
+    assert unit.pending_suggestion_count == 1
+
+    review.get(Suggestion)([sugg2], system).accept()
+    unit.refresh_from_db()
+    assert unit.pending_suggestion_count == 0
+    assert not UnitContributionFilter(units).filter("suggestions").exists()
+
+
+@pytest.mark.django_db
+def test_unit_save_denormalized_fields(store0):
+    unit = store0.units.first()
+    stale = Unit.objects.get(pk=unit.pk)
+    suggested_on = unit.mtime
+    Unit.objects.filter(pk=unit.pk).update(
+        checks_bitmap=unit.checks_bitmap + 1,
+        pending_suggestion_count=unit.pending_suggestion_count + 1,
+        suggested_on=suggested_on)
+
+    # saving a unit loaded before the update doesnt revert it
+    stale.target = "%s FOO" % stale.target
+    stale.save()
+    unit.refresh_from_db()
+    assert unit.target == stale.target
+    assert unit.checks_bitmap == stale.checks_bitmap + 1
+    assert (
+        unit.pending_suggestion_count
+        == stale.pending_suggestion_count + 1)
+    assert unit.suggested_on == suggested_on
+
+    # the content hash is saved with the fields its computed from
+    stale.target = "%s BAR" % stale.target
+    stale.save(update_fields=["target_f"])
+    unit.refresh_from_db()
+    assert unit.content_hash == stale.content_hash
+    assert unit.target == stale.target
+
+
 @pytest.mark.django_db
 def test_accept_suggestion_changes_state(issue_2401_po, system):
     """Tests that accepting a suggestion will change the state of the unit."""
@@ -395,15 +490,12 @@ def test_unit_syncer_locations(unit_syncer):
 @pytest.mark.django_db
 def test_add_autotranslated_unit(settings, store0, admin, no_wordcount):
 
-    class DummyWordcount(object):
+    class DummyWordcount(UnitWordcount):
 
         def count(self, value):
             return counter(value) - value.count('Pootle')
 
-        def count_words(self, strings):
-            return sum(self.count(string) for string in strings)
-
-    wc = DummyWordcount()
+    wc = DummyWordcount(counter)
 
     with no_wordcount():
 
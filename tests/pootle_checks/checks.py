@@ -8,10 +8,19 @@
 
 import pytest
 
+from translate.filters.decorators import Category
+
 from pootle.core.delegate import check_updater
+from pootle.core.signals import toggle
+from pootle_checks.bitmap import (
+    get_bitmap_categories, get_bitmap_check_counts, get_bitmap_checks,
+    get_category_mask, get_checks_bitmap, get_checks_mask)
+from pootle_checks.constants import (
+    CATEGORY_BITS, CHECK_BITS, CHECK_NAMES, UNKNOWN_CHECK_BIT)
 from pootle_checks.utils import TPQCUpdater, StoreQCUpdater
 from pootle_store.constants import OBSOLETE
-from pootle_store.models import QualityCheck
+from pootle_store.models import QualityCheck, Unit
+from pootle_store.unit.filters import UnitChecksFilter
 
 
 @pytest.mark.django_db
@@ -96,3 +105,80 @@ def test_store_qualitycheck_updater(tp0, store0):
     newest_revision = tp0.directory.revisions.filter(
         key="stats").values_list("value", flat=True).first()
     assert newest_revision == new_revision
+
+
+def test_checks_bitmap():
+    assert set(CHECK_BITS) == set(CHECK_NAMES)
+    assert max(CHECK_BITS.values()) < UNKNOWN_CHECK_BIT
+    assert min(CATEGORY_BITS.values()) > UNKNOWN_CHECK_BIT
+    assert max(CATEGORY_BITS.values()) < 63
+    bitmap = get_checks_bitmap(
+        [("xmltags", Category.CRITICAL),
+         ("doublespacing", Category.COSMETIC)])
+    assert (
+        sorted(get_bitmap_checks(bitmap))
+        == ["doublespacing", "xmltags"])
+    assert (
+        sorted(get_bitmap_categories(bitmap))
+        == sorted([Category.CRITICAL, Category.COSMETIC]))
+    assert bitmap & get_checks_mask(["xmltags"])
+    assert not bitmap & get_checks_mask(["accelerators"])
+    assert bitmap & get_category_mask(Category.CRITICAL)
+    assert not bitmap & get_category_mask(Category.FUNCTIONAL)
+    assert get_checks_mask(["xmltags", "DOES_NOT_EXIST"]) is None
+    # categories of checks are told from units with a single category
+    counts = get_bitmap_check_counts(
+        {bitmap: 2,
+         get_checks_bitmap([("xmltags", Category.CRITICAL)]): 3,
+         get_checks_bitmap([("doublespacing", Category.COSMETIC)]): 1})
+    assert (
+        sorted(counts)
+        == sorted(
+            [dict(name="xmltags", category=Category.CRITICAL, count=5),
+             dict(name="doublespacing", category=Category.COSMETIC,
+                  count=3)]))
+    assert get_bitmap_check_counts({bitmap: 2}) is None
+    unknown = get_checks_bitmap([("DOES_NOT_EXIST", Category.CRITICAL)])
+    assert get_bitmap_check_counts({unknown: 1}) is None
+
+
+def _get_units_checks_bitmaps(units):
+    return {
+        unit.pk: get_checks_bitmap(
+            unit.qualitycheck_set.filter(
+                false_positive=False).values_list("name", "category"))
+        for unit
+        in units}
+
+
+@pytest.mark.django_db
+def test_qualitycheck_updater_checks_bitmap(tp0):
+    units = Unit.objects.filter(store__translation_project=tp0)
+    checks = QualityCheck.objects.filter(unit__store__translation_project=tp0)
+    units.update(checks_bitmap=0)
+    checks.delete()
+    TPQCUpdater(translation_project=tp0).update()
+    bitmaps = _get_units_checks_bitmaps(units)
+    assert any(bitmaps.values())
+    assert dict(units.values_list("pk", "checks_bitmap")) == bitmaps
+    # muting a check clears its bit
+    check = checks.filter(false_positive=False).first()
+    toggle.send(check.__class__, instance=check, false_positive=True)
+    # the bitmap of the unit in memory is refreshed
+    assert not check.unit.checks_bitmap & get_checks_mask([check.name])
+    unit = Unit.objects.get(pk=check.unit_id)
+    assert not unit.checks_bitmap & get_checks_mask([check.name])
+    assert unit.checks_bitmap == _get_units_checks_bitmaps([unit])[unit.pk]
+    assert (
+        unit not in UnitChecksFilter(
+            units, checks=[check.name]).filter("checks"))
+    toggle.send(check.__class__, instance=check, false_positive=False)
+    assert check.unit.checks_bitmap & get_checks_mask([check.name])
+    unit = Unit.objects.get(pk=check.unit_id)
+    assert unit.checks_bitmap & get_checks_mask([check.name])
+    assert (
+        unit in UnitChecksFilter(
+            units, checks=[check.name]).filter("checks"))
+    assert (
+        unit in UnitChecksFilter(
+            units, category=check.category).filter("checks"))
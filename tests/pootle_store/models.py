@@ -43,3 +43,54 @@ def test_store_update_source_change_subs(store0, member, system):
     unit.save(user=member)
     created_sub = unit.submission_set.latest()
     assert created_sub.submitter == member
+
+
+@pytest.mark.django_db
+def test_unit_raw_values(store0):
+    from pootle_store.fields import to_db
+    from pootle_store.unit.proxy import UnitProxy
+
+    unit = store0.units.first()
+    raw = store0.unit_set.filter(pk=unit.pk).raw_values(
+        "id", "source_f", "state").next()
+    assert raw["id"] == unit.id
+    assert raw["state"] == unit.state
+    assert not hasattr(raw["source_f"], "strings")
+    assert raw["source_f"] == to_db(unit.source_f)
+    proxy = UnitProxy(raw)
+    assert proxy.source == unit.source_f
+    assert hasattr(raw["source_f"], "strings")
+
+
+@pytest.mark.django_db
+def test_store_update_insert_index(store0):
+
+    def _insert_unit(source, after):
+        new_store = store0.deserialize(store0.serialize())
+        new_unit = new_store.units[1].copy()
+        new_unit.source = source
+        units = new_store.units
+        position = [unit.getid() for unit in units].index(after) + 1
+        new_store.units = units[:position] + [new_unit] + units[position:]
+        store0.update(
+            new_store,
+            store_revision=store0.data.max_unit_revision + 1)
+        return store0.units.get(source_f=source)
+
+    first_unit, next_unit = list(store0.units[:2])
+    inserted = _insert_unit("INSERTED UNIT", first_unit.getid())
+    assert first_unit.index < inserted.index < next_unit.index
+    indexes = dict(store0.unit_set.values_list("id", "index"))
+
+    # there is now room after the inserted unit, so other units dont move
+    next_unit.refresh_from_db()
+    inserted_again = _insert_unit("INSERTED AGAIN", inserted.getid())
+    assert inserted.index < inserted_again.index < next_unit.index
+    assert (
+        dict(store0.unit_set.exclude(
+            pk=inserted_again.pk).values_list("id", "index"))
+        == indexes)
+    assert (
+        list(store0.units.values_list("source_f", flat=True)[:4])
+        == [first_unit.source_f, "INSERTED UNIT", "INSERTED AGAIN",
+            next_unit.source_f])
@@ -11,7 +11,13 @@ import pytest
 
 from pytest_pootle.utils import create_store
 
+from pootle.core.models import Revision
+from pootle_statistics.models import SubmissionFields
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
+from pootle_store.contextmanagers import bulk_submissions
+from pootle_store.models import Unit
+from pootle_store.updater import StoreUpdater
+from pootle_store.utils import collected_submissions
 
 
 @pytest.mark.django_db
@@ -119,3 +125,108 @@ def test_store_update_conflict_pootle_wins(store0, caplog):
     assert unit0.target == "bar0"
     assert unit1.target == "foo1"
     assert unit2.target == "baz2"
+
+
+@pytest.mark.django_db
+def test_store_update_batched(store0, member, monkeypatch):
+    ttk = store0.deserialize(store0.serialize())
+    units = list(ttk.units[1:])
+    units[0].target = "batched target 0"
+    units[1].target = "batched target 1"
+    obsolete_uid = units[-1].getid()
+    # reorder the remaining units, and obsolete the last one
+    ttk.units = [ttk.units[0]] + units[:2] + list(reversed(units[2:-1]))
+    saved = []
+    unit_save = Unit.save
+
+    def _save(unit, *args, **kwargs):
+        saved.append(unit)
+        return unit_save(unit, *args, **kwargs)
+
+    monkeypatch.setattr(Unit, "save", _save)
+    update_revision, changes = store0.update(
+        ttk,
+        user=member,
+        store_revision=store0.data.max_unit_revision + 1,
+        batched=True)
+    # units are saved with bulk writes
+    assert saved == []
+    assert changes["updated"] == 2
+    assert changes["obsoleted"] == 1
+    assert collected_submissions.subs is None
+    assert (
+        list(store0.units.values_list("unitid", flat=True))
+        == [u.getid() for u in ttk.units[1:]])
+    for ttk_unit in units[:2]:
+        unit = store0.findid(ttk_unit.getid())
+        assert unit.target == ttk_unit.target
+        assert unit.revision == update_revision
+        assert unit.change.submitted_by == member
+        assert unit.change.submitted_on == unit.mtime
+        assert unit.submission_set.filter(
+            field=SubmissionFields.TARGET,
+            submitter=member,
+            new_value=ttk_unit.target).count() == 1
+    obsolete_unit = store0.unit_set.get(unitid=obsolete_uid)
+    assert obsolete_unit.isobsolete()
+    assert obsolete_unit.revision == update_revision
+    assert obsolete_unit.change.reviewed_by == member
+
+
+@pytest.mark.django_db
+def test_store_bulk_submissions(store0, member):
+    unit = store0.units.first()
+    subs_count = unit.submission_set.count()
+    with bulk_submissions(store0):
+        unit.target = "bulk submissions target"
+        unit.save(user=member)
+        collected = len(collected_submissions.subs)
+        assert collected
+        assert unit.submission_set.count() == subs_count
+    assert collected_submissions.subs is None
+    assert unit.submission_set.count() == subs_count + collected
+
+
+@pytest.mark.django_db
+def test_store_bulk_submissions_flush(store0, member):
+    unit = store0.units.first()
+    subs_count = unit.submission_set.count()
+    with bulk_submissions(store0):
+        unit.target = "flushed submissions target"
+        unit.save(user=member)
+        collected = len(collected_submissions.subs)
+        collected_submissions.flush()
+        assert collected_submissions.subs == []
+        # flushed submissions can be read during the update
+        assert unit.submission_set.count() == subs_count + collected
+        unit.refresh_from_db()
+        unit.target = "collected submissions target"
+        unit.save(user=member)
+        assert collected_submissions.subs
+    assert collected_submissions.sender is None
+    assert unit.submission_set.count() > subs_count + collected
+
+
+@pytest.mark.django_db
+def test_store_update_reserved_revisions(store0):
+    ttk = store0.deserialize(store0.serialize())
+    ttk.units[1].target = "reserved target"
+    new_unit = ttk.units[1].copy()
+    new_unit.source = "RESERVED NEW UNIT"
+    ttk.addunit(new_unit)
+    previous_revision = Revision.get()
+    update_revision, changes_ = store0.update(
+        ttk,
+        store_revision=store0.data.max_unit_revision + 1)
+    # the revisions used by the update come from one block, and the units
+    # are saved with the update revision
+    assert update_revision == previous_revision + 1
+    assert (
+        Revision.get()
+        == previous_revision + StoreUpdater.reserved_revisions)
+    assert (
+        store0.unit_set.get(source_f="RESERVED NEW UNIT").revision
+        == update_revision)
+    assert (
+        store0.findid(ttk.units[1].getid()).revision
+        == update_revision)
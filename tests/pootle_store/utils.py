@@ -7,6 +7,7 @@
 # AUTHORS file for copyright and authorship information.
 
 from collections import OrderedDict
+from hashlib import md5
 
 import pytest
 
@@ -21,7 +22,7 @@ from pootle_statistics.models import (
     MUTED, UNMUTED, Submission, SubmissionFields, SubmissionTypes)
 from pootle_store.constants import FUZZY, TRANSLATED
 from pootle_store.models import QualityCheck, Unit, UnitChange
-from pootle_store.utils import UnitLifecycle
+from pootle_store.utils import UnitLifecycle, UnitWordcount
 
 
 @pytest.mark.django_db
@@ -437,3 +438,41 @@ def test_mute_qualitycheck(store_po, member):
 
     sub = unit.submission_set.get(quality_check__id=check_id)
     assert sub.submitter == member
+
+
+def test_unit_wordcount_memo():
+    counted = []
+
+    def _counter(string):
+        counted.append(string)
+        return len(string.split())
+
+    counter = UnitWordcount(_counter)
+    source = multistring(["one two", "one two three"])
+    assert counter.count_source(source) == 5
+    assert counter.count_source(multistring(["one two", "one two three"])) == 5
+    assert counted == ["one two", "one two three"]
+    assert counter.count_source(source, "SOMEHASH") == 5
+    assert counter.count_source(multistring(["foo"]), "SOMEHASH") == 5
+    counter.clear()
+    assert counter.count_source(multistring(["foo"]), "SOMEHASH") == 1
+    counter.memo_size = 1
+    counter.count_source(source)
+    assert list(counter.memo) == [counter.get_source_hash(source)]
+
+
+def test_unit_wordcount_memo_plurals():
+    counter = UnitWordcount(lambda string: len(string.split()))
+    # sources with the same singular but different plurals
+    source = multistring(["one file", "%d files"])
+    other_source = multistring(["one file", "%d files to count"])
+    assert (
+        counter.get_source_hash(source)
+        != counter.get_source_hash(other_source))
+    assert counter.count_source(source) == 4
+    assert counter.count_source(other_source) == 6
+    # single strings hash the same as a plain md5 of the string
+    assert (
+        counter.get_source_hash(multistring(["one file"]))
+        == counter.get_source_hash(u"one file")
+        == md5(b"one file").hexdigest())
@@ -8,7 +8,10 @@
 
 import pytest
 
+from pytest_pootle.factories import UnitDBFactory
+
 from pootle.core.delegate import versioned
+from pootle_store.constants import TRANSLATED
 from pootle_store.models import Store
 
 
@@ -96,3 +99,38 @@ def test_versioned_store(store0):
     assert old_unit.isfuzzy() == rev0["fuzzy"]
     assert old_unit.istranslated() == rev0["translated"]
     assert old_unit.isobsolete() == rev0["obsolete"]
+
+
+@pytest.mark.django_db
+def test_versioned_store_created_units(store0):
+    versions = versioned.get(Store)(store0)
+    revision = store0.data.max_unit_revision
+    unit = store0.units[0]
+    original_target = unit.target
+    new_unit = UnitDBFactory(store=store0, state=TRANSLATED)
+    unit.target = "changed target"
+    unit.save()
+    unit.target = "changed target again"
+    unit.save()
+    current_store = versions.current_store
+    assert current_store.findid(new_unit.getid())
+    old_store = versions.at_revision(revision)
+    assert old_store.findid(new_unit.getid()) is None
+    assert new_unit.getid() not in [u.getid() for u in old_store.units]
+    # only the first change since the revision is reverted
+    assert old_store.findid(unit.getid()).target == original_target
+    assert (
+        len(old_store.units)
+        == len(current_store.units) - 1)
+
+
+@pytest.mark.django_db
+def test_versioned_store_remove_units(store0):
+    versions = versioned.get(Store)(store0)
+    store = versions.current_store
+    unitid = store.units[1].getid()
+    # the store has not been indexed yet
+    versions.remove_units(store, set([unitid]))
+    assert unitid not in [u.getid() for u in store.units]
+    assert store.findid(unitid) is None
+    assert store.findid(store.units[1].getid()) is store.units[1]
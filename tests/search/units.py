@@ -6,10 +6,16 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import os
+from datetime import timedelta
+
 import pytest
 
-from pootle.core.delegate import search_backend
+from django.utils import timezone
+
+from pootle.core.delegate import review, revision, search_backend
 from pootle.core.plugin import getter
+from pootle_app.models import Directory
 from pootle_project.models import Project
 from pootle_statistics.models import Submission, SubmissionTypes
 from pootle_store.getters import get_search_backend
@@ -18,7 +24,9 @@ from pootle_store.models import Suggestion, Unit
 from pootle_store.unit.filters import (
     FilterNotFound, UnitChecksFilter, UnitContributionFilter, UnitSearchFilter,
     UnitStateFilter, UnitTextSearch)
-from pootle_store.unit.search import DBSearchBackend
+from pootle_store.unit.fulltext import UnitFullTextSearch, get_fulltext_index
+from pootle_store.unit.search import DBSearchBackend, FullTextSearchBackend
+from pootle_store.unit.textindex import UnitTextIndex, get_text_index
 
 
 def _expected_text_search_words(text, case):
@@ -314,6 +322,70 @@ def test_unit_search_backend():
     assert search_backend.get(Unit) is DBSearchBackend
 
 
+@pytest.mark.django_db
+def test_unit_search_backend_fulltext(settings):
+    settings.POOTLE_FULLTEXT_SEARCH = True
+    assert search_backend.get(Unit) is FullTextSearchBackend
+
+
+@pytest.fixture
+def unit_fulltext_index(db):
+    index = get_fulltext_index()
+    if not index or index.connection.vendor == "mysql":
+        # creating mysql indexes would commit the test transaction
+        pytest.skip("No full text index for this db")
+    if not index.create():
+        pytest.skip("Unable to create the full text index")
+    yield index
+    index.drop()
+
+
+def test_get_units_fulltext_search(unit_fulltext_index, units_text_searches):
+    search = units_text_searches
+    qs = Unit.objects.all()
+    unit_search = UnitTextSearch(qs)
+    words = unit_search.get_words(search["text"], search["exact"])
+    fields = unit_search.get_search_fields(search["sfields"])
+    result = list(
+        UnitFullTextSearch(qs).search(
+            search["text"], search["sfields"],
+            search["exact"], search["case"]).order_by("pk"))
+    expected = _expected_text_search_results(
+        qs, words, fields, search["exact"], search["case"])
+    assert (
+        result
+        == list(
+            UnitTextSearch(qs).search(
+                search["text"], search["sfields"],
+                search["exact"], search["case"]).order_by("pk")))
+    assert result == expected
+
+
+def test_unit_fulltext_search_words(unit_fulltext_index, store0):
+    unit = store0.units.first()
+    unit.source = "Saving the translated files"
+    unit.save()
+    qs = store0.units
+    assert (
+        list(UnitFullTextSearch(qs).search("sav files", ["source"]))
+        == [unit])
+    # any part of a word is matched
+    assert (
+        list(UnitFullTextSearch(qs).search("aving slated", ["source"]))
+        == [unit])
+    assert (
+        list(UnitFullTextSearch(qs).search("ving th", ["source"]))
+        == [unit])
+    assert (
+        list(UnitFullTextSearch(qs).search(
+            "the translated", ["source"], exact=True))
+        == [unit])
+    assert not UnitFullTextSearch(qs).search(
+        "translated the", ["source"], exact=True).count()
+    assert not UnitFullTextSearch(qs).search(
+        "SAVING", ["source"], case=True).count()
+
+
 @pytest.mark.django_db
 def test_unit_search_backend_custom():
 
@@ -334,3 +406,188 @@ def test_unit_search_backend_custom():
     search_backend.connect(get_search_backend, sender=Unit)
 
     assert search_backend.get(Unit) is CustomSearchBackend
+
+
+@pytest.mark.django_db
+def test_unit_text_index(tmpdir, store0):
+    text_index = UnitTextIndex(str(tmpdir))
+    tp_id = store0.translation_project_id
+    unit = store0.units.first()
+    word = max(unicode(unit.source_f).split(), key=len).lower()
+    expected = set(
+        Unit.objects.filter(
+            store__translation_project_id=tp_id,
+            source_f__icontains=word).values_list("pk", flat=True))
+    # translation projects are not indexed when searched
+    assert text_index.find([tp_id], [word], ["source_f"]) is None
+    assert not text_index.get_segment(tp_id).exists
+    text_index.build(tp_id)
+    candidates = text_index.find([tp_id], [word], ["source_f"])
+    assert unit.pk in candidates
+    assert expected <= candidates
+    # short words cant be looked up
+    assert text_index.find([tp_id], ["ab"], ["source_f"]) is None
+
+    # saved units are logged, and merged into the segment
+    segment = text_index.get_segment(tp_id)
+    segment.max_log_size = 100
+    text_index.add_unit(
+        tp_id,
+        dict(id=unit.pk, source_f=u"", target_f=u"TEXT INDEXED",
+             locations=None, translator_comment=u"",
+             developer_comment=u""))
+    assert (
+        text_index.find([tp_id], [u"indexed"], ["target_f"])
+        == set([unit.pk]))
+    assert not os.path.getsize(segment.log_path)
+    assert (
+        text_index.find([tp_id], [u"indexed"], ["source_f"])
+        == set())
+    # another process sees the merged segment
+    assert (
+        UnitTextIndex(str(tmpdir)).find([tp_id], [u"text"], ["target_f"])
+        == set([unit.pk]))
+
+
+@pytest.mark.django_db
+def test_unit_text_index_not_built(tmpdir, store0):
+    text_index = UnitTextIndex(str(tmpdir))
+    tp_id = store0.translation_project_id
+    unit = store0.units.first()
+    segment = text_index.get_segment(tp_id)
+    segment.max_log_size = 0
+    # units of translation projects that are not indexed are not logged
+    text_index.add_unit(
+        tp_id,
+        dict(id=unit.pk, source_f=u"", target_f=u"TEXT INDEXED",
+             locations=None, translator_comment=u"",
+             developer_comment=u""))
+    assert not os.path.exists(segment.log_path)
+    assert not segment.exists
+    assert text_index.find([tp_id], [u"indexed"], ["target_f"]) is None
+
+
+@pytest.mark.django_db
+def test_unit_text_index_queryset_update(tmpdir, settings, monkeypatch,
+                                         store0):
+    settings.POOTLE_TEXT_INDEX_DIRECTORY = str(tmpdir)
+    monkeypatch.setattr(
+        "pootle_store.unit.textindex.transaction.on_commit",
+        lambda func: func())
+    text_index = get_text_index()
+    tp_id = store0.translation_project_id
+    text_index.build(tp_id)
+    unit = store0.units.first()
+    store0.unit_set.filter(pk=unit.pk).update(target_f=u"QUERYSET INDEXED")
+    assert (
+        text_index.find([tp_id], [u"queryset"], ["target_f"])
+        == set([unit.pk]))
+
+
+@pytest.mark.django_db
+def test_unit_search_backend_text_index(tmpdir, settings, store0, member):
+    settings.POOTLE_TEXT_INDEX_DIRECTORY = str(tmpdir)
+    tp = store0.translation_project
+    unit = store0.units.first()
+    text = max(unicode(unit.source_f).split(), key=len)
+    kwargs = dict(
+        project_code=tp.project.code,
+        language_code=tp.language.code,
+        category=None, checks=None, soptions=[],
+        sfields=["source"], search=text, user=member,
+        month=None, filter=None)
+    kwargs["modified-since"] = None
+    backend = DBSearchBackend(member, **kwargs)
+    assert backend.text_index
+    backend.text_index.build(tp.pk)
+    qs = backend.units_qs
+    assert (
+        list(backend.filter_qs(qs).order_by("pk"))
+        == list(UnitTextSearch(qs).search(
+            text, ["source"]).order_by("pk")))
+
+
+@pytest.mark.django_db
+def test_unit_search_backend_cached_results(settings, tp0, member):
+    settings.POOTLE_SEARCH_RESULTS_CACHE = "default"
+    revisions = revision.get(Directory)(tp0.directory)
+    revisions.set(keys=["stats"], value="REV1")
+    kwargs = dict(
+        project_code=tp0.project.code,
+        language_code=tp0.language.code,
+        category=None, checks=None, soptions=[], sfields=[], search=None,
+        user=member, month=None, filter="all", count=2, offset=None)
+    kwargs["modified-since"] = None
+    expected = list(
+        DBSearchBackend(member, **kwargs).results.values_list(
+            "pk", flat=True))
+
+    backend = DBSearchBackend(member, **kwargs)
+    assert backend.cached_uids == expected
+    total, start, end, uids = backend.search()
+    assert (total, start, end) == (len(expected), 0, 4)
+    assert uids == expected[:4]
+    cursors = backend.get_cursors(start, end)
+    assert cursors["previousCursor"] is None
+
+    # later chunks are served from the cache, using the cursor
+    unit = Unit.objects.get(pk=expected[0])
+    unit.makeobsolete()
+    unit.save()
+    revisions.set(keys=["stats"], value="REV1")
+    backend = DBSearchBackend(member, cursor=cursors["nextCursor"], **kwargs)
+    assert backend.cached_uids == expected
+    total, start, end, uids = backend.search()
+    assert (total, start, end) == (len(expected), 4, 8)
+    assert uids == expected[4:8]
+    assert (
+        backend.get_cursors(start, end)["previousCursor"]
+        == backend.get_cursor(0))
+
+    # once the revision changes the cursor is ignored
+    revisions.set(keys=["stats"], value="REV2")
+    backend = DBSearchBackend(member, cursor=cursors["nextCursor"], **kwargs)
+    assert backend.cached_uids == expected[1:]
+    total, start, end, uids = backend.search()
+    assert (total, start, end) == (len(expected) - 1, 0, 4)
+    assert uids == expected[1:5]
+
+    # or if its not for the same search
+    kwargs["filter"] = "translated"
+    backend = DBSearchBackend(member, cursor=cursors["nextCursor"], **kwargs)
+    assert backend.cursor_offset is None
+
+    settings.POOTLE_SEARCH_RESULTS_CACHE = None
+    backend = DBSearchBackend(member, **kwargs)
+    assert backend.cached_uids is None
+    assert backend.get_cursors(0, 4) == dict(
+        nextCursor=None, previousCursor=None)
+
+
+@pytest.mark.django_db
+def test_unit_search_backend_sort_user_suggestions(store0, member, member2):
+    unit1, unit2 = store0.units.filter(suggestion__isnull=True)[:2]
+    suggestions = review.get(Suggestion)()
+    sugg1, created_ = suggestions.add(unit1, "foo", user=member)
+    sugg2, created_ = suggestions.add(unit2, "bar", user=member)
+    sugg3, created_ = suggestions.add(unit1, "baz", user=member2)
+    now = timezone.now()
+    for i, sugg in enumerate([sugg1, sugg2, sugg3]):
+        Suggestion.objects.filter(pk=sugg.pk).update(
+            creation_time=now + timedelta(minutes=i))
+    units = Unit.objects.filter(pk__in=[unit1.pk, unit2.pk])
+
+    # units are sorted by the users own suggestions, and not the later
+    # suggestion by member2
+    qs = UnitContributionFilter(units, user=member).filter(
+        "user-suggestions")
+    for sort_by, expected in (("-user_suggested_on", [unit2, unit1]),
+                              ("user_suggested_on", [unit1, unit2])):
+        backend = DBSearchBackend(
+            member, filter="user-suggestions", sort_on="user_suggestions",
+            sort_by=sort_by)
+        assert list(backend.sort_qs(qs)) == expected
+    qs = UnitContributionFilter(units, user=member2).filter(
+        "user-suggestions")
+    assert list(qs.values_list("user_suggested_on", flat=True)) == [
+        now + timedelta(minutes=2)]
@@ -92,6 +92,11 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 POOTLE_EMAIL_FEEDBACK_ENABLED = True
 
+# Revisions are reset between tests, so cached serializations could be stale
+POOTLE_SERIALIZED_CACHE = {
+    'CACHE': None,
+}
+
 
 # Faster password hasher
 PASSWORD_HASHERS = (